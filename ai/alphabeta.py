@@ -1,7 +1,11 @@
 from game.game_rules import check_win, get_valid_moves_with_heuristics
-from ai.move_ordering import order_moves
+from ai.move_ordering import staged_moves
+from ai.search_buffers import copy_moves, fill_valid_moves, get_buffers
+from ai import evaluation
+from ai.search_config import EXACT, LOWER, UPPER, check_deadline
+from ai.threats import candidate_moves, four_gaps, horizon_threat, makes_five, search_forcing
 
-def alpha_beta(board, depth, alpha, beta, maximizing_player, eval_fn, player_symbol):
+def alpha_beta(board, depth, alpha, beta, maximizing_player, eval_fn, player_symbol, config=None, extension=0):
     """
     Alpha-Beta pruning algorithm for Gomoku
     
@@ -13,11 +17,26 @@ def alpha_beta(board, depth, alpha, beta, maximizing_player, eval_fn, player_sym
         maximizing_player: True if maximizing player's turn, False otherwise
         eval_fn: Function to evaluate board states
         player_symbol: Symbol of the player using this algorithm (1 or -1)
+        config: Optional SearchConfig enabling selective search features
+        extension: Plies of threat extension already used on this path
         
     Returns:
         best_score: The score of the best move
         best_move: The best move (row, col)
     """
+    if config is not None and config.tracer is not None:
+        return config.tracer.trace(_alpha_beta, board, depth, alpha, beta, maximizing_player, eval_fn,
+                                   player_symbol, config, extension)
+    return _alpha_beta(board, depth, alpha, beta, maximizing_player, eval_fn, player_symbol, config, extension)
+
+
+def _alpha_beta(board, depth, alpha, beta, maximizing_player, eval_fn, player_symbol, config=None, extension=0):
+    stats = config.stats if config is not None else None
+    if stats is not None:
+        stats.nodes += 1
+    if config is not None and config.deadline is not None:
+        check_deadline(config)
+
     # Check for terminal states
     if board.last_move:
         last_row, last_col, _ = board.last_move
@@ -27,27 +46,96 @@ def alpha_beta(board, depth, alpha, beta, maximizing_player, eval_fn, player_sym
             else:
                 return -100000, None  # Opponent won
     
+    # No five can be completed any more: an exact draw, whatever is played
+    if board.is_dead_draw():
+        if stats is not None:
+            stats.dead_draws += 1
+        moves = board.get_valid_moves()
+        return 0, moves[0] if moves else None
+
     # If maximum depth reached or board is full
-    if depth == 0 or board.is_full():
+    if depth <= 0 or board.is_full():
+        # Do not stop in the middle of a four or open three
+        if (depth <= 0 and config is not None and config.extensions
+                and extension < config.max_extension and horizon_threat(board)):
+            return search_forcing(board, alpha, beta, maximizing_player, eval_fn, player_symbol, config,
+                                  lambda alpha, beta: alpha_beta(board, 0, alpha, beta, not maximizing_player, eval_fn,
+                                                                 player_symbol, config, extension + 1))
+        if stats is not None:
+            stats.evals += 1
         return eval_fn(board, player_symbol), None
     
-    # Get and order valid moves
-    valid_moves = get_valid_moves_with_heuristics(board)
-    valid_moves = order_moves(board, valid_moves, player_symbol if maximizing_player else -player_symbol)
+    # Answer from the transposition table kept between searches
+    tables = config.tables if config is not None else None
+    hash_move = None
+    if tables is not None:
+        entry = tables.probe(board.hash)
+        if entry is not None:
+            entry_depth, entry_score, bound, hash_move, _ = entry
+            if entry_depth >= depth and hash_move is not None and (
+                    bound == EXACT or bound == LOWER and entry_score >= beta
+                    or bound == UPPER and entry_score <= alpha):
+                if stats is not None:
+                    stats.table_hits += 1
+                return entry_score, hash_move
+        alpha_start, beta_start = alpha, beta
+
+    # Generate valid moves in this ply's preallocated buffers, to be tried in stages:
+    # wins and blocks, hash move, killers, then the rest ordered as they are reached
+    mover = player_symbol if maximizing_player else -player_symbol
+    buffers = get_buffers(board.size)
+    buffers.ensure(depth)
+    move_count = _generate_moves(board, mover, config, buffers, depth)
+    ply = len(board.move_history)
+    moves = staged_moves(board, buffers.moves[depth], move_count, mover, buffers.scores[depth], buffers.line,
+                         hash_move, tables.killers.get(ply) if tables is not None else None,
+                         tables.history[mover] if tables is not None else None)
+
+    # Razoring and futility pruning near the leaves, based on the static score
+    futile = False
+    if config is not None and depth <= 2 and (config.futility or config.razoring):
+        static_score = eval_fn(board, player_symbol)
+        if stats is not None:
+            stats.evals += 1
+        if config.razoring and depth == 2:
+            if (static_score + evaluation.RAZOR_MARGIN <= alpha if maximizing_player
+                    else static_score - evaluation.RAZOR_MARGIN >= beta):
+                depth = 1
+                if stats is not None:
+                    stats.razor_reductions += 1
+        if config.futility and depth == 1:
+            futile = (static_score + evaluation.FUTILITY_MARGIN <= alpha if maximizing_player
+                      else static_score - evaluation.FUTILITY_MARGIN >= beta)
     
     if maximizing_player:
         best_score = float('-inf')
         best_move = None
         
         # Try each valid move
-        for move in valid_moves:
+        for index, move in enumerate(moves):
             row, col = move
+
+            # Skip quiet moves that cannot lift the score above alpha
+            if futile and index > 0 and not _is_tactical(board, row, col, player_symbol):
+                if stats is not None:
+                    stats.futility_prunes += 1
+                continue
+
+            reduced = _reduce_late_move(config, board, index, depth, row, col, player_symbol)
             
             # Make the move
             board.place_piece(row, col, player_symbol)
             
             # Recursively evaluate the position
-            score, _ = alpha_beta(board, depth - 1, alpha, beta, False, eval_fn, player_symbol)
+            if reduced:
+                score, _ = alpha_beta(board, depth - 1 - config.lmr_reduction, alpha, beta, False, eval_fn,
+                                      player_symbol, config)
+                if score > alpha:
+                    if stats is not None:
+                        stats.lmr_researches += 1
+                    score, _ = alpha_beta(board, depth - 1, alpha, beta, False, eval_fn, player_symbol, config)
+            else:
+                score, _ = alpha_beta(board, depth - 1, alpha, beta, False, eval_fn, player_symbol, config)
             
             # Undo the move
             board.undo_last_move()
@@ -60,8 +148,15 @@ def alpha_beta(board, depth, alpha, beta, maximizing_player, eval_fn, player_sym
             # Alpha-Beta pruning
             alpha = max(alpha, best_score)
             if beta <= alpha:
+                if stats is not None:
+                    stats.cutoffs += 1
+                if tables is not None:
+                    tables.record_cutoff(player_symbol, move, depth)
+                    tables.record_killer(ply, move)
                 break  # Beta cutoff
         
+        if tables is not None:
+            _store(tables, board, depth, best_score, best_move, alpha_start, beta_start)
         return best_score, best_move
     
     else:  # Minimizing player
@@ -70,14 +165,30 @@ def alpha_beta(board, depth, alpha, beta, maximizing_player, eval_fn, player_sym
         opponent_symbol = -player_symbol
         
         # Try each valid move
-        for move in valid_moves:
+        for index, move in enumerate(moves):
             row, col = move
+
+            # Skip quiet moves that cannot push the score below beta
+            if futile and index > 0 and not _is_tactical(board, row, col, opponent_symbol):
+                if stats is not None:
+                    stats.futility_prunes += 1
+                continue
+
+            reduced = _reduce_late_move(config, board, index, depth, row, col, opponent_symbol)
             
             # Make the move
             board.place_piece(row, col, opponent_symbol)
             
             # Recursively evaluate the position
-            score, _ = alpha_beta(board, depth - 1, alpha, beta, True, eval_fn, player_symbol)
+            if reduced:
+                score, _ = alpha_beta(board, depth - 1 - config.lmr_reduction, alpha, beta, True, eval_fn,
+                                      player_symbol, config)
+                if score < beta:
+                    if stats is not None:
+                        stats.lmr_researches += 1
+                    score, _ = alpha_beta(board, depth - 1, alpha, beta, True, eval_fn, player_symbol, config)
+            else:
+                score, _ = alpha_beta(board, depth - 1, alpha, beta, True, eval_fn, player_symbol, config)
             
             # Undo the move
             board.undo_last_move()
@@ -90,6 +201,56 @@ def alpha_beta(board, depth, alpha, beta, maximizing_player, eval_fn, player_sym
             # Alpha-Beta pruning
             beta = min(beta, best_score)
             if beta <= alpha:
+                if stats is not None:
+                    stats.cutoffs += 1
+                if tables is not None:
+                    tables.record_cutoff(opponent_symbol, move, depth)
+                    tables.record_killer(ply, move)
                 break  # Alpha cutoff
         
+        if tables is not None:
+            _store(tables, board, depth, best_score, best_move, alpha_start, beta_start)
         return best_score, best_move
+
+
+def _generate_moves(board, player, config, buffers, ply):
+    """
+    Write the candidate moves into the buffer of `ply`, narrowed to the
+    forced replies when config.forced_moves is set.
+
+    Returns:
+        int: Number of moves
+    """
+    if config is not None and config.forced_moves:
+        return copy_moves(candidate_moves(board, player, stats=config.stats), buffers, ply)
+    return fill_valid_moves(board, buffers, ply)
+
+
+def _store(tables, board, depth, score, move, alpha, beta):
+    """Record a search result with the bound it represents for the original window"""
+    if score <= alpha:
+        bound = UPPER
+    elif score >= beta:
+        bound = LOWER
+    else:
+        bound = EXACT
+    tables.store(board.hash, depth, score, bound, move)
+
+
+def _is_tactical(board, row, col, player):
+    """A move that wins, makes a four or blocks an immediate win is never pruned or reduced"""
+    return (makes_five(board, row, col, player) or makes_five(board, row, col, -player)
+            or bool(four_gaps(board, row, col, player)))
+
+
+def _reduce_late_move(config, board, index, depth, row, col, player):
+    """Whether a move should be searched at reduced depth first (late move reductions)"""
+    if config is None or not config.lmr:
+        return False
+    if index < config.lmr_min_moves or depth < config.lmr_min_depth:
+        return False
+    if _is_tactical(board, row, col, player):
+        return False
+    if config.stats is not None:
+        config.stats.lmr_reductions += 1
+    return True
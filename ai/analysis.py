@@ -0,0 +1,171 @@
+# Background scoring of the candidate cells, for the GUI's analysis overlay
+
+import queue
+import threading
+
+from ai import evaluation
+from ai.evaluation import DIRECTIONS
+from game.sparse_board import create_board
+
+# A move changes the windows of the cells within WINDOW_REACH along its
+# lines, and the candidate moves within CANDIDATE_DISTANCE
+# (get_valid_moves_with_heuristics)
+WINDOW_REACH = 4
+CANDIDATE_DISTANCE = 2
+FIVE_SCORE = 100000  # The move completes a window
+
+
+def cell_strength(windows, row, col, player):
+    """
+    Strength of an empty cell for `player`, read from the board's live
+    windows (game/windows.py).
+
+    Every window through the cell that the opponent has no stone in scores
+    what the move makes of it (the evaluate_segment weights); every window
+    holding only opponent stones scores what the move blocks.
+
+    Args:
+        windows: LiveWindows of the board
+        row (int): Row of the cell
+        col (int): Column of the cell
+        player (int): The player to move (1 or -1)
+
+    Returns:
+        int: Strength of the move (higher is better)
+    """
+    # Read at call time: set_weights replaces the tables
+    player_scores, opponent_scores = evaluation.PLAYER_SCORES, evaluation.OPPONENT_SCORES
+    mine, theirs = windows.stones[player], windows.stones[-player]
+    score = 0
+    for window in windows.cells[row * windows.size + col]:
+        if theirs[window] == 0:
+            score += FIVE_SCORE if mine[window] == 4 else player_scores[mine[window] + 1]
+        elif mine[window] == 0:
+            score += opponent_scores[theirs[window]]
+    return score
+
+
+def affected_cells(board, row, col):
+    """
+    Cells whose strength or candidacy can change when (row, col) is played:
+    the cell itself, its four lines within window reach and the cells
+    within candidate distance.
+    """
+    cells = {(row, col)}
+    for dr, dc in DIRECTIONS:
+        for step in range(-WINDOW_REACH, WINDOW_REACH + 1):
+            if board.contains(row + step * dr, col + step * dc):
+                cells.add((row + step * dr, col + step * dc))
+    for dr in range(-CANDIDATE_DISTANCE, CANDIDATE_DISTANCE + 1):
+        for dc in range(-CANDIDATE_DISTANCE, CANDIDATE_DISTANCE + 1):
+            if board.contains(row + dr, col + dc):
+                cells.add((row + dr, col + dc))
+    return cells
+
+
+def is_candidate(board, row, col):
+    """An empty cell within candidate distance of a stone"""
+    if board.get_cell(row, col) != 0:
+        return False
+    for dr in range(-CANDIDATE_DISTANCE, CANDIDATE_DISTANCE + 1):
+        for dc in range(-CANDIDATE_DISTANCE, CANDIDATE_DISTANCE + 1):
+            if board.get_cell(row + dr, col + dc):
+                return True
+    return False
+
+
+class AnalysisWorker:
+    """
+    Scores the candidate cells of a game on a background thread, for both
+    sides, so the scores stay valid whoever is to move.
+
+    The worker keeps its own board: tell it the moves with play(). After a
+    move only the cells the move affects are scored again, a batch at a
+    time, and messages are handled between batches, so a newer move
+    supersedes the work in progress. pause() holds the scoring while the
+    engine searches; cancel() stops the thread.
+
+    poll() returns the scores posted since the last call, as
+    {(row, col): (strength for X, strength for O)}, with None for the cells
+    that are no longer candidates.
+    """
+    def __init__(self, size, batch=16):
+        self.size = size
+        self.batch = batch
+        self.inbox = queue.Queue()
+        self.results = queue.Queue()
+        self.running = threading.Event()
+        self.running.set()
+        self.thread = threading.Thread(target=self._run, name="analysis", daemon=True)
+        self.board = None
+        self.scored = set()  # Cells with a score posted
+
+    def start(self, moves=()):
+        """Start scoring the position reached by `moves` ((row, col, player) tuples)"""
+        self.inbox.put(('reset', list(moves)))
+        self.thread.start()
+
+    def play(self, row, col, player):
+        self.inbox.put(('move', row, col, player))
+
+    def pause(self):
+        self.running.clear()
+
+    def resume(self):
+        self.running.set()
+
+    def cancel(self, timeout=1.0):
+        self.inbox.put(('stop',))
+        self.running.set()
+        if self.thread.is_alive():
+            self.thread.join(timeout)
+
+    def poll(self):
+        updates = {}
+        while True:
+            try:
+                updates.update(self.results.get_nowait())
+            except queue.Empty:
+                return updates
+
+    def _apply(self, message):
+        """Play a message on the worker's board; returns the cells to score again"""
+        if message[0] == 'reset':
+            self.board = create_board(self.size)
+            dirty = set(self.scored)
+            for row, col, player in message[1]:
+                self.board.place_piece(row, col, player)
+                dirty |= affected_cells(self.board, row, col)
+            return dirty
+        _, row, col, player = message
+        if not self.board.place_piece(row, col, player):
+            return set()
+        return affected_cells(self.board, row, col)
+
+    def _run(self):
+        dirty = set()
+        while True:
+            # Take every pending message before scoring, so no stale batch is started
+            try:
+                message = self.inbox.get(block=not dirty)
+            except queue.Empty:
+                message = None
+            if message is not None:
+                if message[0] == 'stop':
+                    return
+                dirty |= self._apply(message)
+                continue
+
+            self.running.wait()
+            updates = {}
+            for _ in range(min(self.batch, len(dirty))):
+                row, col = dirty.pop()
+                if is_candidate(self.board, row, col):
+                    updates[(row, col)] = (cell_strength(self.board.windows, row, col, 1),
+                                           cell_strength(self.board.windows, row, col, -1))
+                    self.scored.add((row, col))
+                elif (row, col) in self.scored:
+                    updates[(row, col)] = None
+                    self.scored.discard((row, col))
+            if updates:
+                self.results.put(updates)
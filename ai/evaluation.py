@@ -1,6 +1,38 @@
 # Heuristic functions to evaluate board positions
 # Pattern recognition for threats (open/closed sequences)
 
+from ai.weights import WEIGHTS
+
+
+def pruning_margins(weights):
+    """
+    Pruning margins for the selective search, derived from the segment
+    weights of evaluate_segment: one quiet move rarely gains more than a
+    four-stone segment is worth (futility), and two moves rarely gain more
+    than three of them (razoring).
+
+    Returns:
+        tuple: (futility margin, razor margin)
+    """
+    four = weights['segment_player'][3]
+    return four, 3 * four
+
+
+# Recomputed by set_weights along with the segment scores
+FUTILITY_MARGIN, RAZOR_MARGIN = pruning_margins(WEIGHTS)
+
+# Segment scores by number of stones (index 0 unused), see ai/weights.py
+PLAYER_SCORES = (0,) + tuple(WEIGHTS['segment_player'])
+OPPONENT_SCORES = (0,) + tuple(WEIGHTS['segment_opponent'])
+
+# The directions to check: horizontal, vertical, diagonal, anti-diagonal
+DIRECTIONS = (
+    (0, 1),   # Horizontal
+    (1, 0),   # Vertical
+    (1, 1),   # Diagonal
+    (1, -1)   # Anti-diagonal
+)
+
 def evaluate_board(board, player):
     """
     Evaluate the board state from the perspective of the given player.
@@ -36,33 +68,77 @@ def evaluate_patterns(board, player):
     Returns:
         float: A score based on stone patterns
     """
-    score = 0
+    if board.sparse:
+        return _evaluate_sparse_patterns(board, player)
     
-    # The directions to check: horizontal, vertical, diagonal, anti-diagonal
-    directions = [
-        (0, 1),   # Horizontal
-        (1, 0),   # Vertical
-        (1, 1),   # Diagonal
-        (1, -1)   # Anti-diagonal
-    ]
+    score = 0
+    size = board.size
+    grid = board.board
+    opponent = 3 - player
     
     # Check all positions on the board
-    for row in range(board.size):
-        for col in range(board.size):
+    for row in range(size):
+        for col in range(size):
             # For each position, check in all directions
-            for dr, dc in directions:
+            for dr, dc in DIRECTIONS:
                 # Skip if we don't have enough space in this direction
-                if (row + 4*dr >= board.size or 
+                if (row + 4*dr >= size or 
                     row + 4*dr < 0 or 
-                    col + 4*dc >= board.size or 
+                    col + 4*dc >= size or 
                     col + 4*dc < 0):
                     continue
                 
-                # Extract the 5-stone segment
-                segment = [board.board[row + i*dr][col + i*dc] for i in range(5)]
+                # Count the 5-stone segment in place
+                player_count = opponent_count = empty_count = 0
+                r, c = row, col
+                for _ in range(5):
+                    cell = grid[r][c]
+                    if cell == player:
+                        player_count += 1
+                    elif cell == opponent:
+                        opponent_count += 1
+                    elif cell == 0:
+                        empty_count += 1
+                    r += dr
+                    c += dc
                 
                 # Calculate the pattern score for this segment
-                score += evaluate_segment(segment, player)
+                score += score_counts(player_count, opponent_count, empty_count)
+    
+    return score
+
+
+def _evaluate_sparse_patterns(board, player):
+    """
+    evaluate_patterns for a SparseBoard: segments without a stone score 0,
+    so only the segments through a stone are counted, each one once.
+    """
+    score = 0
+    stones = board.stones
+    opponent = 3 - player
+    
+    for dr, dc in DIRECTIONS:
+        # Start cells of the on-board segments that contain a stone
+        starts = set()
+        for row, col in stones:
+            for back in range(5):
+                r, c = row - back*dr, col - back*dc
+                if board.contains(r, c) and board.contains(r + 4*dr, c + 4*dc):
+                    starts.add((r, c))
+        
+        for r, c in starts:
+            player_count = opponent_count = empty_count = 0
+            for _ in range(5):
+                cell = stones.get((r, c), 0)
+                if cell == player:
+                    player_count += 1
+                elif cell == opponent:
+                    opponent_count += 1
+                elif cell == 0:
+                    empty_count += 1
+                r += dr
+                c += dc
+            score += score_counts(player_count, opponent_count, empty_count)
     
     return score
 
@@ -85,33 +161,69 @@ def evaluate_segment(segment, player):
     opponent_count = segment.count(opponent)
     empty_count = segment.count(0)
     
+    return score_counts(player_count, opponent_count, empty_count)
+
+
+def score_counts(player_count, opponent_count, empty_count):
+    """
+    Score a 5-cell segment from its stone counts (see evaluate_segment).
+    
+    Args:
+        player_count (int): Player stones in the segment
+        opponent_count (int): Opponent stones in the segment
+        empty_count (int): Empty cells in the segment
+        
+    Returns:
+        float: Score based on the pattern found
+    """
     # If there are both player and opponent stones, no potential for 5 in a row
     if player_count > 0 and opponent_count > 0:
         return 0
     
-    # If there are only player stones and empty spaces
+    # If there are only player stones and empty spaces: 1000 for 4 in a row
+    # (one move away from winning), 100 for 3, 10 for 2, 1 for 1 by default
     if player_count > 0 and empty_count > 0:
-        # Score based on the number of player stones (exponential scoring)
-        if player_count == 4:   # 4 in a row, one move away from winning
-            return 1000
-        elif player_count == 3: # 3 in a row
-            return 100
-        elif player_count == 2: # 2 in a row
-            return 10
-        elif player_count == 1: # 1 stone
-            return 1
-    
-    # If there are only opponent stones and empty spaces
+        return PLAYER_SCORES[player_count]
+    
+    # If there are only opponent stones and empty spaces, we score
+    # defensively but slightly lower than offensive scores (900, 90, 9, 0)
     if opponent_count > 0 and empty_count > 0:
-        # We'll score defensively but slightly lower than offensive scores
-        if opponent_count == 4:   # Block opponent's 4 in a row
-            return 900
-        elif opponent_count == 3: # Block opponent's 3 in a row
-            return 90
-        elif opponent_count == 2: # Block opponent's 2 in a row
-            return 9
-        elif opponent_count == 1: # Block opponent's 1 stone
-            return 0
+        return OPPONENT_SCORES[opponent_count]
     
     # Empty segment
-    return 0
\ No newline at end of file
+    return 0
+
+
+def segment_features(board, player):
+    """
+    Segment counts behind evaluate_board, for weight tuning: the score is
+    the dot product of these counts with segment_player + segment_opponent.
+    
+    Args:
+        board: The current board state
+        player (int): The player number, as for evaluate_board
+        
+    Returns:
+        list: 8 counts, segments with 1..4 player stones then 1..4 opponent
+              stones, counted positively for `player` and negatively for
+              the other side, like the two terms of evaluate_board
+    """
+    features = [0] * 8
+    for side, sign in ((player, 1), (3 - player, -1)):
+        opponent = 3 - side
+        for row in range(board.size):
+            for col in range(board.size):
+                for dr, dc in DIRECTIONS:
+                    segment = [board.get_cell(row + i*dr, col + i*dc) for i in range(5)]
+                    if None in segment:
+                        continue
+                    player_count = segment.count(side)
+                    opponent_count = segment.count(opponent)
+                    empty_count = segment.count(0)
+                    if player_count > 0 and opponent_count > 0:
+                        continue
+                    if player_count > 0 and empty_count > 0:
+                        features[player_count - 1] += sign
+                    elif opponent_count > 0 and empty_count > 0:
+                        features[3 + opponent_count] += sign
+    return features
@@ -0,0 +1,379 @@
+import math
+import multiprocessing
+import random
+import threading
+import time
+
+from game.game_rules import check_win, get_valid_moves_with_heuristics
+from ai.move_ordering import score_move
+
+
+class MCTSNode:
+    """
+    A node in the search tree.
+
+    `player` is the symbol of the player who placed the stone at `move`,
+    and `wins` is counted from that player's point of view.
+    """
+    __slots__ = ('move', 'player', 'parent', 'children', 'untried', 'priors',
+                 'visits', 'wins', 'prior', 'winner', 'expanded')
+
+    def __init__(self):
+        self.reset(None, 0, None, 0.0)
+
+    def reset(self, move, player, parent, prior):
+        self.move = move
+        self.player = player
+        self.parent = parent
+        self.children = []
+        self.untried = None
+        self.priors = None
+        self.visits = 0
+        self.wins = 0.0
+        self.prior = prior
+        self.winner = None  # Set for terminal nodes: symbol of the winner, or 0 for a draw
+        self.expanded = False
+
+
+class NodePool:
+    """
+    Fixed-capacity allocator for tree nodes.
+
+    Nodes released from discarded subtrees go back on a free list and are
+    handed out again, so the tree never grows past `capacity` nodes.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.allocated = 0
+        self.free = []
+
+    def acquire(self, move, player, parent, prior):
+        if self.free:
+            node = self.free.pop()
+        elif self.allocated < self.capacity:
+            node = MCTSNode()
+            self.allocated += 1
+        else:
+            return None
+        node.reset(move, player, parent, prior)
+        return node
+
+    def release(self, node):
+        """Return a node and its whole subtree to the free list"""
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            stack.extend(current.children)
+            current.children = []
+            current.parent = None
+            self.free.append(current)
+
+    @property
+    def in_use(self):
+        return self.allocated - len(self.free)
+
+
+def rollout(grid, size, to_move, rng, max_moves, neighbourhood=1):
+    """
+    Play a fast random game on a flat copy of the board.
+
+    Moves are drawn uniformly from the empty cells next to existing stones.
+
+    Args:
+        grid (list): Flat list of size*size cells (modified in place)
+        size (int): Board size
+        to_move (int): Symbol of the player to move
+        rng: random.Random instance
+        max_moves (int): Rollout length limit; reaching it counts as a draw
+        neighbourhood (int): Distance from stones for candidate cells
+
+    Returns:
+        int: Symbol of the winner, or 0 for a draw
+    """
+    candidates = set()
+    for index, cell in enumerate(grid):
+        if cell != 0:
+            _add_neighbours(grid, size, index, neighbourhood, candidates)
+    if not candidates:
+        candidates.add((size // 2) * size + size // 2)
+
+    player = to_move
+    for _ in range(max_moves):
+        if not candidates:
+            return 0
+        index = rng.choice(tuple(candidates))
+        candidates.discard(index)
+        grid[index] = player
+        if _flat_five(grid, size, index, player):
+            return player
+        _add_neighbours(grid, size, index, neighbourhood, candidates)
+        player = -player
+    return 0
+
+
+def _add_neighbours(grid, size, index, distance, candidates):
+    row, col = divmod(index, size)
+    for r in range(max(0, row - distance), min(size, row + distance + 1)):
+        base = r * size
+        for c in range(max(0, col - distance), min(size, col + distance + 1)):
+            if grid[base + c] == 0:
+                candidates.add(base + c)
+
+
+def _flat_five(grid, size, index, player):
+    row, col = divmod(index, size)
+    for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        count = 1
+        for sign in (1, -1):
+            r, c = row + sign * dr, col + sign * dc
+            while 0 <= r < size and 0 <= c < size and grid[r * size + c] == player:
+                count += 1
+                r += sign * dr
+                c += sign * dc
+        if count >= 5:
+            return True
+    return False
+
+
+def _completes_five(board, move, player):
+    row, col = move
+    board.set_cell(row, col, player)
+    wins = check_win(board, row, col)
+    board.set_cell(row, col, 0)
+    return wins
+
+
+def _rollout_batch(args):
+    """Process-pool entry point: run one rollout per job"""
+    grid, size, to_move, seed, max_moves, neighbourhood = args
+    return rollout(grid, size, to_move, random.Random(seed), max_moves, neighbourhood)
+
+
+class MCTSEngine:
+    """
+    Monte Carlo Tree Search (UCT) engine for Gomoku.
+
+    Candidate moves are limited to the neighbourhood of existing stones (or
+    to the winning move / forced blocks when there are any) and ranked by the
+    `order_moves` pattern scores, which also serve as priors in
+    the selection formula. Rollouts can be spread over a process pool (leaf
+    parallelism), the tree is kept between moves and memory is bounded by a
+    recycling node pool.
+
+    The engine plugs into AIPlayer in place of a search function:
+
+        AIPlayer(-1, algorithm=MCTSEngine(time_limit=2.0))
+    """
+
+    def __init__(self, time_limit=1.0, max_iterations=None, exploration=1.4, prior_weight=1.0,
+                 max_children=15, neighbourhood=2, rollout_moves=60, max_nodes=200000,
+                 workers=1, batch_size=None, seed=None):
+        """
+        Args:
+            time_limit (float): Per-move time budget in seconds (None for no limit)
+            max_iterations (int): Per-move iteration cap (None for no cap)
+            exploration (float): UCT exploration constant
+            prior_weight (float): Weight of the pattern-score prior bonus
+            max_children (int): Number of best-ranked candidates kept per node
+            neighbourhood (int): Distance from stones for candidate moves
+            rollout_moves (int): Rollout length limit
+            max_nodes (int): Capacity of the node pool
+            workers (int): Rollout processes (1 runs rollouts in-process)
+            batch_size (int): Leaves selected per parallel batch (defaults to 2*workers)
+            seed (int): Seed for reproducible searches
+        """
+        if time_limit is None and max_iterations is None:
+            max_iterations = 1000
+        self.time_limit = time_limit
+        self.max_iterations = max_iterations
+        self.exploration = exploration
+        self.prior_weight = prior_weight
+        self.max_children = max_children
+        self.neighbourhood = neighbourhood
+        self.rollout_moves = rollout_moves
+        self.workers = max(1, workers)
+        self.batch_size = batch_size or (2 * self.workers if self.workers > 1 else 1)
+        self.rng = random.Random(seed)
+        self.pool = NodePool(max_nodes)
+        self.root = None
+        self.root_history = ()
+        self.iterations = 0
+        self._process_pool = None
+        self._stop = threading.Event()
+
+    def get_move(self, board, player_symbol):
+        """
+        Search the position and return the best move for `player_symbol`.
+
+        Returns:
+            tuple: (row, col)
+        """
+        self._stop.clear()
+        self._sync_root(board, player_symbol)
+        deadline = time.time() + self.time_limit if self.time_limit is not None else None
+
+        self.iterations = 0
+        while not self._stop.is_set():
+            if self.max_iterations is not None and self.iterations >= self.max_iterations:
+                break
+            if deadline is not None and time.time() >= deadline:
+                break
+            if self.root.winner is not None:
+                break
+            self._run_batch(board)
+
+        if not self.root.children:
+            self._expand(self.root, board)
+        if not self.root.children:
+            center = board.size // 2
+            return center, center
+
+        best = max(self.root.children, key=lambda child: (child.visits, child.wins))
+        return best.move
+
+    def stop(self):
+        """Ask a running search to return its current best move"""
+        self._stop.set()
+
+    def new_game(self):
+        """Forget the tree kept from previous moves"""
+        if self.root is not None:
+            self.pool.release(self.root)
+        self.root = None
+        self.root_history = ()
+
+    def close(self):
+        if self._process_pool is not None:
+            self._process_pool.terminate()
+            self._process_pool = None
+
+    def _sync_root(self, board, player_symbol):
+        """Reuse the subtree reached by the moves played since the last search"""
+        history = tuple(board.move_history)
+        root_player = history[-1][2] if history else -player_symbol
+
+        if self.root is not None and history[:len(self.root_history)] == self.root_history:
+            node = self.root
+            for row, col, _ in history[len(self.root_history):]:
+                child = next((c for c in node.children if c.move == (row, col)), None)
+                if child is None:
+                    break
+                node.children.remove(child)
+                self.pool.release(node)
+                child.parent = None
+                node = child
+            else:
+                if node.player == root_player:
+                    self.root = node
+                    self.root_history = history
+                    return
+            # The nodes passed on the way are already free: only the subtree still held is left
+            self.root = node
+
+        self.new_game()
+        last = history[-1] if history else None
+        self.root = self.pool.acquire(last[:2] if last else None, root_player, None, 1.0)
+        self.root_history = history
+
+    def _select_score(self, child, log_parent):
+        if child.visits == 0:
+            return float('inf')
+        exploit = child.wins / child.visits
+        explore = self.exploration * math.sqrt(log_parent / child.visits)
+        bias = self.prior_weight * child.prior / (1 + child.visits)
+        return exploit + explore + bias
+
+    def _expand(self, node, board):
+        """Generate the ranked candidate list of a node"""
+        node.expanded = True
+        to_move = -node.player
+        moves = get_valid_moves_with_heuristics(board, distance=self.neighbourhood)
+
+        # Decisive moves: win now if possible, otherwise block every immediate win
+        winning = [move for move in moves if _completes_five(board, move, to_move)]
+        if winning:
+            moves = winning[:1]
+        else:
+            blocking = [move for move in moves if _completes_five(board, move, -to_move)]
+            if blocking:
+                moves = blocking
+
+        scored = sorted(((score_move(board, r, c, to_move, -to_move), (r, c)) for r, c in moves),
+                        reverse=True)[:self.max_children]
+        total = sum(score for score, _ in scored) or 1.0
+        # Stored reversed so that pop() yields the best remaining candidate
+        node.untried = [move for _, move in reversed(scored)]
+        node.priors = {move: score / total for score, move in scored}
+        if not node.untried and not node.children:
+            node.winner = 0
+
+    def _descend(self, board):
+        """Selection and expansion; returns the path and the moves applied to the board"""
+        node = self.root
+        path = [node]
+        while node.winner is None:
+            if not node.expanded:
+                self._expand(node, board)
+                if node.winner is not None:
+                    break
+            if node.untried:
+                move = node.untried[-1]
+                child = self.pool.acquire(move, -node.player, node, node.priors[move])
+                if child is None:
+                    break  # Node pool exhausted: evaluate this leaf by rollout only
+                node.untried.pop()
+                node.children.append(child)
+                child.visits = 1
+                board.place_piece(move[0], move[1], child.player)
+                if check_win(board, move[0], move[1]):
+                    child.winner = child.player
+                elif board.is_full() or board.is_dead_draw():
+                    child.winner = 0
+                path.append(child)
+                break
+            if not node.children:
+                break
+            log_parent = math.log(node.visits + 1)
+            node = max(node.children, key=lambda child: self._select_score(child, log_parent))
+            # Virtual loss keeps other leaves of the same batch away from this path
+            node.visits += 1
+            board.place_piece(node.move[0], node.move[1], node.player)
+            path.append(node)
+        return path
+
+    def _run_batch(self, board):
+        jobs = []
+        paths = []
+        for _ in range(self.batch_size):
+            path = self._descend(board)
+            leaf = path[-1]
+            if leaf.winner is None:
+                grid = [cell for row in board.get_board_copy() for cell in row]
+                jobs.append((grid, board.size, -leaf.player, self.rng.getrandbits(32),
+                             self.rollout_moves, 1))
+            paths.append(path)
+            for _ in range(len(path) - 1):
+                board.undo_last_move()
+
+        if self.workers > 1 and len(jobs) > 1:
+            if self._process_pool is None:
+                self._process_pool = multiprocessing.Pool(self.workers)
+            outcomes = iter(self._process_pool.map(_rollout_batch, jobs))
+        else:
+            outcomes = iter([_rollout_batch(job) for job in jobs])
+
+        for path in paths:
+            leaf = path[-1]
+            winner = leaf.winner if leaf.winner is not None else next(outcomes)
+            self._backpropagate(path, winner)
+            self.iterations += 1
+
+    def _backpropagate(self, path, winner):
+        # Nodes below the root were already counted during selection
+        path[0].visits += 1
+        for node in path:
+            if winner == 0:
+                node.wins += 0.5
+            elif winner == node.player:
+                node.wins += 1
@@ -1,6 +1,13 @@
+from itertools import islice
+
 from game.game_rules import check_win, get_valid_moves_with_heuristics
+from ai.threats import candidate_moves, horizon_threat, search_forcing
+from ai.search_buffers import copy_moves, fill_valid_moves, get_buffers
+from ai.move_ordering import beam_moves, staged_moves
+from ai.search_config import check_deadline
 
-def minimax(board, depth, alpha, beta, maximizing_player, eval_fn, player_symbol, max_moves=10):
+def minimax(board, depth, alpha, beta, maximizing_player, eval_fn, player_symbol, max_moves=10, config=None,
+            extension=0):
     """
     Optimized Minimax with Alpha-Beta pruning and heuristic move limiting for Gomoku.
 
@@ -13,10 +20,26 @@ def minimax(board, depth, alpha, beta, maximizing_player, eval_fn, player_symbol
         eval_fn: Evaluation function to score board states.
         player_symbol: Symbol of the current player (1 or -1).
         max_moves: Limit the number of heuristic-based moves to explore per turn.
+        config: Optional SearchConfig (threat extensions and statistics).
+        extension: Plies of threat extension already used on this path.
 
     Returns:
         Tuple: (best_score, best_move)
     """
+    if config is not None and config.tracer is not None:
+        return config.tracer.trace(_minimax, board, depth, alpha, beta, maximizing_player, eval_fn, player_symbol,
+                                   max_moves, config, extension)
+    return _minimax(board, depth, alpha, beta, maximizing_player, eval_fn, player_symbol, max_moves, config, extension)
+
+
+def _minimax(board, depth, alpha, beta, maximizing_player, eval_fn, player_symbol, max_moves=10, config=None,
+             extension=0):
+    stats = config.stats if config is not None else None
+    if stats is not None:
+        stats.nodes += 1
+    if config is not None and config.deadline is not None:
+        check_deadline(config)
+
     if board.last_move:
         last_row, last_col, _ = board.last_move
         if check_win(board, last_row, last_col):
@@ -25,34 +48,71 @@ def minimax(board, depth, alpha, beta, maximizing_player, eval_fn, player_symbol
             else:
                 return -1000000, None  # Loss
 
-    if depth == 0 or board.is_full():
+    # No five can be completed any more: an exact draw, whatever is played
+    if board.is_dead_draw():
+        if stats is not None:
+            stats.dead_draws += 1
+        moves = board.get_valid_moves()
+        return 0, moves[0] if moves else None
+
+    if depth <= 0 or board.is_full():
+        # Do not stop in the middle of a four or open three
+        if (depth <= 0 and config is not None and config.extensions
+                and extension < config.max_extension and horizon_threat(board)):
+            return search_forcing(board, alpha, beta, maximizing_player, eval_fn, player_symbol, config,
+                                  lambda alpha, beta: minimax(board, 0, alpha, beta, not maximizing_player, eval_fn,
+                                                              player_symbol, max_moves, config, extension + 1))
+        if stats is not None:
+            stats.evals += 1
         return eval_fn(board, player_symbol), None
 
-    valid_moves = get_valid_moves_with_heuristics(board)
-
-    # Sort moves by proximity to last move (helps pruning efficiency)
-    if board.last_move:
+    # Generate moves into this ply's preallocated buffer
+    mover = player_symbol if maximizing_player else -player_symbol
+    buffers = get_buffers(board.size)
+    buffers.ensure(depth)
+    valid_moves = buffers.moves[depth]
+    if config is not None and config.forced_moves:
+        move_count = copy_moves(candidate_moves(board, mover, stats=stats), buffers, depth)
+    else:
+        move_count = fill_valid_moves(board, buffers, depth)
+
+    if config is not None and config.beam:
+        # Adaptive beam: the best scored moves, as many as are close to the best one
+        move_count = beam_moves(board, valid_moves, buffers.scores[depth], move_count, mover, buffers.line,
+                                config.beam_widths.get(depth, max_moves), config.beam_margin)
+    elif board.last_move:
+        # Sort moves by proximity to last move (helps pruning efficiency)
         last_row, last_col, _ = board.last_move
-        valid_moves.sort(key=lambda move: abs(move[0] - last_row) + abs(move[1] - last_col))
+        sort_by_distance(valid_moves, buffers.scores[depth], move_count, last_row, last_col)
 
-    # Limit moves to top-N heuristically chosen
-    valid_moves = valid_moves[:max_moves]
+    # Wins and blocks first, then killers, then the closest moves, limited to top-N
+    tables = config.tables if config is not None else None
+    ply = len(board.move_history)
+    moves = staged_moves(board, valid_moves, move_count, mover,
+                         killers=tables.killers.get(ply) if tables is not None else None)
+    if config is None or not config.beam:
+        move_count = min(move_count, max_moves)
 
     best_move = None
 
     if maximizing_player:
         max_eval = float('-inf')
-        for row, col in valid_moves:
+        for move in islice(moves, move_count):
+            row, col = move
             board.place_piece(row, col, player_symbol)
-            eval_score, _ = minimax(board, depth - 1, alpha, beta, False, eval_fn, player_symbol, max_moves)
+            eval_score, _ = minimax(board, depth - 1, alpha, beta, False, eval_fn, player_symbol, max_moves, config)
             board.undo_last_move()
 
             if eval_score > max_eval:
                 max_eval = eval_score
-                best_move = (row, col)
+                best_move = move
 
             alpha = max(alpha, eval_score)
             if beta <= alpha:
+                if stats is not None:
+                    stats.cutoffs += 1
+                if tables is not None:
+                    tables.record_killer(ply, move)
                 break  # Beta cutoff
 
         return max_eval, best_move
@@ -60,17 +120,42 @@ def minimax(board, depth, alpha, beta, maximizing_player, eval_fn, player_symbol
     else:
         min_eval = float('inf')
         opponent = -player_symbol
-        for row, col in valid_moves:
+        for move in islice(moves, move_count):
+            row, col = move
             board.place_piece(row, col, opponent)
-            eval_score, _ = minimax(board, depth - 1, alpha, beta, True, eval_fn, player_symbol, max_moves)
+            eval_score, _ = minimax(board, depth - 1, alpha, beta, True, eval_fn, player_symbol, max_moves, config)
             board.undo_last_move()
 
             if eval_score < min_eval:
                 min_eval = eval_score
-                best_move = (row, col)
+                best_move = move
 
             beta = min(beta, eval_score)
             if beta <= alpha:
+                if stats is not None:
+                    stats.cutoffs += 1
+                if tables is not None:
+                    tables.record_killer(ply, move)
                 break  # Alpha cutoff
 
         return min_eval, best_move
+
+
+def sort_by_distance(moves, keys, count, last_row, last_col):
+    """
+    Sort the first `count` buffered moves in place by Manhattan distance to
+    the last move, ties broken by (row, col).
+    """
+    for i in range(count):
+        row, col = moves[i]
+        keys[i] = abs(row - last_row) + abs(col - last_col)
+    for i in range(1, count):
+        move = moves[i]
+        key = keys[i]
+        j = i - 1
+        while j >= 0 and (keys[j] > key or (keys[j] == key and moves[j] > move)):
+            moves[j + 1] = moves[j]
+            keys[j + 1] = keys[j]
+            j -= 1
+        moves[j + 1] = move
+        keys[j + 1] = key
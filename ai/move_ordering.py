@@ -1,94 +1,304 @@
+from ai.threats import is_threat, makes_five, three_defences
+from ai.weights import WEIGHTS
+
+# Largest history bonus, below the value of making an open two, so that
+# history only reorders moves the patterns score alike
+HISTORY_CAP = 4
+
+# Scores of (open four, four, open three, three, open two, two), see ai/weights.py
+PATTERN_SCORES = tuple(WEIGHTS['pattern'])
+
+# Pattern tables per player, built once: (open four, fours, open three, threes, open two, twos)
+_PATTERNS = {}
+
+
+def _patterns(player):
+    patterns = _PATTERNS.get(player)
+    if patterns is None:
+        p = player
+        patterns = (
+            (0, p, p, p, p, 0),
+            ((p, p, p, p, 0), (0, p, p, p, p)),
+            (0, p, p, p, 0),
+            ((p, p, p, 0), (0, p, p, p)),
+            (0, p, p, 0),
+            ((p, p, 0), (0, p, p)),
+        )
+        _PATTERNS[player] = patterns
+    return patterns
+
+
 def order_moves(board, moves, player):
     """
     Order moves for better alpha-beta pruning efficiency.
-        
+
     Returns:
         list: Ordered list of (row, col) tuples
     """
     opponent = 3 - player  # 1 -> 2, 2 -> 1
-    
+    line = [0] * 9
+
     # Assign a score to each move
     move_scores = []
     for row, col in moves:
-        score = score_move(board, row, col, player, opponent)
+        score = score_move(board, row, col, player, opponent, line)
         move_scores.append((score, row, col))
-    
+
     # Sort moves by score (higher score first)
     move_scores.sort(reverse=True)
-    
+
     # Return ordered moves
     return [(row, col) for _, row, col in move_scores]
 
 
-def score_move(board, row, col, player, opponent):
+def order_moves_into(board, moves, scores, count, player, line, history=None):
+    """
+    Allocation-free variant of order_moves working on preallocated buffers.
+
+    The first `count` entries of `moves` are scored into `scores` and both
+    lists are sorted in place, in the same order order_moves would return.
+
+    Args:
+        board: The current board state
+        moves (list): Move buffer holding (row, col) tuples
+        scores (list): Score buffer of at least `count` entries
+        count (int): Number of moves in the buffer
+        player (int): The player to move
+        line (list): 9-entry line buffer used by the pattern checks
+        history (dict): Optional history counters per move, added as a bonus of at most HISTORY_CAP
+    """
+    _score_moves(board, moves, scores, 0, count, player, line, history)
+
+    # Insertion sort on (score, row, col), highest first, like order_moves
+    for i in range(1, count):
+        move = moves[i]
+        score = scores[i]
+        j = i - 1
+        while j >= 0 and (scores[j] < score or (scores[j] == score and moves[j] < move)):
+            moves[j + 1] = moves[j]
+            scores[j + 1] = scores[j]
+            j -= 1
+        moves[j + 1] = move
+        scores[j + 1] = score
+
+
+def _score_moves(board, moves, scores, start, count, player, line, history):
+    """Score the buffered moves start..count-1, adding the capped history bonus"""
+    opponent = 3 - player  # Same convention as order_moves
+    for i in range(start, count):
+        row, col = moves[i]
+        scores[i] = score_move(board, row, col, player, opponent, line)
+    if history:
+        for i in range(start, count):
+            bonus = history.get(moves[i])
+            if bonus:
+                scores[i] += min(bonus, HISTORY_CAP)
+
+
+def staged_moves(board, moves, count, player, scores=None, line=None, hash_move=None, killers=None,
+                 history=None):
+    """
+    Yield the first `count` buffered moves lazily, in stages:
+
+    1. moves completing five for `player`, then moves blocking a five of the opponent;
+    2. the hash move (transposition table or principal variation);
+    3. the killer moves of this ply;
+    4. the rest: with a `scores` buffer, best first in the order of
+       order_moves_into, each picked by selection among the moves left;
+       without one, in buffer order.
+
+    The rest are only scored once stage 4 is reached, so a cutoff on an
+    earlier move skips the pattern scoring of the node. Moves already
+    yielded are moved to the front of the buffer, the moves they pass
+    shifting down one slot in their order, so with minimax's max_moves cut
+    only the last moves of the buffer fall past it; the hash move and the
+    killers are only tried if they are among the `count` moves.
+
+    Args:
+        board: The current board state
+        moves (list): Move buffer holding (row, col) tuples
+        count (int): Number of moves in the buffer
+        player (int): The player to move
+        scores (list): Score buffer for stage 4 (None keeps the buffer order)
+        line (list): 9-entry line buffer used by the pattern checks
+        hash_move (tuple): Move to try after the wins and blocks
+        killers (list): Moves that caused a cutoff at this ply
+        history (dict): Optional history counters per move, as in order_moves_into
+    """
+    front = 0
+
+    # A five needs four stones of one side, so skip the scan before that
+    if len(board.move_history) >= 7:
+        for side in (player, -player):
+            for i in range(front, count):
+                row, col = moves[i]
+                if makes_five(board, row, col, side):
+                    _promote(moves, front, i)
+                    front += 1
+                    yield moves[front - 1]
+
+    if hash_move is not None and _bring_forward(moves, front, count, hash_move):
+        front += 1
+        yield moves[front - 1]
+    if killers:
+        for killer in killers:
+            if killer is not None and _bring_forward(moves, front, count, killer):
+                front += 1
+                yield moves[front - 1]
+
+    if scores is None:
+        for i in range(front, count):
+            yield moves[i]
+        return
+
+    _score_moves(board, moves, scores, front, count, player, line, history)
+    for i in range(front, count):
+        # Selection of the best move left, ties to the larger (row, col) like the insertion sort
+        best = i
+        for j in range(i + 1, count):
+            if scores[j] > scores[best] or (scores[j] == scores[best] and moves[j] > moves[best]):
+                best = j
+        if best != i:
+            moves[i], moves[best] = moves[best], moves[i]
+            scores[i], scores[best] = scores[best], scores[i]
+        yield moves[i]
+
+
+def _promote(moves, front, index):
+    """Move moves[index] to index `front`, shifting moves front..index-1 down one slot"""
+    move = moves[index]
+    for i in range(index, front, -1):
+        moves[i] = moves[i - 1]
+    moves[front] = move
+
+
+def _bring_forward(moves, front, count, move):
+    """Promote `move` to index `front` if it is among moves front..count-1; returns whether it was"""
+    for i in range(front, count):
+        if moves[i] == move:
+            _promote(moves, front, i)
+            return True
+    return False
+
+
+def beam_moves(board, moves, scores, count, player, line, width, margin):
+    """
+    Narrow the buffered moves to an adaptive beam, best first.
+
+    The moves are ordered as by order_moves_into. Forced moves are always
+    kept and come first: wins, blocks of a five and, after an opponent move
+    that made a four or open three, the defences against its open threes.
+    Of the others, those scoring within `margin` of the best move are kept,
+    at most `width` of them, so a position with one standout move is
+    searched narrowly and a quiet one up to the full width.
+
+    Args:
+        board: The current board state
+        moves (list): Move buffer holding (row, col) tuples
+        scores (list): Score buffer of at least `count` entries
+        count (int): Number of moves in the buffer
+        player (int): The player to move
+        line (list): 9-entry line buffer used by the pattern checks
+        width (int): Most unforced moves kept
+        margin (float): Largest score difference to the best move kept
+
+    Returns:
+        int: Number of moves kept at the front of the buffer
+    """
+    if count == 0:
+        return 0
+    order_moves_into(board, moves, scores, count, player, line)
+
+    forced = set()
+    if len(board.move_history) >= 7:
+        for i in range(count):
+            row, col = moves[i]
+            if makes_five(board, row, col, player) or makes_five(board, row, col, -player):
+                forced.add(moves[i])
+    last = board.last_move
+    if last is not None and last[2] == -player and is_threat(board, last[0], last[1]):
+        forced.update(three_defences(board, -player, moves[:count]))
+
+    # Forced moves to the front, then the best of the rest; both keep their order
+    kept = [i for i in range(count) if moves[i] in forced]
+    limit = len(kept) + width
+    cutoff = scores[0] - margin
+    for i in range(count):
+        if len(kept) >= limit or scores[i] < cutoff:
+            break
+        if moves[i] not in forced:
+            kept.append(i)
+    selected = [(moves[i], scores[i]) for i in kept]
+    for index, (move, score) in enumerate(selected):
+        moves[index] = move
+        scores[index] = score
+    return len(selected)
+
+
+def score_move(board, row, col, player, opponent, line=None):
     """
     Score a move based on patterns it creates/blocks.
-    
+
+    The move is not placed on the board: the pattern checks read the board
+    in place and treat (row, col) as holding the stone being tested.
+
     Args:
         board: The current board state
         row (int): Row of the move
         col (int): Column of the move
         player (int): The player making the move
         opponent (int): The opponent player
-        
+        line (list): Optional 9-entry buffer reused by the pattern checks
+
     Returns:
         float: Score for the move (higher is better)
     """
+    if line is None:
+        line = [0] * 9
     score = 0
-    
-    # Check in all 8 directions
-    directions = [
-        (0, 1),   # Right
-        (1, 1),   # Down-Right
-        (1, 0),   # Down
-        (1, -1),  # Down-Left
-        (0, -1),  # Left
-        (-1, -1), # Up-Left
-        (-1, 0),  # Up
-        (-1, 1)   # Up-Right
-    ]
-    
-    # Score for creating patterns
-    for dr, dc in directions:
-        # Place stone temporarily
-        
-        # board.grid[row][col] = player
-        board.set_cell(row, col, player)
-        
-        # Check patterns for player
-        pattern_score = check_pattern_score(board, row, col, dr, dc, player)
-        score += pattern_score
-        
-        # Undo temporary placement
-        board.set_cell(row, col, 0)
-    
+
+    # Score for creating patterns. Opposite directions see the same line, so
+    # each line is checked once and added twice, in the original 8-direction order
+    p0 = _line_pattern_score(board, row, col, 0, 1, player, player, line)
+    p1 = _line_pattern_score(board, row, col, 1, 1, player, player, line)
+    p2 = _line_pattern_score(board, row, col, 1, 0, player, player, line)
+    p3 = _line_pattern_score(board, row, col, 1, -1, player, player, line)
+    score += p0
+    score += p1
+    score += p2
+    score += p3
+    score += p0
+    score += p1
+    score += p2
+    score += p3
+
     # Score for blocking opponent's patterns
-    for dr, dc in directions:
-        # Place opponent's stone temporarily
-        
-        # board.grid[row][col] = opponent
-        board.set_cell(row, col, opponent)
-        
-        # Check patterns for opponent
-        pattern_score = check_pattern_score(board, row, col, dr, dc, opponent)
-        score += pattern_score * 0.9  # Blocking is slightly less valuable than creating
-        
-        # Undo temporary placement
-        board.set_cell(row, col, 0)
-        
+    o0 = _line_pattern_score(board, row, col, 0, 1, opponent, opponent, line)
+    o1 = _line_pattern_score(board, row, col, 1, 1, opponent, opponent, line)
+    o2 = _line_pattern_score(board, row, col, 1, 0, opponent, opponent, line)
+    o3 = _line_pattern_score(board, row, col, 1, -1, opponent, opponent, line)
+    score += o0 * 0.9  # Blocking is slightly less valuable than creating
+    score += o1 * 0.9
+    score += o2 * 0.9
+    score += o3 * 0.9
+    score += o0 * 0.9
+    score += o1 * 0.9
+    score += o2 * 0.9
+    score += o3 * 0.9
+
     # Bonus for center and near-center positions
     center = board.size // 2
     distance_from_center = abs(row - center) + abs(col - center)
     center_score = max(0, 5 - distance_from_center) * 2
     score += center_score
-    
+
     return score
 
 
 def check_pattern_score(board, row, col, dr, dc, player):
     """
     Check for patterns in a specific direction.
-    
+
     Args:
         board: The current board state
         row (int): Row of the move
@@ -96,78 +306,102 @@ def check_pattern_score(board, row, col, dr, dc, player):
         dr (int): Row direction (-1, 0, or 1)
         dc (int): Column direction (-1, 0, or 1)
         player (int): The player to check patterns for
-        
+
     Returns:
         float: Score based on the patterns found
     """
-    # Initialize pattern counts
-    open_four = 0   # ●●●●_
-    four = 0        # ●●●●
-    open_three = 0  # _●●●_
-    three = 0       # ●●●
-    open_two = 0    # _●●_
-    two = 0         # ●●
-    
-    # Check forward and backward to find patterns
-    segment = []
-    for i in range(-4, 5):  # Check 9 positions (4 on each side plus the move position)
-        r, c = row + i*dr, col + i*dc
-        if 0 <= r < board.size and 0 <= c < board.size:
-            segment.append(board.get_cell(r, c))
-        else:
-            segment.append(-1)  # Out of bounds
-    
-    # Find patterns in the segment
-    if len(segment) >= 5:
-        # Check for open four: _●●●●_
-        if contains_pattern(segment, [0, player, player, player, player, 0], player):
-            open_four += 1
-        
-        # Check for four: ●●●●_ or _●●●●
-        if (contains_pattern(segment, [player, player, player, player, 0], player) or
-            contains_pattern(segment, [0, player, player, player, player], player)):
-            four += 1
-        
-        # Check for open three: _●●●_
-        if contains_pattern(segment, [0, player, player, player, 0], player):
-            open_three += 1
-        
-        # Check for three: ●●●_ or _●●●
-        if (contains_pattern(segment, [player, player, player, 0], player) or
-            contains_pattern(segment, [0, player, player, player], player)):
-            three += 1
-        
-        # Check for open two: _●●_
-        if contains_pattern(segment, [0, player, player, 0], player):
-            open_two += 1
-        
-        # Check for two: ●●_ or _●●
-        if (contains_pattern(segment, [player, player, 0], player) or
-            contains_pattern(segment, [0, player, player], player)):
-            two += 1
-    
-    # Calculate score based on patterns found
-    score = (
-        open_four * 1000 +
-        four * 100 +
-        open_three * 50 +
-        three * 10 +
-        open_two * 5 +
-        two * 1
-    )
-    
+    return _line_pattern_score(board, row, col, dr, dc, player, board.get_cell(row, col), [0] * 9)
+
+
+def _line_pattern_score(board, row, col, dr, dc, player, center, line):
+    """
+    check_pattern_score reading the board in place, with `center` standing
+    in for the value of (row, col) and `line` as the 9-cell buffer.
+    """
+    # Check forward and backward to find patterns (4 on each side plus the move position)
+    r, c = row - 4*dr, col - 4*dc
+    if board.sparse:
+        for i in range(9):
+            cell = center if i == 4 else board.get_cell(r, c)
+            line[i] = -1 if cell is None else cell  # Out of bounds
+            r += dr
+            c += dc
+    else:
+        size = board.size
+        grid = board.board
+        for i in range(9):
+            if i == 4:
+                line[i] = center
+            elif 0 <= r < size and 0 <= c < size:
+                line[i] = grid[r][c]
+            else:
+                line[i] = -1  # Out of bounds
+            r += dr
+            c += dc
+
+    open_four, fours, open_three, threes, open_two, twos = _patterns(player)
+    weights = PATTERN_SCORES
+
+    # Calculate score based on patterns found (default weights 1000/100/50/10/5/1)
+    score = 0
+    if contains_pattern(line, open_four, player):
+        score += weights[0]  # _●●●●_
+    if contains_pattern(line, fours[0], player) or contains_pattern(line, fours[1], player):
+        score += weights[1]  # ●●●●_ or _●●●●
+    if contains_pattern(line, open_three, player):
+        score += weights[2]  # _●●●_
+    if contains_pattern(line, threes[0], player) or contains_pattern(line, threes[1], player):
+        score += weights[3]  # ●●●_ or _●●●
+    if contains_pattern(line, open_two, player):
+        score += weights[4]  # _●●_
+    if contains_pattern(line, twos[0], player) or contains_pattern(line, twos[1], player):
+        score += weights[5]  # ●●_ or _●●
+
     return score
 
 
+def move_features(board, row, col, player):
+    """
+    Pattern counts behind score_move, for weight tuning.
+
+    score_move(board, row, col, player, 3 - player) equals the dot product
+    of the counts with the pattern weights, plus the center bonus.
+
+    Returns:
+        tuple: (6 counts, one per pattern weight, center bonus)
+    """
+    features = [0.0] * 6
+    opponent = 3 - player  # Same convention as order_moves
+    for side, factor in ((player, 2), (opponent, 1.8)):  # Both directions of a line; blocks count 0.9
+        open_four, fours, open_three, threes, open_two, twos = _patterns(side)
+        for dr, dc in ((0, 1), (1, 1), (1, 0), (1, -1)):
+            line = [side if i == 0 else board.get_cell(row + i*dr, col + i*dc) for i in range(-4, 5)]
+            line = [-1 if cell is None else cell for cell in line]  # Out of bounds
+            matches = (
+                contains_pattern(line, open_four, side),
+                contains_pattern(line, fours[0], side) or contains_pattern(line, fours[1], side),
+                contains_pattern(line, open_three, side),
+                contains_pattern(line, threes[0], side) or contains_pattern(line, threes[1], side),
+                contains_pattern(line, open_two, side),
+                contains_pattern(line, twos[0], side) or contains_pattern(line, twos[1], side),
+            )
+            for index, matched in enumerate(matches):
+                if matched:
+                    features[index] += factor
+
+    center = board.size // 2
+    return features, max(0, 5 - abs(row - center) - abs(col - center)) * 2
+
+
 def contains_pattern(segment, pattern, player):
     """
     Check if a segment contains a specific pattern.
-    
+
     Args:
         segment (list): The segment to check
         pattern (list): The pattern to look for
         player (int): The player's stone type
-        
+
     Returns:
         bool: True if the pattern is found, False otherwise
     """
@@ -179,5 +413,5 @@ def contains_pattern(segment, pattern, player):
                 break
         if match:
             return True
-    
-    return False
\ No newline at end of file
+
+    return False
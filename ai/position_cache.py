@@ -0,0 +1,208 @@
+# Search results kept on disk across runs, shared by processes
+
+import os
+import sqlite3
+import threading
+import time
+
+from game.zobrist import zobrist_key
+from ai.search_config import EXACT
+
+# The 8 symmetries of a square board of size n, as (row, col) -> (row, col)
+_SYMMETRIES = (
+    lambda r, c, n: (r, c),
+    lambda r, c, n: (c, n - 1 - r),          # Rotate 90
+    lambda r, c, n: (n - 1 - r, n - 1 - c),  # Rotate 180
+    lambda r, c, n: (n - 1 - c, r),          # Rotate 270
+    lambda r, c, n: (r, n - 1 - c),          # Mirror
+    lambda r, c, n: (c, r),                  # Transpose
+    lambda r, c, n: (n - 1 - r, c),          # Flip
+    lambda r, c, n: (n - 1 - c, n - 1 - r),  # Anti-transpose
+)
+# Index of the inverse of each symmetry (the rotations by 90 and 270 swap)
+_INVERSE = (0, 3, 2, 1, 4, 5, 6, 7)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS positions (
+    engine TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    player INTEGER NOT NULL,
+    hash INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    score REAL NOT NULL,
+    bound INTEGER NOT NULL,
+    move_row INTEGER,
+    move_col INTEGER,
+    used REAL NOT NULL,
+    PRIMARY KEY (engine, size, player, hash)
+) WITHOUT ROWID
+"""
+
+
+def canonical_hash(board):
+    """
+    Zobrist hash of the position under the symmetry that gives the smallest
+    value, so the 8 rotations and reflections of a position share one key.
+    Infinite boards have no fixed frame and use the plain hash.
+
+    Returns:
+        tuple: (hash, index of the symmetry that maps the board to the canonical frame)
+    """
+    if getattr(board, 'infinite', False):
+        return board.hash, 0
+    size = board.size
+    stones = [(row, col, board.get_cell(row, col)) for row, col in board.occupied_cells()]
+    best = None
+    for index, symmetry in enumerate(_SYMMETRIES):
+        value = 0
+        for row, col, player in stones:
+            value ^= zobrist_key(*symmetry(row, col, size), player)
+        if best is None or value < best[0]:
+            best = (value, index)
+    return best
+
+
+def _signed(value):
+    """SQLite integers are signed 64-bit"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+class CacheEntry:
+    """A cached search result, with the move in the board's own frame"""
+    __slots__ = ('depth', 'score', 'bound', 'move')
+
+    def __init__(self, depth, score, bound, move):
+        self.depth = depth
+        self.score = score
+        self.bound = bound
+        self.move = move
+
+    def __repr__(self):
+        return f"CacheEntry(depth={self.depth}, score={self.score}, bound={self.bound}, move={self.move})"
+
+
+class PositionCache:
+    """
+    Persistent table of root search results in an SQLite file.
+
+    Entries are keyed by (engine, board size, player to move, canonical
+    position hash) and hold (depth, score, bound, best move). The database
+    runs in WAL mode, so any number of processes can read while one writes.
+
+    The table is bounded: once it holds more than `max_entries` rows, the
+    shallowest entries go first, least recently used among equal depths.
+    Lookups only note which keys were used; the timestamps are written with
+    the next store, so reads never take the write lock.
+    """
+    def __init__(self, path, max_entries=1000000, min_depth=3, evict_every=500, timeout=5.0):
+        """
+        Args:
+            path (str): SQLite database file (created if missing)
+            max_entries (int): Rows kept before eviction
+            min_depth (int): Only results at least this deep are written
+            evict_every (int): Stores between two eviction checks
+            timeout (float): Seconds to wait for another process's write lock
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.min_depth = min_depth
+        self.evict_every = evict_every
+        self.hits = 0
+        self.misses = 0
+        self._stores = 0
+        self._used = set()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(_SCHEMA)
+        self._connection.commit()
+
+    @classmethod
+    def from_env(cls, variable='GOMOKU_POSITION_CACHE'):
+        """Cache in the file named by an environment variable, or None if unset"""
+        path = os.environ.get(variable)
+        if not path:
+            return None
+        return cls(path)
+
+    def lookup(self, board, player, engine):
+        """
+        Cached result for the position, or None.
+
+        Args:
+            board: The current board state
+            player (int): The player to move
+            engine (str): Name of the search configuration the result belongs to
+
+        Returns:
+            CacheEntry: The entry, its move mapped back onto `board`
+        """
+        value, symmetry = canonical_hash(board)
+        key = (engine, board.size, player, _signed(value))
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT depth, score, bound, move_row, move_col FROM positions "
+                "WHERE engine = ? AND size = ? AND player = ? AND hash = ?", key).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._used.add(key)
+
+        depth, score, bound, move_row, move_col = row
+        move = None
+        if move_row is not None:
+            move = _SYMMETRIES[_INVERSE[symmetry]](move_row, move_col, board.size)
+        return CacheEntry(depth, score, bound, move)
+
+    def store(self, board, player, engine, depth, score, move, bound=EXACT):
+        """
+        Write a search result back, unless it is shallower than min_depth or
+        than the entry already cached.
+        """
+        if depth < self.min_depth:
+            return
+        value, symmetry = canonical_hash(board)
+        move_row, move_col = _SYMMETRIES[symmetry](move[0], move[1], board.size) if move else (None, None)
+        key = (engine, board.size, player, _signed(value))
+        now = time.time()
+
+        with self._lock:
+            connection = self._connection
+            connection.execute(
+                "INSERT INTO positions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (engine, size, player, hash) DO UPDATE SET depth = excluded.depth, "
+                "score = excluded.score, bound = excluded.bound, move_row = excluded.move_row, "
+                "move_col = excluded.move_col, used = excluded.used WHERE excluded.depth >= positions.depth",
+                key + (depth, score, bound, move_row, move_col, now))
+            if self._used:
+                connection.executemany(
+                    "UPDATE positions SET used = ? WHERE engine = ? AND size = ? AND player = ? AND hash = ?",
+                    [(now,) + used for used in self._used])
+                self._used.clear()
+            self._stores += 1
+            if self._stores % self.evict_every == 0:
+                self._evict()
+            connection.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+
+    def evict(self):
+        """Trim the table to max_entries now"""
+        with self._lock:
+            self._evict()
+            self._connection.commit()
+
+    def _evict(self):
+        excess = self._connection.execute("SELECT COUNT(*) FROM positions").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self._connection.execute(
+                "DELETE FROM positions WHERE (engine, size, player, hash) IN ("
+                "SELECT engine, size, player, hash FROM positions ORDER BY depth, used LIMIT ?)", (excess,))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,270 @@
+import time
+
+from game.game_rules import get_valid_moves_with_heuristics
+from ai.threats import four_gaps, three_defences, threat_moves, winning_moves
+
+# Proof/disproof number of a node that can no longer be proven (or disproven)
+PN_INF = 10 ** 9
+
+
+class PNNode:
+    """
+    A position in the proof DAG.
+
+    `children` is None until the node is expanded, then a list of
+    (move, key) pairs. `refs` counts the parents that point to the node.
+    """
+    __slots__ = ('pn', 'dn', 'children', 'refs', 'win_move')
+
+    def __init__(self):
+        self.pn = 1
+        self.dn = 1
+        self.children = None
+        self.refs = 0
+        self.win_move = None
+
+    @property
+    def solved(self):
+        return self.pn == 0 or self.dn == 0
+
+
+class ProofResult:
+    """
+    Outcome of a proof-number search.
+
+    Attributes:
+        result (str): 'proven' if the attacker forces a win, 'disproven' if no
+            winning threat sequence exists, 'unknown' if the budget ran out
+        line (list): Winning line as (row, col) moves, starting with the
+            side to move (empty unless proven)
+        iterations (int): Number of expansions performed
+        nodes (int): Size of the DAG cache after the search
+    """
+
+    def __init__(self, result, line, iterations, nodes):
+        self.result = result
+        self.line = line
+        self.iterations = iterations
+        self.nodes = nodes
+
+    def __repr__(self):
+        return f"ProofResult({self.result!r}, line={self.line}, iterations={self.iterations})"
+
+
+class ProofNumberSolver:
+    """
+    Proof-number search over threat sequences.
+
+    The attacker may only play fours and open threes (or block a four of the
+    defender), and the defender only plays the cells that answer the threat
+    or counter with a four of their own. A proof therefore establishes a win
+    by continuous threats (VCT); a disproof means no such win exists, not
+    that the position is lost.
+
+    Nodes live in a transposition table keyed by Zobrist hash, so the search
+    graph is a DAG shared between calls. As soon as a node is solved only the
+    child needed for the winning line is kept, and subtrees that no longer
+    have a parent are freed.
+    """
+
+    def __init__(self, max_nodes=200000, max_iterations=20000, neighbourhood=2):
+        """
+        Args:
+            max_nodes (int): Capacity of the DAG cache
+            max_iterations (int): Default expansion budget per solve() call
+            neighbourhood (int): Distance from stones for candidate moves
+        """
+        self.max_nodes = max_nodes
+        self.max_iterations = max_iterations
+        self.neighbourhood = neighbourhood
+        self.table = {}
+
+    def solve(self, board, attacker, max_iterations=None, time_limit=None):
+        """
+        Try to prove that `attacker` wins from the current position.
+
+        Args:
+            board: The current board state (restored before returning)
+            attacker (int): Symbol of the player trying to win
+            max_iterations (int): Expansion budget (defaults to the solver's)
+            time_limit (float): Optional time budget in seconds
+
+        Returns:
+            ProofResult: The proven result and the winning line
+        """
+        if max_iterations is None:
+            max_iterations = self.max_iterations
+        deadline = time.time() + time_limit if time_limit is not None else None
+        if len(self.table) >= self.max_nodes * 9 // 10:
+            self.collect()
+
+        to_move = -board.last_move[2] if board.last_move else attacker
+        root_key = (board.hash, attacker, to_move)
+        root = self._get_or_create(root_key)
+        root.refs += 1  # Pin the root while searching
+
+        iterations = 0
+        while not root.solved and iterations < max_iterations:
+            if deadline is not None and time.time() >= deadline:
+                break
+            if len(self.table) >= self.max_nodes:
+                break
+            self._iterate(board, root_key, attacker)
+            iterations += 1
+        root.refs -= 1
+
+        if root.pn == 0:
+            result = 'proven'
+            line = self._winning_line(root_key)
+        elif root.dn == 0:
+            result, line = 'disproven', []
+        else:
+            result, line = 'unknown', []
+        return ProofResult(result, line, iterations, len(self.table))
+
+    def collect(self):
+        """
+        Drop every unsolved node from the cache.
+
+        Solved nodes only point at solved nodes, so they survive intact and
+        keep answering later searches.
+        """
+        self.table = {key: node for key, node in self.table.items() if node.solved}
+        for node in self.table.values():
+            node.refs = 0
+        for node in self.table.values():
+            for _, child_key in node.children or ():
+                self.table[child_key].refs += 1
+
+    def clear(self):
+        self.table = {}
+
+    def _get_or_create(self, key):
+        node = self.table.get(key)
+        if node is None:
+            node = PNNode()
+            self.table[key] = node
+        return node
+
+    def _iterate(self, board, root_key, attacker):
+        """Descend to the most-proving node, expand it and update the path"""
+        path = [root_key]
+        node = self.table[root_key]
+        to_move = root_key[2]
+        while node.children is not None and not node.solved:
+            best = None
+            for move, child_key in node.children:
+                child = self.table[child_key]
+                value = child.pn if to_move == attacker else child.dn
+                if best is None or value < best[0]:
+                    best = (value, move, child_key)
+            _, move, child_key = best
+            board.place_piece(move[0], move[1], to_move)
+            path.append(child_key)
+            node = self.table[child_key]
+            to_move = -to_move
+
+        if node.children is None:
+            self._expand(board, node, attacker, to_move)
+
+        for _ in range(len(path) - 1):
+            board.undo_last_move()
+        for key in reversed(path):
+            self._update(key, attacker)
+
+    def _expand(self, board, node, attacker, to_move):
+        defender = -attacker
+        candidates = get_valid_moves_with_heuristics(board, distance=self.neighbourhood)
+        moves = []
+
+        if to_move == attacker:
+            wins = winning_moves(board, attacker, candidates)
+            if wins:
+                node.pn, node.dn, node.win_move = 0, PN_INF, wins[0]
+            else:
+                threats = winning_moves(board, defender, candidates)
+                if len(threats) > 1:
+                    moves = []
+                elif threats:
+                    moves = threats  # Forced block
+                else:
+                    moves = threat_moves(board, attacker, candidates)
+        else:
+            if winning_moves(board, defender, candidates):
+                moves = []
+            else:
+                threats = winning_moves(board, attacker, candidates)
+                if len(threats) > 1:
+                    node.pn, node.dn = 0, PN_INF
+                elif threats:
+                    moves = threats
+                else:
+                    defences = three_defences(board, attacker, candidates)
+                    if defences:
+                        counters = [move for move in candidates
+                                    if move not in defences and four_gaps(board, move[0], move[1], defender)]
+                        moves = sorted(defences) + counters
+
+        node.children = []
+        if node.solved:
+            return
+        if not moves:
+            # The side to move has nothing useful: a dead end for the attacker
+            node.pn, node.dn = PN_INF, 0
+            return
+        for row, col in moves:
+            board.place_piece(row, col, to_move)
+            child_key = (board.hash, attacker, -to_move)
+            board.undo_last_move()
+            child = self._get_or_create(child_key)
+            child.refs += 1
+            node.children.append(((row, col), child_key))
+
+    def _update(self, key, attacker):
+        node = self.table[key]
+        if not node.children:
+            return
+        values = [self.table[child_key] for _, child_key in node.children]
+        if key[2] == attacker:
+            node.pn = min(child.pn for child in values)
+            node.dn = min(PN_INF, sum(child.dn for child in values))
+        else:
+            node.pn = min(PN_INF, sum(child.pn for child in values))
+            node.dn = min(child.dn for child in values)
+        if node.solved:
+            self._collapse(node)
+
+    def _collapse(self, node):
+        """Keep only the child that carries the result and free the rest"""
+        keep = None
+        if node.pn == 0:
+            keep = next(entry for entry in node.children if self.table[entry[1]].pn == 0)
+        elif node.dn == 0 and any(self.table[key].dn == 0 for _, key in node.children):
+            keep = next(entry for entry in node.children if self.table[entry[1]].dn == 0)
+        for entry in node.children:
+            if entry is not keep:
+                self._release(entry[1])
+        node.children = [keep] if keep is not None else []
+
+    def _release(self, key):
+        stack = [key]
+        while stack:
+            current = stack.pop()
+            node = self.table.get(current)
+            if node is None:
+                continue
+            node.refs -= 1
+            if node.refs <= 0:
+                del self.table[current]
+                stack.extend(child_key for _, child_key in node.children or ())
+
+    def _winning_line(self, key):
+        line = []
+        node = self.table[key]
+        while node.children:
+            move, key = node.children[0]
+            line.append(move)
+            node = self.table[key]
+        if node.win_move is not None:
+            line.append(node.win_move)
+        return line
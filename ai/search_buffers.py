@@ -0,0 +1,136 @@
+# Preallocated per-ply buffers for the search inner loop
+
+import threading
+
+_local = threading.local()
+
+
+class SearchBuffers:
+    """
+    Scratch space reused by every node of a search on one board size.
+
+    Each ply (indexed by remaining depth) owns a move list and a score list
+    sized for the whole board, so generating and ordering moves only writes
+    into existing lists. Move tuples are created once per cell and shared.
+    """
+
+    def __init__(self, size, plies=16):
+        self.size = size
+        self.cells = [tuple((row, col) for col in range(size)) for row in range(size)]
+        self.marks = [bytearray(size) for _ in range(size)]
+        self.moves = []
+        self.scores = []
+        self.line = [0] * 9
+        self.ensure(plies)
+
+    def ensure(self, ply):
+        """Make sure buffers exist for plies 0..ply"""
+        cells = self.size * self.size
+        while len(self.moves) <= ply:
+            self.moves.append([None] * cells)
+            self.scores.append([0.0] * cells)
+
+
+def get_buffers(size):
+    """
+    Buffers for a board size, cached per thread so concurrent searches in
+    different threads never share them.
+    """
+    cache = getattr(_local, 'buffers', None)
+    if cache is None:
+        cache = _local.buffers = {}
+    buffers = cache.get(size)
+    if buffers is None:
+        buffers = cache[size] = SearchBuffers(size)
+    return buffers
+
+
+def fill_valid_moves(board, buffers, ply, distance=2):
+    """
+    Write the empty cells within `distance` of any stone into the move buffer
+    of `ply` (the same cells as get_valid_moves_with_heuristics).
+
+    Returns:
+        int: Number of moves written
+    """
+    if board.sparse:
+        return _fill_sparse_moves(board, buffers, ply, distance)
+    
+    size = board.size
+    grid = board.board
+    moves = buffers.moves[ply]
+    marks = buffers.marks
+    cells = buffers.cells
+    count = 0
+
+    for row in range(size):
+        stones = grid[row]
+        for col in range(size):
+            if stones[col] == 0:
+                continue
+            for r in range(max(0, row - distance), min(size, row + distance + 1)):
+                grid_row = grid[r]
+                mark_row = marks[r]
+                for c in range(max(0, col - distance), min(size, col + distance + 1)):
+                    if grid_row[c] == 0 and not mark_row[c]:
+                        mark_row[c] = 1
+                        moves[count] = cells[r][c]
+                        count += 1
+
+    # Clear the marks for the next node
+    for i in range(count):
+        r, c = moves[i]
+        marks[r][c] = 0
+
+    # Fallback: first move or isolated stones
+    if count == 0:
+        center = size // 2
+        moves[0] = cells[center][center]
+        count = 1
+    return count
+
+
+def _fill_sparse_moves(board, buffers, ply, distance):
+    """
+    fill_valid_moves for a SparseBoard, walking the stones instead of the
+    grid. Moves may lie outside the nominal area, so the buffers grow as needed.
+    """
+    moves = buffers.moves[ply]
+    seen = set()
+    count = 0
+
+    for row, col in board.stones:
+        for r in range(row - distance, row + distance + 1):
+            for c in range(col - distance, col + distance + 1):
+                if (r, c) not in seen and board.is_valid_move(r, c):
+                    seen.add((r, c))
+                    _grow(buffers, ply, count)
+                    moves[count] = (r, c)
+                    count += 1
+
+    if count == 0:
+        center = board.size // 2
+        moves[0] = (center, center)
+        count = 1
+    return count
+
+
+def _grow(buffers, ply, count):
+    """Make room for entry `count` in the buffers of `ply`"""
+    if count == len(buffers.moves[ply]):
+        buffers.moves[ply].append(None)
+        buffers.scores[ply].append(0.0)
+
+
+def copy_moves(moves, buffers, ply):
+    """Copy a move list produced elsewhere into the buffer of `ply`"""
+    target = buffers.moves[ply]
+    cells = buffers.cells
+    size = buffers.size
+    count = 0
+    for row, col in moves:
+        _grow(buffers, ply, count)
+        # Shared tuples inside the nominal area, the move itself outside it
+        target[count] = cells[row][col] if 0 <= row < size and 0 <= col < size else (row, col)
+        count += 1
+    return count
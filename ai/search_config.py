@@ -0,0 +1,92 @@
+# Options and counters shared by the search algorithms
+
+import time
+
+# Transposition table bounds
+EXACT = 0
+LOWER = 1  # The score is at least the stored value (fail high)
+UPPER = 2  # The score is at most the stored value (fail low)
+
+
+class SearchTimeout(Exception):
+    """Raised inside alpha_beta and minimax once SearchConfig.deadline has passed"""
+
+
+def check_deadline(config):
+    """Abort the search (SearchTimeout) once the config's deadline, which is set, has passed"""
+    if time.time() >= config.deadline:
+        raise SearchTimeout()
+
+
+class SearchStats:
+    """
+    Counters filled in by alpha_beta and minimax while they search.
+    
+    They count work rather than time, so they are stable across machines.
+    """
+    def __init__(self):
+        self.reset()
+    
+    def reset(self):
+        self.nodes = 0             # Calls of the search function
+        self.evals = 0             # Calls of eval_fn
+        self.cutoffs = 0           # Alpha/beta cutoffs
+        self.lmr_reductions = 0    # Late moves searched at reduced depth
+        self.lmr_researches = 0    # Reduced searches that had to be repeated
+        self.futility_prunes = 0   # Moves skipped by futility pruning
+        self.razor_reductions = 0  # Nodes whose depth was cut by razoring
+        self.extensions = 0        # Horizon nodes extended with forcing moves
+        self.forced_nodes = 0      # Nodes whose moves were narrowed by a threat
+        self.table_hits = 0        # Nodes answered from the transposition table
+        self.dead_draws = 0        # Nodes scored as a draw because no five can be completed
+    
+    def as_dict(self):
+        return dict(vars(self))
+
+
+class SearchConfig:
+    """
+    Optional search features. Every feature has its own switch and is off
+    by default, so the plain search is unchanged unless asked for.
+    """
+    def __init__(self, lmr=False, lmr_min_moves=3, lmr_min_depth=3, lmr_reduction=1,
+                 futility=False, razoring=False, extensions=False, max_extension=4, forced_moves=False, stats=None,
+                 tables=None, tracer=None, beam=False, beam_margin=100, beam_widths=None, deadline=None):
+        """
+        Args:
+            lmr (bool): Search late moves at reduced depth, re-searching those that beat the window
+            lmr_min_moves (int): Number of moves searched at full depth before reductions start
+            lmr_min_depth (int): Minimum remaining depth for reductions
+            lmr_reduction (int): Plies removed from a reduced search
+            futility (bool): Skip quiet moves at the frontier when the static score cannot reach the window
+            razoring (bool): Reduce pre-frontier nodes whose static score is far below the window
+            extensions (bool): At the horizon, keep searching forcing replies while a four or open three is on the board
+            max_extension (int): Maximum number of plies added by threat extensions
+            forced_moves (bool): Generate only the forced replies when a five, four or open three is on the board
+            stats (SearchStats): Counters to update (None to skip counting)
+            tables (SearchTables): Transposition and history tables kept between searches (see SearchEngine)
+            tracer (SearchTracer): Writes every node searched to a trace file (None to skip tracing)
+            beam (bool): minimax keeps the moves scoring within beam_margin of the best instead of the
+                max_moves closest, always keeping forced blocks
+            beam_margin (float): Largest order_moves score difference to the best move kept in the beam
+            beam_widths (dict): Most unforced moves kept per remaining depth, max_moves for the depths not
+                given (default: 5 next to the leaves, 8 one ply above)
+            deadline (float): time.time() after which the search raises SearchTimeout (None for no limit);
+                the board is left with the moves of the interrupted line on it
+        """
+        self.lmr = lmr
+        self.lmr_min_moves = lmr_min_moves
+        self.lmr_min_depth = lmr_min_depth
+        self.lmr_reduction = lmr_reduction
+        self.futility = futility
+        self.razoring = razoring
+        self.extensions = extensions
+        self.max_extension = max_extension
+        self.forced_moves = forced_moves
+        self.stats = stats
+        self.tables = tables
+        self.tracer = tracer
+        self.beam = beam
+        self.beam_margin = beam_margin
+        self.beam_widths = beam_widths if beam_widths is not None else {1: 5, 2: 8}
+        self.deadline = deadline
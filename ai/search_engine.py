@@ -0,0 +1,237 @@
+# Search engine that keeps its tables between moves
+
+import copy
+import time
+
+from ai.alphabeta import alpha_beta
+from ai.evaluation import evaluate_board
+from ai.search_config import EXACT, SearchConfig, SearchTimeout
+from ai.threats import winning_moves
+from game.game_rules import get_valid_moves_with_heuristics
+
+
+class SearchTables:
+    """
+    Transposition table, history counters and killer moves filled in by
+    alpha_beta.
+
+    Entries are keyed by the Zobrist hash of the board and stored as
+    (depth, score, bound, move, age) tuples. Killers are the last two moves
+    that caused a cutoff at a ply, the ply being the number of stones on
+    the board, so they stay valid from one iteration or search to the next.
+    Tables are aged rather than cleared between searches: history counters
+    are halved, and entries left by older searches are the first to go once
+    the table is full.
+
+    The table never holds more than max_entries entries. When a new key
+    finds it full, it is cut to three quarters: first the entries more than
+    max_age searches old, then the oldest and, within a search, the
+    shallowest.
+    """
+    def __init__(self, max_entries=200000, max_age=4):
+        """
+        Args:
+            max_entries (int): Capacity of the transposition table
+            max_age (int): Searches after which an entry is dropped first when the table is full
+        """
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.entries = {}
+        self.history = {1: {}, -1: {}}
+        self.killers = {}
+        self.age = 0
+
+    def new_search(self):
+        """Age the tables before a search"""
+        self.age += 1
+        for counters in self.history.values():
+            for move in list(counters):
+                counters[move] >>= 1
+                if not counters[move]:
+                    del counters[move]
+
+    def clear(self):
+        self.entries = {}
+        self.history = {1: {}, -1: {}}
+        self.killers = {}
+        self.age = 0
+
+    def probe(self, key):
+        return self.entries.get(key)
+
+    def store(self, key, depth, score, bound, move):
+        """Keep the deeper result, but always replace entries from older searches"""
+        entry = self.entries.get(key)
+        if entry is None:
+            if len(self.entries) >= self.max_entries:
+                self._evict()
+            self.entries[key] = (depth, score, bound, move, self.age)
+        elif entry[4] != self.age or depth >= entry[0]:
+            self.entries[key] = (depth, score, bound, move, self.age)
+
+    def seed(self, key, move):
+        """Suggest a first move for a position that has no entry yet"""
+        if key not in self.entries:
+            if len(self.entries) >= self.max_entries:
+                self._evict()
+            self.entries[key] = (-1, 0, EXACT, move, self.age)
+
+    def _evict(self):
+        """Cut a full table to three quarters of its capacity (several stores per eviction pass)"""
+        keep = self.max_entries * 3 // 4
+        oldest = self.age - self.max_age
+        entries = {key: entry for key, entry in self.entries.items() if entry[4] > oldest}
+        if len(entries) > keep:
+            # Newest searches first, deepest results first within a search
+            ranked = sorted(entries.items(), key=lambda item: (item[1][4], item[1][0]), reverse=True)
+            entries = dict(ranked[:keep])
+        self.entries = entries
+
+    def record_cutoff(self, player, move, depth):
+        """History heuristic: reward a move that caused a cutoff"""
+        counters = self.history[player]
+        counters[move] = counters.get(move, 0) + depth * depth
+
+    def record_killer(self, ply, move):
+        """Keep a cutoff move as one of the two killers of a ply"""
+        killers = self.killers.get(ply)
+        if killers is None:
+            self.killers[ply] = [move, None]
+        elif killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+
+    def principal_variation(self, board, max_length=8):
+        """
+        Follow the stored best moves from the current position.
+
+        Returns:
+            list: (row, col) moves, starting with the side to move
+        """
+        line = []
+        played = 0
+        seen = set()
+        while len(line) < max_length and board.hash not in seen:
+            seen.add(board.hash)
+            entry = self.entries.get(board.hash)
+            if entry is None or entry[3] is None or board.get_cell(*entry[3]) != 0:
+                break
+            row, col = entry[3]
+            player = -board.last_move[2] if board.last_move else 1
+            board.place_piece(row, col, player)
+            played += 1
+            line.append((row, col))
+        for _ in range(played):
+            board.undo_last_move()
+        return line
+
+
+class SearchEngine:
+    """
+    Alpha-beta engine that AIPlayer keeps for the whole game.
+
+    Each move is searched by iterative deepening with a transposition table
+    and history heuristic that persist across moves. The principal variation
+    of the last search is kept as well: when the opponent plays the expected
+    reply, the move the previous search planned next is tried first.
+
+    With a time limit, or after stop(), the iteration in progress is
+    abandoned and the move of the last completed one is played.
+
+    The game loop reports moves through notify_move() and a fresh game
+    through new_game().
+    """
+    def __init__(self, depth=3, eval_fn=None, config=None, max_entries=200000, time_limit=None,
+                 algorithm=alpha_beta):
+        """
+        Args:
+            depth (int): Search depth
+            eval_fn: Evaluation function (evaluate_board by default)
+            config (SearchConfig): Selective search options (copied, with the engine's tables)
+            max_entries (int): Transposition table capacity
+            time_limit (float): Per-move time budget in seconds (None for no limit)
+            algorithm: Search function run at each depth, alpha_beta or minimax
+        """
+        self.depth = depth
+        self.eval_fn = eval_fn or evaluate_board
+        self.config = copy.copy(config) if config is not None else SearchConfig()
+        self.tables = SearchTables(max_entries)
+        self.config.tables = self.tables
+        self.time_limit = time_limit
+        self.algorithm = algorithm
+        self.completed_depth = 0  # Depth of the last iteration searched to the end
+        self.pv = []
+
+    def get_move(self, board, player_symbol):
+        """
+        Search the position and return the best move for `player_symbol`.
+
+        Returns:
+            tuple: (row, col)
+        """
+        _, move = self.search(board, player_symbol)
+        return move
+
+    def search(self, board, player_symbol):
+        """
+        Search the position for `player_symbol`.
+
+        Returns:
+            tuple: (score, (row, col)), the score from `player_symbol`'s point of view
+        """
+        self.tables.new_search()
+        if self.pv and board.get_cell(*self.pv[0]) == 0:
+            self.tables.seed(board.hash, self.pv[0])
+
+        score, move = None, None
+        self.completed_depth = 0
+        self.config.deadline = time.time() + self.time_limit if self.time_limit is not None else None
+        played = len(board.move_history)
+        try:
+            for depth in range(1, self.depth + 1):
+                result, best = self.algorithm(board, depth, float('-inf'), float('inf'), True, self.eval_fn,
+                                              player_symbol, config=self.config)
+                self.completed_depth = depth
+                if best is not None:
+                    score, move = result, best
+        except SearchTimeout:
+            # Take back the moves of the interrupted line
+            while len(board.move_history) > played:
+                board.undo_last_move()
+        finally:
+            self.config.deadline = None
+
+        if move is None:
+            self.pv = []
+            return self.eval_fn(board, player_symbol), self._fallback_move(board, player_symbol)
+
+        # Remember the expected continuation after our move
+        board.place_piece(move[0], move[1], player_symbol)
+        self.pv = [move] + self.tables.principal_variation(board)
+        board.undo_last_move()
+        return score, move
+
+    def stop(self):
+        """Ask a running search to return the move of its last completed iteration"""
+        self.config.deadline = 0.0
+
+    def _fallback_move(self, board, player_symbol):
+        """A win, a block or the first candidate, when no iteration completed"""
+        moves = get_valid_moves_with_heuristics(board)
+        if not moves:
+            center = board.size // 2
+            return center, center
+        forced = winning_moves(board, player_symbol, moves) or winning_moves(board, -player_symbol, moves)
+        return (forced or moves)[0]
+
+    def notify_move(self, row, col, player):
+        """Follow a move played on the board along the expected line"""
+        if self.pv and self.pv[0] == (row, col):
+            self.pv.pop(0)
+        else:
+            self.pv = []
+
+    def new_game(self):
+        """Forget everything learned in the previous game"""
+        self.tables.clear()
+        self.pv = []
@@ -0,0 +1,215 @@
+# Search-tree tracing for alpha_beta and minimax, and the offline report
+
+import heapq
+import struct
+
+MAGIC = b'GTRACE1\n'
+
+# One record per node, written when the search leaves the node (children before their parent):
+# node id, parent id (0 for a root), ply from the root, remaining depth, index among the
+# parent's searched children (-1 for a root; a re-search of a reduced move keeps the move's
+# index), move leading to the node (row, col; -1, -1 for none), maximizing flag, window on
+# entry (alpha, beta), score, children searched, reason
+RECORD = struct.Struct('<IIBbhhh?fffHB')
+
+# Why the node returned
+HORIZON = 0       # Static evaluation (depth exhausted, or standing pat at the horizon)
+TERMINAL = 1      # Won position or full board
+TABLE = 2         # Transposition table hit
+ALL_MOVES = 3     # Every move searched without a cutoff
+BETA_CUTOFF = 4   # Maximizing node failed high
+ALPHA_CUTOFF = 5  # Minimizing node failed low
+DEAD_DRAW = 6     # No five can be completed any more (scored 0)
+
+REASONS = {HORIZON: 'horizon', TERMINAL: 'terminal', TABLE: 'table', ALL_MOVES: 'all_moves',
+           BETA_CUTOFF: 'beta_cutoff', ALPHA_CUTOFF: 'alpha_cutoff', DEAD_DRAW: 'dead_draw'}
+
+
+class TraceRecord:
+    """A traced node, as read back by read_trace"""
+    __slots__ = ('node', 'parent', 'ply', 'depth', 'index', 'row', 'col', 'maximizing',
+                 'alpha', 'beta', 'score', 'children', 'reason')
+
+    def __init__(self, node, parent, ply, depth, index, row, col, maximizing, alpha, beta, score, children,
+                 reason):
+        self.node = node
+        self.parent = parent
+        self.ply = ply
+        self.depth = depth
+        self.index = index
+        self.row = row
+        self.col = col
+        self.maximizing = maximizing
+        self.alpha = alpha
+        self.beta = beta
+        self.score = score
+        self.children = children
+        self.reason = reason
+
+    @property
+    def move(self):
+        return (self.row, self.col) if self.row >= 0 else None
+
+    def __repr__(self):
+        return (f"TraceRecord(node={self.node}, parent={self.parent}, depth={self.depth}, move={self.move}, "
+                f"window=({self.alpha}, {self.beta}), score={self.score}, reason={REASONS[self.reason]})")
+
+
+class SearchTracer:
+    """
+    Streams the explored tree to a file while a search runs; only the path
+    from the root to the current node is kept in memory.
+
+    Pass it as SearchConfig(tracer=...). Several searches may share a
+    tracer: each one is a separate root in the file.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.handle = open(path, 'wb')
+        self.handle.write(MAGIC)
+        self.nodes = 0
+        self.stack = []  # [node id, children searched so far, last child's move] of the open nodes
+
+    def trace(self, search, board, depth, alpha, beta, maximizing_player, *args):
+        """Run `search` on one node and write its record once it returns"""
+        self.nodes += 1
+        node = self.nodes
+        row, col = board.last_move[:2] if board.last_move else (-1, -1)
+        if self.stack:
+            parent = self.stack[-1]
+            parent_id = parent[0]
+            if parent[1] and parent[2] == (row, col):
+                index = parent[1] - 1  # The same move searched again (LMR re-search): the same child
+            else:
+                index = parent[1]
+                parent[1] += 1
+                parent[2] = (row, col)
+        else:
+            parent_id, index = 0, -1
+
+        frame = [node, 0, None]
+        self.stack.append(frame)
+        try:
+            score, move = search(board, depth, alpha, beta, maximizing_player, *args)
+        finally:
+            self.stack.pop()
+
+        children = frame[1]
+        if children:
+            if maximizing_player and score >= beta:
+                reason = BETA_CUTOFF
+            elif not maximizing_player and score <= alpha:
+                reason = ALPHA_CUTOFF
+            else:
+                reason = ALL_MOVES
+        elif board.is_dead_draw():
+            reason = DEAD_DRAW
+        elif move is not None:
+            reason = TABLE
+        elif depth <= 0:
+            reason = HORIZON
+        else:
+            reason = TERMINAL
+        self.handle.write(RECORD.pack(node, parent_id, min(len(self.stack), 255), max(-128, min(depth, 127)),
+                                      index, row, col, maximizing_player, alpha, beta, score, min(children, 65535),
+                                      reason))
+        return score, move
+
+    def close(self):
+        self.handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_trace(path, chunk_records=4096):
+    """
+    Read a trace file, record by record.
+
+    Yields:
+        TraceRecord: The nodes in the order they were written
+    """
+    with open(path, 'rb') as handle:
+        if handle.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a search trace")
+        while True:
+            chunk = handle.read(RECORD.size * chunk_records)
+            if not chunk:
+                break
+            usable = len(chunk) - len(chunk) % RECORD.size  # A torn last record is dropped
+            for values in RECORD.iter_unpack(chunk[:usable]):
+                yield TraceRecord(*values)
+
+
+def trace_report(path, top=10, subtree_ply=2):
+    """
+    Summarise a trace in one pass, in memory proportional to the tree depth.
+
+    Args:
+        path (str): Trace file
+        top (int): Number of most expensive subtrees to list
+        subtree_ply (int): Deepest ply whose subtrees are listed
+
+    Returns:
+        dict: 'searches' (nodes and effective branching factor of each root),
+        'plies' (nodes per ply and their ratio to the previous ply),
+        'depths' (per remaining depth: nodes, cutoff rate, first-move cutoff
+        rate, table hits), 'subtrees' (largest subtrees below the roots)
+    """
+    pending = {}  # Node id -> [nodes below it, largest subtrees below it]
+    searches, plies, depths = [], {}, {}
+    expensive = []
+
+    for record in read_trace(path):
+        below, subtrees = pending.pop(record.node, (0, []))
+        size = below + 1
+        plies[record.ply] = plies.get(record.ply, 0) + 1
+
+        counts = depths.setdefault(record.depth, {'nodes': 0, 'internal': 0, 'cutoffs': 0,
+                                                  'first_move_cutoffs': 0, 'table_hits': 0})
+        counts['nodes'] += 1
+        if record.children:
+            counts['internal'] += 1
+        if record.reason in (BETA_CUTOFF, ALPHA_CUTOFF):
+            counts['cutoffs'] += 1
+            if record.children == 1:
+                counts['first_move_cutoffs'] += 1
+        elif record.reason == TABLE:
+            counts['table_hits'] += 1
+
+        # Paths of the subtrees below are completed with this node's move on the way up
+        move = record.move
+        if record.parent:
+            if 1 <= record.ply <= subtree_ply:
+                subtrees = subtrees + [(size, record.node, [], record)]
+            if subtrees:
+                subtrees = heapq.nlargest(top, [(nodes, node_id, [move] + path, entry)
+                                                for nodes, node_id, path, entry in subtrees])
+            parent = pending.setdefault(record.parent, [0, []])
+            parent[0] += size
+            parent[1].extend(subtrees)
+        else:
+            searches.append({'root': record.node, 'depth': record.depth, 'nodes': size, 'score': record.score,
+                             'effective_branching_factor': round(size ** (1 / record.depth), 2)
+                             if record.depth > 0 else None})
+            for nodes, node_id, path, entry in subtrees:
+                expensive.append({'root': record.node, 'path': path, 'nodes': nodes, 'share': round(nodes / size, 3),
+                                  'depth': entry.depth, 'score': entry.score, 'reason': REASONS[entry.reason],
+                                  'window': (entry.alpha, entry.beta)})
+
+    ply_report = {}
+    for ply in sorted(plies):
+        previous = plies.get(ply - 1)
+        ply_report[ply] = {'nodes': plies[ply], 'ratio': round(plies[ply] / previous, 2) if previous else None}
+    depth_report = {}
+    for depth in sorted(depths, reverse=True):
+        counts = depths[depth]
+        counts['cutoff_rate'] = round(counts['cutoffs'] / counts['internal'], 3) if counts['internal'] else None
+        counts['first_move_cutoff_rate'] = (round(counts['first_move_cutoffs'] / counts['cutoffs'], 3)
+                                            if counts['cutoffs'] else None)
+        depth_report[depth] = counts
+    expensive.sort(key=lambda entry: -entry['nodes'])
+    return {'searches': searches, 'plies': ply_report, 'depths': depth_report, 'subtrees': expensive[:top]}
@@ -0,0 +1,281 @@
+# Threat detection: fives, fours and open threes
+#
+# All helpers take the candidate cell as empty and probe it with a temporary
+# stone, the same way score_move does in move_ordering.
+
+from game.game_rules import get_valid_moves_with_heuristics
+
+# The four line directions: horizontal, vertical, diagonal, anti-diagonal
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+def _line(board, row, col, dr, dc, reach):
+    """Cells from -reach to +reach along a direction (None when off the board)"""
+    return [board.get_cell(row + i * dr, col + i * dc) for i in range(-reach, reach + 1)]
+
+
+def makes_five(board, row, col, player):
+    """
+    Check whether a stone of `player` at (row, col) completes five in a row.
+
+    Args:
+        board: The current board state
+        row (int): Row of the (empty) cell
+        col (int): Column of the (empty) cell
+        player (int): The player to check for
+
+    Returns:
+        bool: True if the move wins
+    """
+    for dr, dc in DIRECTIONS:
+        count = 1
+        for sign in (1, -1):
+            r, c = row + sign * dr, col + sign * dc
+            while board.get_cell(r, c) == player:
+                count += 1
+                r += sign * dr
+                c += sign * dc
+        if count >= 5:
+            return True
+    return False
+
+
+def four_gaps(board, row, col, player):
+    """
+    Cells that would complete five through (row, col) after `player` plays there.
+
+    A non-empty result means the move makes a four; two or more cells mean
+    the opponent cannot block them all.
+
+    Returns:
+        set: (row, col) tuples of the winning follow-ups
+    """
+    previous = board.get_cell(row, col)
+    board.set_cell(row, col, player)
+    gaps = set()
+    for dr, dc in DIRECTIONS:
+        line = _line(board, row, col, dr, dc, 4)
+        for start in range(5):
+            window = line[start:start + 5]
+            if window.count(player) == 4 and window.count(0) == 1:
+                offset = start + window.index(0) - 4
+                gaps.add((row + offset * dr, col + offset * dc))
+    board.set_cell(row, col, previous)
+    return gaps
+
+
+def _straight_four_ends(board, row, col, dr, dc, player):
+    """Ends of the _XXXX_ windows through (row, col) along one direction"""
+    line = _line(board, row, col, dr, dc, 5)
+    line[5] = player
+    ends = set()
+    for start in range(2, 6):
+        window = line[start - 1:start + 5]
+        if window[0] == 0 and window[5] == 0 and window[1:5].count(player) == 4:
+            ends.add((row + (start - 6) * dr, col + (start - 6) * dc))
+            ends.add((row + (start - 1) * dr, col + (start - 1) * dc))
+    return ends
+
+
+def makes_open_three(board, row, col, player):
+    """
+    Check whether a stone of `player` at (row, col) makes an open three, i.e.
+    leaves an empty cell on one of its lines that would give a straight four.
+
+    Returns:
+        bool: True if the move creates an open (or split) three
+    """
+    previous = board.get_cell(row, col)
+    board.set_cell(row, col, player)
+    found = False
+    for dr, dc in DIRECTIONS:
+        for offset in range(-4, 5):
+            r, c = row + offset * dr, col + offset * dc
+            if offset != 0 and board.get_cell(r, c) == 0 and _straight_four_ends(board, r, c, dr, dc, player):
+                found = True
+                break
+        if found:
+            break
+    board.set_cell(row, col, previous)
+    return found
+
+
+def winning_moves(board, player, moves):
+    """
+    Args:
+        board: The current board state
+        player (int): The player to move
+        moves (list): Candidate (row, col) cells
+
+    Returns:
+        list: Candidates that complete five for `player`
+    """
+    return [(r, c) for r, c in moves if makes_five(board, r, c, player)]
+
+
+def threat_moves(board, player, moves):
+    """
+    Candidates that make a four or an open three for `player`, fours first.
+
+    Returns:
+        list: (row, col) tuples
+    """
+    fours = []
+    threes = []
+    for r, c in moves:
+        if four_gaps(board, r, c, player):
+            fours.append((r, c))
+        elif makes_open_three(board, r, c, player):
+            threes.append((r, c))
+    return fours + threes
+
+
+def three_defences(board, player, moves):
+    """
+    Cells that defend against the open threes `player` has on the board:
+    every cell that would turn a three into a straight four, plus the ends
+    of that four.
+
+    Returns:
+        set: (row, col) tuples (empty when `player` has no open three)
+    """
+    defences = set()
+    for r, c in moves:
+        for dr, dc in DIRECTIONS:
+            ends = _straight_four_ends(board, r, c, dr, dc, player)
+            if ends:
+                defences.add((r, c))
+                defences.update(ends)
+    return defences
+
+
+def is_threat(board, row, col):
+    """
+    Check whether the stone at (row, col) forms a four or an open three.
+
+    Returns:
+        bool: True for an occupied cell whose stone creates a threat
+    """
+    player = board.get_cell(row, col)
+    if not player:
+        return False
+    return bool(four_gaps(board, row, col, player)) or makes_open_three(board, row, col, player)
+
+
+def horizon_threat(board):
+    """
+    Whether the side to move faces a threat made by the last move, or made
+    one itself with its previous move. Only the last two moves are examined,
+    so this is cheap enough to call at every leaf.
+    """
+    for row, col, _ in board.move_history[-2:]:
+        if is_threat(board, row, col):
+            return True
+    return False
+
+
+def forcing_moves(board, player, moves):
+    """
+    Forcing replies for `player`, the side to move: the winning move, the
+    blocks of an immediate win, the defences against an open three (plus own
+    fours), or otherwise own fours only.
+
+    Returns:
+        tuple: (moves, forced) where forced is True when the side to move
+            must answer a threat and cannot settle for the static score
+    """
+    wins = winning_moves(board, player, moves)
+    if wins:
+        return wins[:1], True
+    opponent = -player
+    blocks = winning_moves(board, opponent, moves)
+    if blocks:
+        return blocks, True
+    own_fours = [(r, c) for r, c in moves if four_gaps(board, r, c, player)]
+    defences = three_defences(board, opponent, moves)
+    if defences:
+        return sorted(defences) + [move for move in own_fours if move not in defences], True
+    return own_fours, False
+
+
+def search_forcing(board, alpha, beta, maximizing_player, eval_fn, player_symbol, config, search_reply):
+    """
+    Threat extension at the horizon, for alpha_beta and minimax: search only
+    the forcing replies instead of calling eval_fn. Unless the side to move
+    has to answer a threat, it may also stop and take the static score.
+
+    Args:
+        search_reply: Called as search_reply(alpha, beta) with a reply on the
+            board; returns the (score, move) of the search one extension ply deeper
+
+    Returns:
+        tuple: (best_score, best_move)
+    """
+    stats = config.stats
+    mover = player_symbol if maximizing_player else -player_symbol
+    moves, forced = forcing_moves(board, mover, get_valid_moves_with_heuristics(board))
+    if not moves or not forced:
+        static_score = eval_fn(board, player_symbol)
+        if stats is not None:
+            stats.evals += 1
+        if not moves:
+            return static_score, None
+    if stats is not None:
+        stats.extensions += 1
+
+    best_move = None
+    if maximizing_player:
+        best_score = float('-inf') if forced else static_score
+        alpha = max(alpha, best_score)
+    else:
+        best_score = float('inf') if forced else static_score
+        beta = min(beta, best_score)
+    if beta <= alpha:
+        return best_score, None
+
+    for row, col in moves:
+        board.place_piece(row, col, mover)
+        score, _ = search_reply(alpha, beta)
+        board.undo_last_move()
+
+        if maximizing_player and score > best_score or not maximizing_player and score < best_score:
+            best_score = score
+            best_move = (row, col)
+        if maximizing_player:
+            alpha = max(alpha, best_score)
+        else:
+            beta = min(beta, best_score)
+        if beta <= alpha:
+            if stats is not None:
+                stats.cutoffs += 1
+            break
+
+    return best_score, best_move
+
+
+def candidate_moves(board, player, distance=2, stats=None):
+    """
+    Threat-aware move generation for the side to move.
+
+    Returns only the winning move if there is one, only the blocks when the
+    opponent threatens five, the defences plus own fours against an open
+    three, and otherwise every cell near the stones
+    (get_valid_moves_with_heuristics).
+
+    Args:
+        board: The current board state
+        player (int): The player to move
+        distance (int): Distance from stones for the full candidate list
+        stats (SearchStats): Optional counters; forced_nodes is incremented
+            when the list is narrowed
+
+    Returns:
+        list: (row, col) tuples
+    """
+    moves = get_valid_moves_with_heuristics(board, distance)
+    forcing, forced = forcing_moves(board, player, moves)
+    if not forced:
+        return moves
+    if stats is not None:
+        stats.forced_nodes += 1
+    return forcing
@@ -0,0 +1,56 @@
+# Pattern weights of evaluate_board and order_moves, loaded at startup
+
+import json
+import os
+
+# evaluate_segment: scores of a segment holding 1..4 stones of one side and empty cells
+# order_moves: scores of the patterns a move makes on one line
+DEFAULT_WEIGHTS = {
+    'segment_player': [1, 10, 100, 1000],
+    'segment_opponent': [0, 9, 90, 900],
+    'pattern': [1000, 100, 50, 10, 5, 1],  # Open four, four, open three, three, open two, two
+}
+
+
+def load_weights(path=None):
+    """
+    Read a weights file as written by tune_weights.py. Missing keys keep
+    their default values.
+
+    Args:
+        path (str): JSON file; by default the one named by GOMOKU_WEIGHTS, if set
+
+    Returns:
+        dict: Weight lists by name, as in DEFAULT_WEIGHTS
+    """
+    weights = {name: list(values) for name, values in DEFAULT_WEIGHTS.items()}
+    path = path or os.environ.get('GOMOKU_WEIGHTS')
+    if not path:
+        return weights
+    with open(path) as handle:
+        loaded = json.load(handle)
+    for name, values in loaded.items():
+        if name not in weights:
+            raise ValueError(f"Unknown weights {name!r} in {path}")
+        if len(values) != len(weights[name]):
+            raise ValueError(f"{name} needs {len(weights[name])} weights, got {len(values)}")
+        weights[name] = [float(value) for value in values]
+    return weights
+
+
+def save_weights(weights, path):
+    with open(path, 'w') as handle:
+        json.dump(weights, handle, indent=2)
+        handle.write('\n')
+
+
+def set_weights(weights):
+    """Use new weights in evaluate_board, order_moves and the pruning margins from now on"""
+    from ai import evaluation, move_ordering
+    evaluation.PLAYER_SCORES = (0,) + tuple(weights['segment_player'])
+    evaluation.OPPONENT_SCORES = (0,) + tuple(weights['segment_opponent'])
+    evaluation.FUTILITY_MARGIN, evaluation.RAZOR_MARGIN = evaluation.pruning_margins(weights)
+    move_ordering.PATTERN_SCORES = tuple(weights['pattern'])
+
+
+WEIGHTS = load_weights()
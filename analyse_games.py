@@ -0,0 +1,226 @@
+"""
+Batch analysis of recorded games.
+
+Usage:
+    python analyse_games.py GAMES_DIR [--output analysis.jsonl] [--workers 4] [--depth 3]
+
+Each *.json file in GAMES_DIR is one game record, in the shape of a move
+service request: {"game_id": "g1", "size": 15, "moves": [[7, 7], [7, 8], ...]}
+with moves alternating from player 1 (X). "game_id" defaults to the file name.
+A *.jsonl file holds one record per line, as written by simulate_games.py.
+
+For every move the engine's best move and score are compared with the move
+played, one JSON line per move:
+
+    {"game_id": "g1", "ply": 3, "player": -1, "move": [6, 6], "best_move": [8, 8],
+     "best_score": 120, "played_score": -850, "score_loss": 970, "flags": ["blunder"]}
+
+followed by a {"game_id": ..., "summary": {...}} line once the game is done.
+Games are fanned out to a process pool, one game per job, so each worker
+keeps its engine tables warm from one position of a game to the next.
+
+Output is appended: a rerun skips the games that already have a summary
+line, so an interrupted run resumes where it stopped.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from ai.search_engine import SearchEngine
+from ai.alphabeta import alpha_beta
+from game.sparse_board import create_board
+
+# Score loss (in evaluate_board units) from which a move is flagged as a blunder:
+# about one four handed to the opponent or not played
+BLUNDER_LOSS = 900
+
+# Scores at or beyond this are forced wins (alpha_beta returns +-100000)
+WIN_SCORE = 100000
+
+# Engines kept by each worker process, by (board size, player)
+_engines = {}
+_options = {}
+
+
+def load_records(directory):
+    """
+    Read the game records of a directory, sorted by file name: one per
+    *.json file and one per line of each *.jsonl file. Lines without moves,
+    such as the output of this command, are skipped.
+
+    Returns:
+        list: (game_id, size, moves) tuples
+    """
+    records = []
+    for name in sorted(os.listdir(directory)):
+        stem, extension = os.path.splitext(name)
+        if extension not in ('.json', '.jsonl'):
+            continue
+        with open(os.path.join(directory, name)) as handle:
+            if extension == '.json':
+                lines = [(stem, json.load(handle))]
+            else:
+                lines = [(f"{stem}:{number}", json.loads(line)) for number, line in enumerate(handle) if line.strip()]
+        for default_id, record in lines:
+            if 'moves' not in record:
+                continue
+            game_id = str(record.get('game_id', default_id))
+            moves = [(int(row), int(col)) for row, col in record['moves']]
+            records.append((game_id, record.get('size', 15), moves))
+    return records
+
+
+def completed_games(path):
+    """
+    Game ids with a summary line in an existing output file. A line torn by
+    an interrupted run, and any move lines of an unfinished game after the
+    last summary, are cut off so the file can be appended to.
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+    keep = 0
+    with open(path, 'rb') as handle:
+        offset = 0
+        for line in handle:
+            offset += len(line)
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            if 'summary' in entry:
+                done.add(entry['game_id'])
+                keep = offset
+    with open(path, 'r+b') as handle:
+        handle.truncate(keep)
+    return done
+
+
+def init_worker(depth):
+    _options['depth'] = depth
+
+
+def _engine(size, player):
+    key = (size, player)
+    engine = _engines.get(key)
+    if engine is None:
+        engine = _engines[key] = SearchEngine(depth=_options.get('depth', 3))
+    return engine
+
+
+def analyse_game(record):
+    """
+    Annotate every move of a game.
+
+    Args:
+        record (tuple): (game_id, size, moves)
+
+    Returns:
+        list: JSON-ready dicts, one per move followed by the summary
+    """
+    game_id, size, moves = record
+    start = time.time()
+    board = create_board(size)
+    depth = _options.get('depth', 3)
+    engines = {player: _engine(size, player) for player in (1, -1)}
+    for engine in engines.values():
+        engine.new_game()
+
+    lines = []
+    player = 1
+    for ply, (row, col) in enumerate(moves):
+        if not board.is_valid_move(row, col):
+            lines.append({'game_id': game_id, 'error': f"illegal move {[row, col]} at ply {ply}"})
+            break
+        engine = engines[player]
+        best_score, best_move = engine.search(board, player)
+
+        if (row, col) == tuple(best_move):
+            played_score = best_score
+        else:
+            # Same depth as the engine: the opponent replies with one ply less
+            board.place_piece(row, col, player)
+            played_score, _ = alpha_beta(board, depth - 1, float('-inf'), float('inf'), False, engine.eval_fn,
+                                         player, engine.config)
+            board.undo_last_move()
+
+        loss = max(0, best_score - played_score)
+        flags = []
+        if loss >= BLUNDER_LOSS:
+            flags.append('blunder')
+        if best_score >= WIN_SCORE and played_score < WIN_SCORE:
+            flags.append('missed_win')
+        lines.append({'game_id': game_id, 'ply': ply, 'player': player, 'move': [row, col],
+                      'best_move': list(best_move), 'best_score': best_score, 'played_score': played_score,
+                      'score_loss': loss, 'flags': flags})
+
+        board.place_piece(row, col, player)
+        for other in engines.values():
+            other.notify_move(row, col, player)
+        player = -player
+
+    analysed = [line for line in lines if 'ply' in line]
+    lines.append({'game_id': game_id, 'summary': {
+        'moves': len(analysed),
+        'blunders': sum('blunder' in line['flags'] for line in analysed),
+        'average_loss': round(sum(line['score_loss'] for line in analysed) / len(analysed), 1) if analysed else 0,
+        'seconds': round(time.time() - start, 3),
+    }})
+    return lines
+
+
+def analyse_directory(directory, output, workers=1, depth=3, progress=None):
+    """
+    Analyse every game of a directory not yet in `output`, appending the
+    annotated moves as they come in.
+
+    Returns:
+        int: Number of games analysed by this run
+    """
+    done = completed_games(output)
+    pending = [record for record in load_records(directory) if record[0] not in done]
+
+    if workers > 1:
+        pool = multiprocessing.Pool(workers, initializer=init_worker, initargs=(depth,))
+        results = pool.imap_unordered(analyse_game, pending)
+    else:
+        pool = None
+        init_worker(depth)
+        results = map(analyse_game, pending)
+
+    count = 0
+    try:
+        with open(output, 'a') as handle:
+            for lines in results:
+                # One write per game, so an interruption tears at most one game
+                handle.write(''.join(json.dumps(line) + '\n' for line in lines))
+                handle.flush()
+                count += 1
+                if progress is not None:
+                    progress(count, len(pending), lines[-1]['game_id'])
+    finally:
+        if pool is not None:
+            pool.terminate()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("games", help="Directory of game records (*.json)")
+    parser.add_argument("--output", default="analysis.jsonl")
+    parser.add_argument("--workers", type=int, default=max(1, multiprocessing.cpu_count() - 1))
+    parser.add_argument("--depth", type=int, default=3)
+    args = parser.parse_args()
+
+    def progress(count, total, game_id):
+        print(f"[{count}/{total}] {game_id}", file=sys.stderr)
+
+    count = analyse_directory(args.games, args.output, args.workers, args.depth, progress)
+    print(f"Analysed {count} games into {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Compare minimax's adaptive beam with the fixed max_moves cutoff.
+
+Usage:
+    python -m benchmarks.beam_width [--depth 3] [--games 8] [--size 15]
+
+Reports nodes, eval calls and time per configuration on the fixed benchmark
+positions, then plays each beam configuration against the fixed cutoff
+(max_moves=10, closest moves first) from a set of two-stone openings, both
+colours each, to estimate strength.
+"""
+import argparse
+import random
+import time
+
+from ai.evaluation import evaluate_board
+from ai.minmax import minimax
+from ai.search_config import SearchConfig, SearchStats
+from benchmarks.positions import POSITIONS, build_board, side_to_move
+from game.board import Board
+from game.game_rules import check_win, is_board_full
+from game.player import AIPlayer
+
+CONFIGURATIONS = {
+    "fixed": {},
+    "beam": {"beam": True},
+    "beam_wide": {"beam": True, "beam_margin": 200, "beam_widths": {1: 8, 2: 10}},
+    "beam_narrow": {"beam": True, "beam_margin": 50, "beam_widths": {1: 4, 2: 6}},
+}
+
+
+def measure(options, depth):
+    """Search every benchmark position; returns (nodes, evals, seconds, results)"""
+    stats = SearchStats()
+    results = []
+    start = time.perf_counter()
+    for _, size, moves in POSITIONS:
+        board = build_board(size, moves)
+        results.append(minimax(board, depth, float('-inf'), float('inf'), True, evaluate_board, side_to_move(board),
+                               config=SearchConfig(stats=stats, **options)))
+    return stats.nodes, stats.evals, time.perf_counter() - start, results
+
+
+def openings(count, size, seed=0):
+    """Two-stone openings near the center"""
+    rng = random.Random(seed)
+    center = size // 2
+    found = []
+    while len(found) < count:
+        first = (center + rng.randint(-1, 1), center + rng.randint(-1, 1))
+        second = (first[0] + rng.randint(-1, 1), first[1] + rng.randint(-1, 1))
+        if second != first and [first, second] not in found:
+            found.append([first, second])
+    return found
+
+
+def play_game(first, second, opening, size, max_moves):
+    """Play one game from an opening; returns the symbol of the winner or 0"""
+    board = Board(size=size)
+    player = 1
+    for row, col in opening:
+        board.place_piece(row, col, player)
+        player = -player
+    current, waiting = first, second
+    for _ in range(max_moves):
+        row, col = current.get_move(board)
+        board.place_piece(row, col, current.symbol)
+        if check_win(board, row, col):
+            return current.symbol
+        if is_board_full(board):
+            return 0
+        current, waiting = waiting, current
+    return 0
+
+
+def match(options, depth, games, size, max_moves):
+    """Score of a configuration against the fixed cutoff (win=1, draw=0.5), over `games` games"""
+    score = 0.0
+    starts = openings((games + 1) // 2, size)
+    for game in range(games):
+        # Each opening is played with both colours
+        symbol = 1 if game % 2 == 0 else -1
+        candidate = AIPlayer(symbol, algorithm=minimax, depth=depth, config=SearchConfig(**options))
+        reference = AIPlayer(-symbol, algorithm=minimax, depth=depth)
+        first, second = (candidate, reference) if symbol == 1 else (reference, candidate)
+        winner = play_game(first, second, starts[game // 2], size, max_moves)
+        score += 1.0 if winner == symbol else 0.5 if winner == 0 else 0.0
+    return score
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--games", type=int, default=0, help="Match games per configuration (0 to skip)")
+    parser.add_argument("--size", type=int, default=15, help="Board size for the match games")
+    parser.add_argument("--max-moves", type=int, default=80)
+    args = parser.parse_args()
+
+    print(f"{'config':<12} {'nodes':>8} {'evals':>8} {'time (s)':>9}  moves")
+    for name, options in CONFIGURATIONS.items():
+        nodes, evals, seconds, results = measure(options, args.depth)
+        moves = " ".join(f"{move[0]},{move[1]}" if move else "-" for _, move in results)
+        print(f"{name:<12} {nodes:>8} {evals:>8} {seconds:>9.2f}  {moves}")
+
+    if args.games:
+        print(f"\nMatch vs fixed ({args.games} games, depth {args.depth}, {args.size}x{args.size})")
+        for name, options in CONFIGURATIONS.items():
+            if options:
+                score = match(options, args.depth, args.games, args.size, args.max_moves)
+                print(f"{name:<12} {score:.1f}/{args.games}")
+
+
+if __name__ == "__main__":
+    main()
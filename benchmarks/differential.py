@@ -0,0 +1,316 @@
+"""
+Differential equivalence harness for the optimised engine code.
+
+Usage:
+    python -m benchmarks.differential [--random 200] [--seed 0] [--depth 2]
+                                      [--games GAMES_DIR] [--checks evaluation,search]
+
+Every check runs a plain reference implementation and the optimised
+variants on the same position:
+
+- evaluation: evaluate_board on Board, SparseBoard and Position against a
+  segment-by-segment evaluation through get_cell (evaluate_segment);
+- move_generation: the buffered fill_valid_moves on both board backends
+  against get_valid_moves_with_heuristics;
+- move_ordering: order_moves_into on preallocated buffers, on both
+  backends, against order_moves;
+- search: alpha_beta (without config, with a pruning-free SearchConfig,
+  on SparseBoard) and a fresh SearchEngine against a full minimax without
+  pruning over the same moves.
+
+Tolerances: evaluation, move generation and move ordering must be
+identical. Searches must return the reference score exactly; the best
+move may be any move the reference scores as best, since move order
+breaks ties differently. Selective options (LMR, futility, razoring,
+extensions, forced moves) trade exactness for speed and are not checked.
+
+Positions are the benchmark positions, every prefix of the recorded games
+in GAMES_DIR (see analyse_games.py), and random games played near the
+existing stones. A failing position is shrunk by removing stones while the
+check still fails, and the minimal position is printed.
+"""
+import argparse
+import random
+import sys
+
+from ai.alphabeta import alpha_beta
+from ai.evaluation import DIRECTIONS, evaluate_board, evaluate_segment
+from ai.move_ordering import order_moves, order_moves_into
+from ai.search_buffers import fill_valid_moves, get_buffers
+from ai.search_config import SearchConfig
+from ai.search_engine import SearchEngine
+from benchmarks.positions import POSITIONS
+from game.board import Board
+from game.game_rules import check_win, get_valid_moves_with_heuristics
+from game.sparse_board import SparseBoard
+
+WIN_SCORE = 100000
+
+
+class Mismatch(AssertionError):
+    """An optimised variant disagrees with the reference"""
+
+
+def play(board, case):
+    """Play a case's stones, in order, on an empty board"""
+    for row, col, player in case[1]:
+        board.place_piece(row, col, player)
+    return board
+
+
+def dense(case):
+    return play(Board(case[0]), case)
+
+
+def sparse(case):
+    return play(SparseBoard(case[0]), case)
+
+
+def side_to_move(case):
+    return -case[1][-1][2] if case[1] else 1
+
+
+# Reference implementations: the plainest form of each computation
+
+def reference_patterns(board, player):
+    score = 0
+    for row in range(board.size):
+        for col in range(board.size):
+            for dr, dc in DIRECTIONS:
+                segment = [board.get_cell(row + i*dr, col + i*dc) for i in range(5)]
+                if None not in segment:
+                    score += evaluate_segment(segment, player)
+    return score
+
+
+def reference_evaluate(board, player):
+    return reference_patterns(board, player) - reference_patterns(board, 3 - player)
+
+
+def reference_search(board, depth, maximizing_player, eval_fn, player_symbol):
+    """
+    Minimax without pruning, over the moves alpha_beta generates.
+
+    Returns:
+        tuple: (score, {move: score} at this node)
+    """
+    if board.last_move:
+        row, col, player = board.last_move
+        if check_win(board, row, col):
+            return (WIN_SCORE if player == player_symbol else -WIN_SCORE), {}
+    if board.is_dead_draw():
+        return 0, {}
+    if depth <= 0 or board.is_full():
+        return eval_fn(board, player_symbol), {}
+
+    mover = player_symbol if maximizing_player else -player_symbol
+    scores = {}
+    for row, col in get_valid_moves_with_heuristics(board):
+        board.place_piece(row, col, mover)
+        scores[(row, col)], _ = reference_search(board, depth - 1, not maximizing_player, eval_fn, player_symbol)
+        board.undo_last_move()
+    best = max(scores.values()) if maximizing_player else min(scores.values())
+    return best, scores
+
+
+# Optimised variants, by name
+
+EVALUATORS = {
+    'dense': lambda case, player: evaluate_board(dense(case), player),
+    'sparse': lambda case, player: evaluate_board(sparse(case), player),
+    'position': lambda case, player: evaluate_board(dense(case).snapshot(), player),
+}
+
+
+def _buffered_moves(board):
+    buffers = get_buffers(board.size)
+    count = fill_valid_moves(board, buffers, 0)
+    return buffers.moves[0][:count]
+
+
+def _buffered_order(board, player):
+    buffers = get_buffers(board.size)
+    moves = sorted(get_valid_moves_with_heuristics(board))
+    target, scores = buffers.moves[1], buffers.scores[1]
+    target[:len(moves)] = moves
+    order_moves_into(board, target, scores, len(moves), player, buffers.line)
+    return target[:len(moves)]
+
+
+MOVE_GENERATORS = {
+    'dense': lambda case: _buffered_moves(dense(case)),
+    'sparse': lambda case: _buffered_moves(sparse(case)),
+}
+
+ORDERINGS = {
+    'dense': lambda case, player: _buffered_order(dense(case), player),
+    'sparse': lambda case, player: _buffered_order(sparse(case), player),
+}
+
+
+def _alpha_beta(board, depth, player, config=None):
+    return alpha_beta(board, depth, float('-inf'), float('inf'), True, evaluate_board, player, config)
+
+
+SEARCHES = {
+    'alpha_beta': lambda case, depth, player: _alpha_beta(dense(case), depth, player),
+    'pruning_free_config': lambda case, depth, player: _alpha_beta(dense(case), depth, player, SearchConfig()),
+    'sparse': lambda case, depth, player: _alpha_beta(sparse(case), depth, player),
+    'engine': lambda case, depth, player: SearchEngine(depth).search(dense(case), player),
+}
+
+
+# Checks: raise Mismatch when a variant disagrees with the reference
+
+def check_evaluation(case, depth=None, variants=None):
+    board = dense(case)
+    for player in (1, -1):
+        expected = reference_evaluate(board, player)
+        for name, variant in (variants or EVALUATORS).items():
+            score = variant(case, player)
+            if score != expected:
+                raise Mismatch(f"evaluation[{name}] for {player}: {score} != reference {expected}")
+
+
+def check_move_generation(case, depth=None, variants=None):
+    expected = sorted(get_valid_moves_with_heuristics(dense(case)))
+    for name, variant in (variants or MOVE_GENERATORS).items():
+        moves = variant(case)
+        if sorted(moves) != expected or len(moves) != len(set(moves)):
+            raise Mismatch(f"move_generation[{name}]: {sorted(moves)} != reference {expected}")
+
+
+def check_move_ordering(case, depth=None, variants=None):
+    board = dense(case)
+    moves = sorted(get_valid_moves_with_heuristics(board))
+    for player in (1, -1):
+        expected = order_moves(board, moves, player)
+        for name, variant in (variants or ORDERINGS).items():
+            ordered = variant(case, player)
+            if ordered != expected:
+                raise Mismatch(f"move_ordering[{name}] for {player}: {ordered[:6]}... != reference {expected[:6]}...")
+
+
+def check_search(case, depth=2, variants=None):
+    player = side_to_move(case)
+    expected, scores = reference_search(dense(case), depth, True, evaluate_board, player)
+    best = {move for move, score in scores.items() if score == expected}
+    for name, variant in (variants or SEARCHES).items():
+        score, move = variant(case, depth, player)
+        if score != expected:
+            raise Mismatch(f"search[{name}] at depth {depth}: score {score} != reference {expected}")
+        if best and tuple(move) not in best:
+            raise Mismatch(f"search[{name}] at depth {depth}: move {move} scores {scores.get(tuple(move))}, "
+                           f"reference best {expected} by {sorted(best)}")
+
+
+CHECKS = {
+    'evaluation': check_evaluation,
+    'move_generation': check_move_generation,
+    'move_ordering': check_move_ordering,
+    'search': check_search,
+}
+
+
+# Positions
+
+def recorded_cases(games_directory=None):
+    """The benchmark positions and every prefix of the recorded games, as (size, stones) cases"""
+    games = [(size, moves) for _, size, moves in POSITIONS]
+    if games_directory:
+        from analyse_games import load_records
+        prefixes = []
+        for _, size, moves in load_records(games_directory):
+            prefixes.extend((size, moves[:length]) for length in range(1, len(moves) + 1))
+        games.extend(prefixes)
+    cases = []
+    for size, moves in games:
+        cases.append((size, [(row, col, 1 if index % 2 == 0 else -1) for index, (row, col) in enumerate(moves)]))
+    return cases
+
+
+def random_case(rng, sizes=(9, 11, 13, 15), max_stones=20):
+    """A random game: stones alternate and are played next to the existing ones"""
+    size = rng.choice(sizes)
+    board = Board(size)
+    player = 1
+    for _ in range(rng.randint(1, max_stones)):
+        if board.move_history:
+            row, col = rng.choice(board.get_restricted_valid_moves(1))
+        else:
+            row, col = rng.randrange(size), rng.randrange(size)
+        board.place_piece(row, col, player)
+        if check_win(board, row, col):
+            break
+        player = -player
+    return size, list(board.move_history)
+
+
+def fails(check, case, depth):
+    try:
+        check(case, depth)
+    except Mismatch as error:
+        return str(error)
+    return None
+
+
+def shrink(check, case, depth):
+    """
+    Remove stones one at a time while the check keeps failing.
+
+    Returns:
+        tuple: (minimal case, its failure message)
+    """
+    message = fails(check, case, depth)
+    size, stones = case
+    shrunk = True
+    while shrunk:
+        shrunk = False
+        for index in range(len(stones)):
+            candidate = (size, stones[:index] + stones[index + 1:])
+            failure = fails(check, candidate, depth)
+            if failure is not None:
+                stones, message, shrunk = candidate[1], failure, True
+                break
+    return (size, stones), message
+
+
+def run(cases, checks=None, depth=2):
+    """
+    Run the checks on every case.
+
+    Returns:
+        list: (check name, minimal case, message) for each failing check and case
+    """
+    failures = []
+    for name, check in (checks or CHECKS).items():
+        for case in cases:
+            if fails(check, case, depth) is not None:
+                minimal, message = shrink(check, case, depth)
+                failures.append((name, minimal, message))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--random", type=int, default=200, help="Number of random positions")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--depth", type=int, default=2, help="Search depth of the search check")
+    parser.add_argument("--games", help="Directory of recorded games (*.json) to take positions from")
+    parser.add_argument("--checks", default=",".join(CHECKS))
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cases = recorded_cases(args.games) + [random_case(rng) for _ in range(args.random)]
+    checks = {name: CHECKS[name] for name in args.checks.split(",")}
+    failures = run(cases, checks, args.depth)
+
+    for name, (size, stones), message in failures:
+        print(f"FAIL {name}: {message}")
+        print(f"  size {size}, stones {stones}")
+    print(f"{len(cases)} positions, {len(checks)} checks, {len(failures)} failures")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+Load test: many concurrent human-vs-AI games against the engine.
+
+Usage:
+    python -m benchmarks.load_test [--sessions 8] [--duration 60] [--think 2.0]
+                                   [--backend inprocess|pool|http] [--workers 4]
+                                   [--url http://127.0.0.1:8765] [--depth 2] [--size 15]
+                                   [--output report.json]
+
+Each session is a thread playing X: it "thinks" for a random time
+(exponential, mean --think seconds), plays a stone next to the existing
+ones, then waits for the AI's reply, game after game, until --duration
+is over. The AI runs
+
+- inprocess: an AIPlayer per session, in this process;
+- pool: a MoveService worker pool (one process per worker) started here;
+- http: a move service already listening at --url.
+
+The report gives move latency percentiles, AI moves per second, the RSS
+of this process or of the workers sampled over time, and the CPU
+utilisation of each worker (CPU seconds per wall second).
+"""
+import argparse
+import json
+import math
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from ai.alphabeta import alpha_beta
+from ai.minmax import minimax
+from game.board import Board
+from game.game_rules import check_win
+from game.metrics import rss_bytes
+from game.player import AIPlayer
+
+
+class BackendError(Exception):
+    """The engine did not answer (rejected, deadline exceeded, ...)"""
+
+
+class InProcessBackend:
+    """An AIPlayer per session, searching in the calling thread"""
+    name = 'inprocess'
+
+    def __init__(self, depth=2, engine='alphabeta'):
+        self.depth = depth
+        self.algorithm = minimax if engine == 'minimax' else alpha_beta
+        self.players = {}
+
+    def move(self, session, board):
+        player, seen = self.players.get(session, (None, 0))
+        if player is None:
+            player = AIPlayer(-1, self.algorithm, depth=self.depth)
+        for row, col, symbol in board.move_history[seen:]:
+            player.notify_move(row, col, symbol)
+        self.players[session] = (player, len(board.move_history))
+        return player.get_move(board)
+
+    def end(self, session):
+        self.players.pop(session, None)
+
+    def sample(self):
+        """{worker: (rss bytes, CPU seconds)}"""
+        return {'main': (rss_bytes(), time.process_time())}
+
+    def close(self):
+        pass
+
+
+class ServiceBackend:
+    """A MoveService worker pool started by the load test"""
+    name = 'pool'
+
+    def __init__(self, workers=2, depth=2, engine='alphabeta', max_pending=8, deadline_ms=10000):
+        from move_service import MoveService
+        self.service = MoveService(workers=workers, depth=depth, engine=engine, max_pending=max_pending)
+        self.service.start()
+        self.deadline_ms = deadline_ms
+
+    def move(self, session, board):
+        payload = {'game_id': session, 'size': board.size,
+                   'moves': [[row, col] for row, col, _ in board.move_history]}
+        status, result = self.service.submit('move', payload, deadline_ms=self.deadline_ms)
+        if status != 200:
+            raise BackendError(f"{status}: {result.get('error')}")
+        return tuple(result['move'])
+
+    def end(self, session):
+        self.service.submit('end', {'game_id': session})
+
+    def sample(self):
+        return _worker_samples(self.service.health())
+
+    def close(self):
+        self.service.stop()
+
+
+class HttpBackend:
+    """A move service listening on a local endpoint"""
+    name = 'http'
+
+    def __init__(self, url='http://127.0.0.1:8765', deadline_ms=10000):
+        self.url = url.rstrip('/')
+        self.deadline_ms = deadline_ms
+
+    def _request(self, path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(self.url + path, data=data, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.deadline_ms / 1000 + 5) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as error:
+            raise BackendError(f"{error.code}: {error.read()[:200]!r}")
+        except OSError as error:
+            raise BackendError(str(error))
+
+    def move(self, session, board):
+        result = self._request('/move', {'game_id': session, 'size': board.size, 'deadline_ms': self.deadline_ms,
+                                         'moves': [[row, col] for row, col, _ in board.move_history]})
+        return tuple(result['move'])
+
+    def end(self, session):
+        self._request('/end', {'game_id': session})
+
+    def sample(self):
+        return _worker_samples(self._request('/health'))
+
+    def close(self):
+        pass
+
+
+def _worker_samples(health):
+    samples = {}
+    for worker in health.get('workers', []):
+        if 'cpu_seconds' in worker:
+            samples[f"worker-{worker['worker']}"] = (worker.get('rss_bytes'), worker['cpu_seconds'])
+    return samples
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a list (None if empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered), max(1, math.ceil(q * len(ordered)))) - 1]
+
+
+def human_move(board, rng):
+    """A plausible human move: next to the stones already played"""
+    if not board.move_history:
+        center = board.size // 2
+        return center + rng.randint(-2, 2), center + rng.randint(-2, 2)
+    return rng.choice(board.get_restricted_valid_moves(1))
+
+
+def run_session(backend, session, stop_at, think, size, max_moves, rng, latencies, counters):
+    """Play games against the backend until `stop_at`, counting games and errors in `counters`"""
+    game = 0
+    while time.time() < stop_at:
+        game_id = f"{session}-{game}"
+        board = Board(size)
+        player = 1
+        while time.time() < stop_at and len(board.move_history) < max_moves:
+            if player == 1:
+                time.sleep(min(rng.expovariate(1 / think) if think > 0 else 0, max(0, stop_at - time.time())))
+                if time.time() >= stop_at:
+                    break
+                row, col = human_move(board, rng)
+            else:
+                start = time.perf_counter()
+                try:
+                    row, col = backend.move(game_id, board)
+                except BackendError:
+                    counters['errors'] += 1
+                    break
+                latencies.append(time.perf_counter() - start)
+            board.place_piece(row, col, player)
+            if check_win(board, row, col) or board.is_full():
+                break
+            player = -player
+        counters['games'] += 1
+        try:
+            backend.end(game_id)
+        except BackendError:
+            pass
+        game += 1
+
+
+def run_load_test(backend, sessions=8, duration=60.0, think=2.0, size=15, max_moves=60, sample_every=1.0, seed=0):
+    """
+    Run the sessions against a backend for `duration` seconds.
+
+    Returns:
+        dict: The report (latencies in milliseconds, RSS in bytes)
+    """
+    latencies = []
+    counters = [{'errors': 0, 'games': 0} for _ in range(sessions)]
+    rss_series = []
+    first = backend.sample()
+    start = time.time()
+    stop_at = start + duration
+
+    threads = []
+    for session in range(sessions):
+        rng = random.Random(seed * 1000 + session)
+        thread = threading.Thread(target=run_session, daemon=True, args=(
+            backend, f"load-{session}", stop_at, think, size, max_moves, rng, latencies, counters[session]))
+        threads.append(thread)
+        thread.start()
+
+    last = dict(first)
+    while any(thread.is_alive() for thread in threads):
+        time.sleep(min(sample_every, max(0.05, stop_at - time.time())))
+        try:
+            sample = backend.sample()
+        except BackendError:
+            continue
+        last.update(sample)  # A worker too busy to answer keeps its previous sample
+        rss = [value[0] for value in sample.values() if value[0] is not None]
+        if rss:
+            rss_series.append((round(time.time() - start, 2), sum(rss)))
+    elapsed = time.time() - start
+
+    utilisation = {}
+    for worker, (_, cpu) in last.items():
+        if worker in first:
+            utilisation[worker] = round((cpu - first[worker][1]) / elapsed, 3)
+
+    def ms(value):
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        'backend': backend.name, 'sessions': sessions, 'seconds': round(elapsed, 2),
+        'moves': len(latencies), 'games': sum(counter['games'] for counter in counters),
+        'errors': sum(counter['errors'] for counter in counters),
+        'moves_per_second': round(len(latencies) / elapsed, 2),
+        'latency_ms': {'p50': ms(percentile(latencies, 0.50)), 'p95': ms(percentile(latencies, 0.95)),
+                       'p99': ms(percentile(latencies, 0.99)), 'max': ms(max(latencies) if latencies else None)},
+        'rss_bytes': rss_series,
+        'rss_growth_bytes': rss_series[-1][1] - rss_series[0][1] if len(rss_series) > 1 else 0,
+        'worker_utilisation': utilisation,
+        'cores': os.cpu_count(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--think", type=float, default=2.0, help="Mean human think time in seconds")
+    parser.add_argument("--backend", choices=["inprocess", "pool", "http"], default="inprocess")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--engine", choices=["alphabeta", "minimax"], default="alphabeta")
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--size", type=int, default=15)
+    parser.add_argument("--output", help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    if args.backend == 'pool':
+        backend = ServiceBackend(args.workers, args.depth, args.engine)
+    elif args.backend == 'http':
+        backend = HttpBackend(args.url)
+    else:
+        backend = InProcessBackend(args.depth, args.engine)
+    try:
+        report = run_load_test(backend, args.sessions, args.duration, args.think, args.size)
+    finally:
+        backend.close()
+
+    latency = report['latency_ms']
+    print(f"{report['sessions']} sessions on {report['backend']} for {report['seconds']} s")
+    print(f"AI moves:        {report['moves']} ({report['moves_per_second']}/s), "
+          f"{report['games']} games, {report['errors']} errors")
+    print(f"latency (ms):    p50 {latency['p50']}  p95 {latency['p95']}  p99 {latency['p99']}  max {latency['max']}")
+    if report['rss_bytes']:
+        print(f"RSS (MB):        {report['rss_bytes'][0][1] / 2 ** 20:.1f} -> {report['rss_bytes'][-1][1] / 2 ** 20:.1f}")
+    for worker, value in sorted(report['worker_utilisation'].items()):
+        print(f"{worker + ':':16} {value * 100:.0f}% CPU")
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
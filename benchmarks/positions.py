@@ -0,0 +1,25 @@
+# Fixed positions shared by the benchmarks and the performance tests
+
+from game.board import Board
+
+# Each entry: (name, board size, moves alternating from player 1)
+POSITIONS = [
+    ("opening", 15, [(7, 7), (7, 8), (8, 7), (6, 7), (8, 8)]),
+    ("open_three", 15, [(7, 7), (6, 6), (7, 8), (8, 8), (7, 9), (9, 9)]),
+    ("midgame", 15, [(7, 7), (7, 8), (8, 8), (6, 6), (9, 9), (10, 10), (8, 6), (6, 8), (8, 7), (8, 9)]),
+    ("small_board", 9, [(4, 4), (4, 5), (5, 5), (3, 3), (5, 4), (3, 4)]),
+]
+
+
+def build_board(size, moves):
+    """Play a move list (alternating from player 1) on a new board"""
+    board = Board(size=size)
+    player = 1
+    for row, col in moves:
+        board.place_piece(row, col, player)
+        player = -player
+    return board
+
+
+def side_to_move(board):
+    return -board.last_move[2] if board.last_move else 1
@@ -0,0 +1,96 @@
+"""
+Compare alpha_beta selective-search options (LMR, futility, razoring,
+threat extensions).
+
+Usage:
+    python -m benchmarks.selective_search [--depth 3] [--games 4] [--size 9]
+
+Reports nodes, eval calls and time per configuration on the fixed benchmark
+positions, then plays a short match of each configuration against the plain
+search to estimate strength.
+"""
+import argparse
+import time
+
+from ai.alphabeta import alpha_beta
+from ai.evaluation import evaluate_board
+from ai.search_config import SearchConfig, SearchStats
+from benchmarks.positions import POSITIONS, build_board, side_to_move
+from game.board import Board
+from game.game_rules import check_win, is_board_full
+from game.player import AIPlayer
+
+CONFIGURATIONS = {
+    "plain": {},
+    "lmr": {"lmr": True},
+    "futility": {"futility": True},
+    "razoring": {"razoring": True},
+    "extensions": {"extensions": True},
+    "forced": {"forced_moves": True},
+    "all": {"lmr": True, "futility": True, "razoring": True},
+}
+
+
+def measure(options, depth):
+    """Search every benchmark position; returns (nodes, evals, seconds)"""
+    stats = SearchStats()
+    start = time.perf_counter()
+    for _, size, moves in POSITIONS:
+        board = build_board(size, moves)
+        alpha_beta(board, depth, float('-inf'), float('inf'), True, evaluate_board, side_to_move(board),
+                   SearchConfig(stats=stats, **options))
+    return stats.nodes, stats.evals, time.perf_counter() - start
+
+
+def play_game(first, second, size, max_moves):
+    """Play one game; returns the symbol of the winner or 0"""
+    board = Board(size=size)
+    current, waiting = first, second
+    for _ in range(max_moves):
+        row, col = current.get_move(board)
+        board.place_piece(row, col, current.symbol)
+        if check_win(board, row, col):
+            return current.symbol
+        if is_board_full(board):
+            return 0
+        current, waiting = waiting, current
+    return 0
+
+
+def match(options, depth, games, size, max_moves):
+    """Score of a configuration against the plain search (win=1, draw=0.5)"""
+    score = 0.0
+    for game in range(games):
+        # Alternate colours so neither side always moves first
+        symbol = 1 if game % 2 == 0 else -1
+        candidate = AIPlayer(symbol, algorithm=alpha_beta, depth=depth, config=SearchConfig(**options))
+        reference = AIPlayer(-symbol, algorithm=alpha_beta, depth=depth)
+        first, second = (candidate, reference) if symbol == 1 else (reference, candidate)
+        winner = play_game(first, second, size, max_moves)
+        score += 1.0 if winner == symbol else 0.5 if winner == 0 else 0.0
+    return score
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--games", type=int, default=0, help="Match games per configuration (0 to skip)")
+    parser.add_argument("--size", type=int, default=9, help="Board size for the match games")
+    parser.add_argument("--max-moves", type=int, default=60)
+    args = parser.parse_args()
+
+    print(f"{'config':<10} {'nodes':>8} {'evals':>8} {'time (s)':>9}")
+    for name, options in CONFIGURATIONS.items():
+        nodes, evals, seconds = measure(options, args.depth)
+        print(f"{name:<10} {nodes:>8} {evals:>8} {seconds:>9.2f}")
+
+    if args.games:
+        print(f"\nMatch vs plain ({args.games} games, depth {args.depth}, {args.size}x{args.size})")
+        for name, options in CONFIGURATIONS.items():
+            if options:
+                score = match(options, args.depth, args.games, args.size, args.max_moves)
+                print(f"{name:<10} {score:.1f}/{args.games}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Trace a search and report where its nodes went.
+
+Usage:
+    python -m benchmarks.trace_report search [--position midgame] [--engine alphabeta|minimax]
+                                             [--depth 3] [--output search.trace]
+    python -m benchmarks.trace_report report search.trace [--top 10] [--json]
+
+`search` runs one traced search on a benchmark position (see
+benchmarks/positions.py) and writes the explored tree, node by node, to
+--output; `report` reads a trace file back in one pass and prints
+
+- the nodes and effective branching factor (nodes ** (1 / depth)) of each
+  search, and the nodes per ply;
+- per remaining depth: the share of internal nodes that cut off, and of
+  those cutoffs, the share made by the first move searched (a well
+  ordered search is close to 1);
+- the most expensive subtrees below the root, with their move path,
+  window and score.
+"""
+import argparse
+import json
+import time
+
+from ai.alphabeta import alpha_beta
+from ai.evaluation import evaluate_board
+from ai.minmax import minimax
+from ai.search_config import SearchConfig, SearchStats
+from ai.search_trace import SearchTracer, trace_report
+from benchmarks.positions import POSITIONS, build_board, side_to_move
+
+
+def traced_search(path, position='midgame', engine='alphabeta', depth=3):
+    """
+    Search a benchmark position with tracing on.
+
+    Returns:
+        tuple: (score, move, nodes traced, seconds)
+    """
+    _, size, moves = next(entry for entry in POSITIONS if entry[0] == position)
+    board = build_board(size, moves)
+    search = minimax if engine == 'minimax' else alpha_beta
+    with SearchTracer(path) as tracer:
+        start = time.perf_counter()
+        score, move = search(board, depth, float('-inf'), float('inf'), True, evaluate_board, side_to_move(board),
+                             config=SearchConfig(stats=SearchStats(), tracer=tracer))
+        return score, move, tracer.nodes, time.perf_counter() - start
+
+
+def _rate(value):
+    return f"{value * 100:5.1f}%" if value is not None else "    -"
+
+
+def print_report(report):
+    for search in report['searches']:
+        print(f"search {search['root']}: depth {search['depth']}, {search['nodes']} nodes, "
+              f"effective branching factor {search['effective_branching_factor']}, score {search['score']:g}")
+    print()
+    print("ply      nodes   ratio")
+    for ply, counts in report['plies'].items():
+        print(f"{ply:>3} {counts['nodes']:>10} {counts['ratio'] if counts['ratio'] is not None else '-':>7}")
+    print()
+    print("depth    nodes  cutoffs  first-move  table hits")
+    for depth, counts in report['depths'].items():
+        print(f"{depth:>5} {counts['nodes']:>8}  {_rate(counts['cutoff_rate'])}  {_rate(counts['first_move_cutoff_rate'])}"
+              f"      {counts['table_hits']:>6}")
+    print()
+    print("most expensive subtrees")
+    for subtree in report['subtrees']:
+        path = " ".join(f"{row},{col}" for row, col in subtree['path'])
+        print(f"  {path:<16} {subtree['nodes']:>8} nodes ({subtree['share'] * 100:.1f}%), depth {subtree['depth']}, "
+              f"window ({subtree['window'][0]:g}, {subtree['window'][1]:g}), score {subtree['score']:g}, "
+              f"{subtree['reason']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    search_parser = commands.add_parser("search", help="Run a traced search on a benchmark position")
+    search_parser.add_argument("--position", default="midgame", choices=[entry[0] for entry in POSITIONS])
+    search_parser.add_argument("--engine", choices=["alphabeta", "minimax"], default="alphabeta")
+    search_parser.add_argument("--depth", type=int, default=3)
+    search_parser.add_argument("--output", default="search.trace")
+    report_parser = commands.add_parser("report", help="Summarise a trace file")
+    report_parser.add_argument("trace")
+    report_parser.add_argument("--top", type=int, default=10, help="Number of subtrees to list")
+    report_parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    if args.command == "search":
+        score, move, nodes, seconds = traced_search(args.output, args.position, args.engine, args.depth)
+        print(f"{args.engine} depth {args.depth} on {args.position}: move {move}, score {score}, "
+              f"{nodes} nodes in {seconds:.2f} s -> {args.output}")
+    else:
+        report = trace_report(args.trace, args.top)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,4 @@
 from .board import Board
+from .sparse_board import SparseBoard, create_board
+from .position import Position
 from .player import Player, HumanPlayer, AIPlayer
\ No newline at end of file
@@ -1,15 +1,26 @@
+from game.zobrist import zobrist_key
+from game.position import Position
+from game.windows import LiveWindows
+
+
 class Board:
+    sparse = False  # Dense size x size grid (see SparseBoard)
+    
     def __init__(self, size=15):
         self.size = size
         self.board = [[0 for _ in range(size)] for _ in range(size)]
         self.last_move = None
         self.move_history = []
+        self.hash = 0  # Zobrist hash of the stones on the board
+        self.windows = LiveWindows(size)  # Five-cell windows each player can still complete
     
     def place_piece(self, row, col, player):
         if not self.is_valid_move(row, col):
             return False
         
         self.board[row][col] = player
+        self.hash ^= zobrist_key(row, col, player)
+        self.windows.add(row, col, player)
         self.last_move = (row, col, player)
         self.move_history.append((row, col, player))
         return True
@@ -49,6 +60,15 @@ class Board:
         
         return list(candidates) if candidates else self.get_valid_moves()
     
+    def contains(self, row, col):
+        return 0 <= row < self.size and 0 <= col < self.size
+    
+    def occupied_cells(self):
+        """
+        Coordinates of the stones on the board
+        """
+        return [(row, col) for row in range(self.size) for col in range(self.size) if self.board[row][col] != 0]
+    
     def get_cell(self, row, col):
         if 0 <= row < self.size and 0 <= col < self.size:
             return self.board[row][col]
@@ -63,16 +83,36 @@ class Board:
         """
         return [row[:] for row in self.board]
     
+    def snapshot(self):
+        """
+        Immutable copy of the current position, to share with other threads or processes
+        
+        Returns:
+            Position: The snapshot
+        """
+        return Position.from_board(self)
+    
     def undo_last_move(self):
         if not self.move_history:
             return False
         
-        last_row, last_col, _ = self.move_history.pop()
+        last_row, last_col, player = self.move_history.pop()
         self.board[last_row][last_col] = 0
+        self.hash ^= zobrist_key(last_row, last_col, player)
+        self.windows.remove(last_row, last_col, player)
         
         self.last_move = self.move_history[-1] if self.move_history else None
         return True
     
+    def is_dead_draw(self):
+        """
+        Whether neither player can complete five any more, whatever is played
+        
+        Returns:
+            bool: True when every five-cell window holds stones of both players
+        """
+        return self.windows.is_dead_draw()
+    
     def is_full(self):
         for row in range(self.size):
             for col in range(self.size):
@@ -87,10 +127,19 @@ class Board:
         self.board = [[0 for _ in range(self.size)] for _ in range(self.size)]
         self.last_move = None
         self.move_history = []
+        self.hash = 0
+        self.windows = LiveWindows(self.size)
         
         
     def set_cell(self, row, col, value): 
         if 0 <= row < self.size and 0 <= col < self.size:
+            previous = self.board[row][col]
+            if previous != 0:
+                self.hash ^= zobrist_key(row, col, previous)
+                self.windows.remove(row, col, previous)
+            if value != 0:
+                self.hash ^= zobrist_key(row, col, value)
+                self.windows.add(row, col, value)
             self.board[row][col] = value
             return True
         return False
@@ -20,7 +20,7 @@ def check_win(board, row, col):
             # Count consecutive pieces in this direction
             for step in range(1, 5):  # We need 5 in a row to win
                 r, c = row + dx * step, col + dy * step
-                if 0 <= r < board.size and 0 <= c < board.size and board.get_cell(r, c) == player:
+                if board.get_cell(r, c) == player:  # None off the board
                     count += 1
                 else:
                     break
@@ -52,27 +52,25 @@ def get_game_state(board):
         if check_win(board, row, col):
             return 'player1_win' if player == 1 else 'player2_win'
     
-    if is_board_full(board):
+    # A full board, or one where no five can be completed any more
+    if is_board_full(board) or board.is_dead_draw():
         return 'draw'
     
     return 'in_progress'
 
 
 def get_valid_moves_with_heuristics(board, distance=2):
-    size = board.size
     valid_moves = set()
-    for row in range(size):
-        for col in range(size):
-            if board.get_cell(row, col) != 0:
-                for dr in range(-distance, distance + 1):
-                    for dc in range(-distance, distance + 1):
-                        nr, nc = row + dr, col + dc
-                        if 0 <= nr < size and 0 <= nc < size and board.get_cell(nr, nc) == 0:
-                            valid_moves.add((nr, nc))
+    for row, col in board.occupied_cells():
+        for dr in range(-distance, distance + 1):
+            for dc in range(-distance, distance + 1):
+                nr, nc = row + dr, col + dc
+                if board.get_cell(nr, nc) == 0:  # None off the board
+                    valid_moves.add((nr, nc))
 
     # Fallback: first move or isolated stones
     if not valid_moves:
-        center = size // 2
+        center = board.size // 2
         return [(center, center)]
 
     return list(valid_moves)
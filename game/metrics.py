@@ -0,0 +1,191 @@
+# Per-move search metrics exported as JSON lines and Prometheus text
+
+import bisect
+import json
+import os
+import sys
+import time
+
+# Upper bounds (seconds) of the move latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def rss_bytes():
+    """
+    Resident set size of this process, in bytes. Where /proc is missing,
+    the peak RSS is returned instead; None if neither is available.
+    """
+    try:
+        with open('/proc/self/statm') as handle:
+            return int(handle.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # Bytes on macOS, KiB elsewhere
+
+
+class EngineMetrics:
+    """Aggregated metrics of one engine configuration"""
+    __slots__ = ('buckets', 'moves', 'seconds', 'nodes', 'table_hits', 'depth')
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # Last bucket is +Inf
+        self.moves = 0
+        self.seconds = 0.0
+        self.nodes = 0
+        self.table_hits = 0
+        self.depth = 0  # Depth reached by the last search
+
+    def percentile(self, q):
+        """
+        Latency percentile estimated from the histogram (upper bucket bound).
+
+        Args:
+            q (float): Quantile between 0 and 1
+
+        Returns:
+            float: Seconds, or None before the first move
+        """
+        if not self.moves:
+            return None
+        rank = q * self.moves
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                return LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else float('inf')
+        return float('inf')
+
+
+class MetricsRecorder:
+    """
+    Records per-move latency, nodes, depth and table hits for AIPlayer.
+
+    record_move() only updates counters and queues a JSON line, so it is
+    cheap enough to leave on. Files are written by flush(), which runs every
+    `flush_every` moves and on close():
+
+    - `jsonl_path` gets one line per move and rotates to .1, .2, ... once it
+      grows past `max_bytes`, keeping `backups` old files;
+    - `prometheus_path` is rewritten atomically with the histograms and
+      counters in Prometheus text format, for a local scraper
+      (e.g. node_exporter's textfile collector).
+    """
+    def __init__(self, jsonl_path=None, prometheus_path=None, max_bytes=10 * 1024 * 1024, backups=3,
+                 flush_every=50):
+        self.jsonl_path = jsonl_path
+        self.prometheus_path = prometheus_path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_every = flush_every
+        self.engines = {}
+        self.pending = []
+
+    @classmethod
+    def from_env(cls, variable='GOMOKU_METRICS_DIR'):
+        """Recorder writing into the directory named by an environment variable, or None if unset"""
+        directory = os.environ.get(variable)
+        if not directory:
+            return None
+        os.makedirs(directory, exist_ok=True)
+        return cls(os.path.join(directory, 'moves.jsonl'), os.path.join(directory, 'gomoku.prom'))
+
+    def record_move(self, label, seconds, nodes=0, depth=None, table_hits=0):
+        """
+        Record one move.
+
+        Args:
+            label (str): Engine configuration, e.g. "alpha_beta-d3"
+            seconds (float): Time spent choosing the move
+            nodes (int): Nodes (or MCTS iterations) searched
+            depth (int): Search depth reached (None if not applicable)
+            table_hits (int): Nodes answered by the transposition table
+        """
+        engine = self.engines.get(label)
+        if engine is None:
+            engine = self.engines[label] = EngineMetrics()
+        engine.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        engine.moves += 1
+        engine.seconds += seconds
+        engine.nodes += nodes
+        engine.table_hits += table_hits
+        if depth is not None:
+            engine.depth = depth
+
+        self.pending.append((time.time(), label, seconds, nodes, depth, table_hits))
+        if len(self.pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self.jsonl_path is not None and self.pending:
+            self._write_lines()
+        self.pending = []
+        if self.prometheus_path is not None:
+            self._write_prometheus()
+
+    def close(self):
+        self.flush()
+
+    def _write_lines(self):
+        lines = []
+        for timestamp, label, seconds, nodes, depth, table_hits in self.pending:
+            lines.append(json.dumps({
+                'time': round(timestamp, 3), 'engine': label, 'seconds': round(seconds, 6), 'nodes': nodes,
+                'nodes_per_sec': round(nodes / seconds) if seconds > 0 else None, 'depth': depth,
+                'table_hit_rate': round(table_hits / nodes, 4) if nodes else None,
+            }))
+        with open(self.jsonl_path, 'a') as handle:
+            handle.write('\n'.join(lines) + '\n')
+            size = handle.tell()
+        if size > self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        for index in range(self.backups - 1, 0, -1):
+            older = f"{self.jsonl_path}.{index}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.jsonl_path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self.jsonl_path, f"{self.jsonl_path}.1")
+        else:
+            os.remove(self.jsonl_path)
+
+    def prometheus_text(self):
+        """The current metrics in Prometheus text exposition format"""
+        lines = [
+            '# HELP gomoku_move_seconds Time spent choosing a move.',
+            '# TYPE gomoku_move_seconds histogram',
+        ]
+        for label, engine in sorted(self.engines.items()):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), engine.buckets):
+                cumulative += count
+                lines.append(f'gomoku_move_seconds_bucket{{engine="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'gomoku_move_seconds_sum{{engine="{label}"}} {engine.seconds:.6f}')
+            lines.append(f'gomoku_move_seconds_count{{engine="{label}"}} {engine.moves}')
+
+        series = (
+            ('gomoku_nodes_total', 'counter', 'Nodes searched.', lambda e: e.nodes),
+            ('gomoku_table_hits_total', 'counter', 'Nodes answered by the transposition table.',
+             lambda e: e.table_hits),
+            ('gomoku_nodes_per_second', 'gauge', 'Average search speed.',
+             lambda e: round(e.nodes / e.seconds, 1) if e.seconds else 0),
+            ('gomoku_search_depth', 'gauge', 'Depth reached by the last search.', lambda e: e.depth),
+        )
+        for name, kind, help_text, value in series:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for label, engine in sorted(self.engines.items()):
+                lines.append(f'{name}{{engine="{label}"}} {value(engine)}')
+        return '\n'.join(lines) + '\n'
+
+    def _write_prometheus(self):
+        # Write then rename, so a scraper never reads a half-written file
+        temporary = self.prometheus_path + '.tmp'
+        with open(temporary, 'w') as handle:
+            handle.write(self.prometheus_text())
+        os.replace(temporary, self.prometheus_path)
@@ -1,3 +1,6 @@
+import time
+
+
 class Player:
     """
     Abstract base class for players
@@ -10,6 +13,14 @@ class Player:
     
     def get_move(self, board):
         raise NotImplementedError("Subclasses must implement get_move()")
+    
+    def new_game(self):
+        """Called before the first move of a game"""
+        pass
+    
+    def notify_move(self, row, col, player):
+        """Called after every move played on the board, by either side"""
+        pass
 
 
 class HumanPlayer(Player):
@@ -19,28 +30,155 @@ class HumanPlayer(Player):
         pass
 
 
+def config_key(config, max_moves=None):
+    """
+    Fingerprint of the search settings that change a search's results, for
+    the position cache: the selective features, the beam and minimax's
+    max_moves. Empty for the plain search.
+    
+    Args:
+        config (SearchConfig): Search options (None for the plain search)
+        max_moves (int): minimax's move limit (None when the search has none)
+    
+    Returns:
+        str: Suffix of the cache name
+    """
+    parts = []
+    if max_moves is not None:
+        parts.append(f"m{max_moves}")
+    if config is not None:
+        if config.lmr:
+            parts.append(f"lmr{config.lmr_min_moves}/{config.lmr_min_depth}/{config.lmr_reduction}")
+        if config.futility:
+            parts.append("fut")
+        if config.razoring:
+            parts.append("razor")
+        if config.extensions:
+            parts.append(f"ext{config.max_extension}")
+        if config.forced_moves:
+            parts.append("forced")
+        if config.beam:
+            widths = ",".join(f"{depth}:{width}" for depth, width in sorted(config.beam_widths.items()))
+            parts.append(f"beam{config.beam_margin}/{widths}")
+    return "".join(':' + part for part in parts)
+
+
 class AIPlayer(Player):
-    def __init__(self, symbol, algorithm, depth=3, eval_fn=None):
+    """
+    AI player driven by a search function (minimax, alpha_beta) or by an
+    engine object exposing get_move(board, player_symbol), such as MCTSEngine.
+
+    An optional ProofNumberSolver acts as a tactical oracle: when it proves a
+    forced win the first move of the winning line is played directly.
+    
+    `config` is an optional SearchConfig passed to the search function.
+    
+    alpha_beta is run through a SearchEngine owned by the player, which keeps
+    its tables between moves. The game loop reports every move played with
+    notify_move() and a new game with new_game().
+    
+    With a MetricsRecorder, the latency, nodes, depth and table hits of every
+    searched move are recorded under `metrics_label` (by default the
+    algorithm name and depth).
+    
+    With a PositionCache, a position searched before at least as deep (in
+    this or an earlier run) with the same settings is answered from the
+    cache, and the results of new searches are written back.
+    
+    `max_moves` is the number of moves minimax explores per node.
+    """
+    def __init__(self, symbol, algorithm, depth=3, eval_fn=None, solver=None, config=None, metrics=None,
+                 metrics_label=None, cache=None, max_moves=10):
         super().__init__(symbol)
-        self.algorithm = algorithm
         self.depth = depth
+        self.solver = solver
+        self.metrics = metrics
+        self.cache = cache
+        self.max_moves = max_moves
         from ai.evaluation import evaluate_board
         self.eval_fn = eval_fn or evaluate_board
+        name = getattr(algorithm, '__name__', type(algorithm).__name__)
+        # Cached results are only shared by the same search, evaluation and settings
+        self.cache_name = (f"{name}:{getattr(self.eval_fn, '__name__', 'eval')}"
+                           f"{config_key(config, max_moves if name == 'minimax' else None)}")
+        self.metrics_label = metrics_label or (f"{name}-d{depth}" if callable(algorithm) and
+                                               not hasattr(algorithm, 'get_move') else name)
+        if metrics is not None and (config is None or config.stats is None):
+            # Metrics need the search counters
+            import copy
+            from ai.search_config import SearchConfig, SearchStats
+            config = copy.copy(config) if config is not None else SearchConfig()
+            config.stats = SearchStats()
+        self.config = config
+        if name == 'alpha_beta':
+            from ai.search_engine import SearchEngine
+            algorithm = SearchEngine(depth, self.eval_fn, config)
+        self.algorithm = algorithm
+    
+    def new_game(self):
+        """Reset the state the engine kept from a previous game"""
+        if hasattr(self.algorithm, 'new_game'):
+            self.algorithm.new_game()
+    
+    def notify_move(self, row, col, player):
+        """Tell the engine about a move played on the board, by either side"""
+        if hasattr(self.algorithm, 'notify_move'):
+            self.algorithm.notify_move(row, col, player)
     
     def get_move(self, board):
-        from game.game_rules import get_valid_moves_with_heuristics
-        
         # For the first move on an empty board, just place in the center
         if not board.move_history:
             center = board.size // 2
             return center, center
         
-        # Run the search algorithm
-        if self.algorithm.__name__ == 'minimax':
-            _, move = self.algorithm(board, self.depth, float('-inf'), float('inf'), self.symbol == 1, self.eval_fn,
-                                    self.symbol)
-        else:  # alpha-beta
-            _, move = self.algorithm(board, self.depth, float('-inf'), float('inf'), 
-                                    self.symbol == 1, self.eval_fn, self.symbol)
+        if self.metrics is None:
+            return self._search(board)
+        
+        stats = self.config.stats
+        nodes, hits = stats.nodes, stats.table_hits
+        iterations = getattr(self.algorithm, 'iterations', None)
+        start = time.perf_counter()
+        move = self._search(board)
+        elapsed = time.perf_counter() - start
+        if iterations is not None:  # MCTS counts iterations instead of nodes
+            nodes, depth = self.algorithm.iterations, None
+        else:
+            nodes, depth = stats.nodes - nodes, getattr(self.algorithm, 'completed_depth', self.depth)
+        self.metrics.record_move(self.metrics_label, elapsed, nodes, depth, stats.table_hits - hits)
+        return move
+    
+    def _search(self, board):
+        # Play a proven win without searching
+        if self.solver is not None:
+            proof = self.solver.solve(board, self.symbol)
+            if proof.result == 'proven' and proof.line:
+                return proof.line[0]
+        
+        # Reuse a result at least as deep as this player searches
+        if self.cache is not None:
+            from ai.search_config import EXACT
+            entry = self.cache.lookup(board, self.symbol, self.cache_name)
+            if (entry is not None and entry.depth >= self.depth and entry.bound == EXACT and entry.move is not None
+                    and board.is_valid_move(*entry.move)):
+                return entry.move
+        
+        # Engine objects keep their own state and time budget between moves
+        depth = self.depth
+        if hasattr(self.algorithm, 'search'):
+            score, move = self.algorithm.search(board, self.symbol)
+            depth = self.algorithm.completed_depth  # Shallower when the time limit cut the search
+        elif hasattr(self.algorithm, 'get_move'):
+            return self.algorithm.get_move(board, self.symbol)
+        else:
+            # Run the search algorithm
+            options = {'config': self.config} if self.config is not None else {}
+            if self.algorithm.__name__ == 'minimax':
+                score, move = self.algorithm(board, self.depth, float('-inf'), float('inf'), self.symbol == 1,
+                                             self.eval_fn, self.symbol, self.max_moves, **options)
+            else:  # alpha-beta
+                score, move = self.algorithm(board, self.depth, float('-inf'), float('inf'),
+                                             self.symbol == 1, self.eval_fn, self.symbol, **options)
         
+        if self.cache is not None and move is not None and depth > 0:
+            self.cache.store(board, self.symbol, self.cache_name, depth, score, move)
         return move
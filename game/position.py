@@ -0,0 +1,178 @@
+from game.windows import LiveWindows
+from game.zobrist import zobrist_key
+
+
+class Position:
+    """
+    Immutable snapshot of a dense board.
+
+    play() returns a new Position and leaves its parent untouched. The grid
+    is a tuple of row tuples and a child shares every row but the one the
+    move changes with its parent; the move history is a linked tail
+    (move, parent tail), so branching a position costs one row and one
+    history cell, and the hash is updated incrementally.
+
+    Positions are never modified, so they can be shared between threads
+    freely, used as dict keys, and pickled for worker processes. They
+    offer the read-only interface of Board (get_cell, get_valid_moves,
+    the `board` grid, ...), so the evaluation runs on them directly; the
+    search, which plays and undoes moves, runs on to_board().
+    """
+    __slots__ = ('size', 'board', 'hash', 'last_move', 'stones', '_tail')
+    sparse = False
+
+    def __init__(self, size=15):
+        row = (0,) * size
+        self._set(size, (row,) * size, 0, None, 0)
+
+    def _set(self, size, board, hash, tail, stones):
+        set_slot = object.__setattr__
+        set_slot(self, 'size', size)
+        set_slot(self, 'board', board)
+        set_slot(self, 'hash', hash)
+        set_slot(self, '_tail', tail)
+        set_slot(self, 'last_move', tail[0] if tail is not None else None)
+        set_slot(self, 'stones', stones)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Position is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Position is immutable")
+
+    @classmethod
+    def from_board(cls, board):
+        """
+        Snapshot of a Board (or bounded SparseBoard).
+
+        Returns:
+            Position: A position with the same stones, history and hash
+        """
+        grid = tuple(tuple(row) for row in board.get_board_copy())
+        tail = None
+        for move in board.move_history:
+            tail = (move, tail)
+        position = cls.__new__(cls)
+        position._set(board.size, grid, board.hash, tail, sum(1 for row in grid for cell in row if cell != 0))
+        return position
+
+    def play(self, row, col, player):
+        """
+        Position after a move.
+
+        Args:
+            row (int): Row index
+            col (int): Column index
+            player (int): Player symbol (1 or -1)
+
+        Returns:
+            Position: The new position
+
+        Raises:
+            ValueError: If the cell is off the board or occupied
+        """
+        if not self.is_valid_move(row, col):
+            raise ValueError(f"Invalid move {(row, col)}")
+        changed = self.board[row]
+        changed = changed[:col] + (player,) + changed[col + 1:]
+        position = Position.__new__(Position)
+        position._set(self.size, self.board[:row] + (changed,) + self.board[row + 1:],
+                      self.hash ^ zobrist_key(row, col, player), ((row, col, player), self._tail), self.stones + 1)
+        return position
+
+    @property
+    def move_history(self):
+        """Moves played, oldest first (a new list on every access)"""
+        moves = []
+        tail = self._tail
+        while tail is not None:
+            moves.append(tail[0])
+            tail = tail[1]
+        moves.reverse()
+        return moves
+
+    def to_board(self):
+        """
+        Mutable copy of the position, for the search
+
+        Returns:
+            Board: A board with the same stones, history and hash
+        """
+        from game.board import Board
+        board = Board(self.size)
+        board.board = [list(row) for row in self.board]
+        board.move_history = self.move_history
+        board.last_move = self.last_move
+        board.hash = self.hash
+        board.windows = LiveWindows.count(board)
+        return board
+
+    def contains(self, row, col):
+        return 0 <= row < self.size and 0 <= col < self.size
+
+    def get_cell(self, row, col):
+        if 0 <= row < self.size and 0 <= col < self.size:
+            return self.board[row][col]
+        return None
+
+    def is_valid_move(self, row, col):
+        return 0 <= row < self.size and 0 <= col < self.size and self.board[row][col] == 0
+
+    def get_valid_moves(self):
+        return [(row, col) for row in range(self.size) for col in range(self.size) if self.board[row][col] == 0]
+
+    def get_restricted_valid_moves(self, proximity=2):
+        """
+        Get valid moves that are close to existing pieces
+        """
+        candidates = set()
+        for row, col in self.occupied_cells():
+            for dr in range(-proximity, proximity + 1):
+                for dc in range(-proximity, proximity + 1):
+                    if self.is_valid_move(row + dr, col + dc):
+                        candidates.add((row + dr, col + dc))
+        return list(candidates) if candidates else self.get_valid_moves()
+
+    def occupied_cells(self):
+        """
+        Coordinates of the stones on the board
+        """
+        return [(row, col) for row in range(self.size) for col in range(self.size) if self.board[row][col] != 0]
+
+    def get_board_copy(self):
+        """
+        Get a copy of the current board state
+
+        Returns:
+            list: 2D list representing the board
+        """
+        return [list(row) for row in self.board]
+
+    def is_full(self):
+        return self.stones == self.size * self.size
+
+    def is_dead_draw(self):
+        """Whether neither player can complete five any more (counted on each call)"""
+        return LiveWindows.count(self).is_dead_draw()
+
+    def __eq__(self, other):
+        return isinstance(other, Position) and self.hash == other.hash and self.board == other.board
+
+    def __hash__(self):
+        return self.hash
+
+    def __reduce__(self):
+        # Pickle the history as a flat list: the linked tail would nest one level per move
+        return _restore, (self.size, self.board, self.move_history, self.hash)
+
+    def __repr__(self):
+        return f"Position(size={self.size}, stones={self.stones}, last_move={self.last_move})"
+
+
+def _restore(size, board, moves, hash):
+    tail = None
+    for move in moves:
+        tail = (move, tail)
+    position = Position.__new__(Position)
+    position._set(size, board, hash, tail, sum(1 for row in board for cell in row if cell != 0))
+    return position
@@ -0,0 +1,178 @@
+from game.board import Board
+from game.windows import LiveWindows
+from game.zobrist import zobrist_key
+
+# Largest board the dense grid is used for
+MAX_DENSE_SIZE = 19
+
+# Largest bounded board offered by the game front ends
+MAX_BOARD_SIZE = 100
+
+
+class SparseBoard:
+    """
+    Board backend that stores only the stones, for large and unbounded boards.
+
+    Stones live in a dict keyed by (row, col). Occupied rows and columns
+    are counted as stones are placed, which gives the bounding box of the
+    position, so scans cost time in the number of stones rather than the
+    area of the board.
+
+    With `infinite=True` any integer coordinates are on the board ("infinite
+    Gomoku") and `size` is only the nominal playing area used for the
+    opening move and the initial view.
+
+    The interface is the one of Board, minus the `board` grid attribute.
+    """
+    sparse = True
+
+    def __init__(self, size=15, infinite=False):
+        self.size = size
+        self.infinite = infinite
+        self.clear()
+
+    def clear(self):
+        """
+        Clear the board to its initial state
+        """
+        self.stones = {}
+        self.rows = {}
+        self.cols = {}
+        self.last_move = None
+        self.move_history = []
+        self.hash = 0
+        # Five-cell windows each player can still complete (every line stays open on an infinite board)
+        self.windows = None if self.infinite else LiveWindows(self.size)
+
+    def contains(self, row, col):
+        """Whether (row, col) is on the board"""
+        return self.infinite or (0 <= row < self.size and 0 <= col < self.size)
+
+    def place_piece(self, row, col, player):
+        if not self.is_valid_move(row, col):
+            return False
+
+        self._add(row, col, player)
+        self.last_move = (row, col, player)
+        self.move_history.append((row, col, player))
+        return True
+
+    def is_valid_move(self, row, col):
+        return self.contains(row, col) and (row, col) not in self.stones
+
+    def get_valid_moves(self):
+        """
+        Empty cells of the board; on an infinite board, the empty cells of the
+        bounding box grown by one.
+        """
+        if self.infinite:
+            if not self.stones:
+                center = self.size // 2
+                return [(center, center)]
+            min_row, max_row, min_col, max_col = self.bounds()
+            rows, cols = range(min_row - 1, max_row + 2), range(min_col - 1, max_col + 2)
+        else:
+            rows, cols = range(self.size), range(self.size)
+        return [(row, col) for row in rows for col in cols if (row, col) not in self.stones]
+
+    def get_restricted_valid_moves(self, proximity=2):
+        """
+        Get valid moves that are close to existing pieces
+        """
+        candidates = set()
+        for row, col in self.stones:
+            for dr in range(-proximity, proximity + 1):
+                for dc in range(-proximity, proximity + 1):
+                    if self.is_valid_move(row + dr, col + dc):
+                        candidates.add((row + dr, col + dc))
+        return list(candidates) if candidates else self.get_valid_moves()
+
+    def occupied_cells(self):
+        return self.stones.keys()
+
+    def get_cell(self, row, col):
+        if self.contains(row, col):
+            return self.stones.get((row, col), 0)
+        return None
+
+    def get_board_copy(self):
+        """
+        Get a copy of the current board state
+
+        Returns:
+            list: 2D list representing the board
+        """
+        if self.infinite:
+            raise ValueError("An infinite board has no dense copy")
+        grid = [[0] * self.size for _ in range(self.size)]
+        for (row, col), player in self.stones.items():
+            grid[row][col] = player
+        return grid
+
+    def undo_last_move(self):
+        if not self.move_history:
+            return False
+
+        last_row, last_col, _ = self.move_history.pop()
+        self._remove(last_row, last_col)
+
+        self.last_move = self.move_history[-1] if self.move_history else None
+        return True
+
+    def is_full(self):
+        return not self.infinite and len(self.stones) == self.size * self.size
+
+    def is_dead_draw(self):
+        """Whether neither player can complete five any more, whatever is played"""
+        return self.windows is not None and self.windows.is_dead_draw()
+
+    def set_cell(self, row, col, value):
+        if not self.contains(row, col):
+            return False
+        if (row, col) in self.stones:
+            self._remove(row, col)
+        if value != 0:
+            self._add(row, col, value)
+        return True
+
+    def bounds(self):
+        """
+        Bounding box of the stones.
+
+        Returns:
+            tuple: (min_row, max_row, min_col, max_col), or None on an empty board
+        """
+        if not self.stones:
+            return None
+        return min(self.rows), max(self.rows), min(self.cols), max(self.cols)
+
+    def _add(self, row, col, player):
+        self.stones[(row, col)] = player
+        self.hash ^= zobrist_key(row, col, player)
+        if self.windows is not None:
+            self.windows.add(row, col, player)
+        for lines, key in ((self.rows, row), (self.cols, col)):
+            lines[key] = lines.get(key, 0) + 1
+
+    def _remove(self, row, col):
+        player = self.stones.pop((row, col))
+        self.hash ^= zobrist_key(row, col, player)
+        if self.windows is not None:
+            self.windows.remove(row, col, player)
+        for lines, key in ((self.rows, row), (self.cols, col)):
+            if lines[key] == 1:
+                del lines[key]
+            else:
+                lines[key] -= 1
+
+
+def create_board(size=15):
+    """
+    Board for a game: the dense grid up to MAX_DENSE_SIZE, the sparse
+    backend for larger boards, and an infinite sparse board for size None.
+    """
+    if size is None:
+        return SparseBoard(infinite=True)
+    if size > MAX_DENSE_SIZE:
+        return SparseBoard(size)
+    return Board(size)
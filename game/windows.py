@@ -0,0 +1,77 @@
+# Five-cell windows of a bounded board, and how many of them each player can still complete
+
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+# Board size -> (windows through each cell, indexed by row * size + col; number of windows)
+_TABLES = {}
+
+
+def cell_windows(size):
+    """
+    Ids of the five-cell windows through each cell, built once per size.
+
+    Returns:
+        tuple: (tuple of window id tuples, one per cell (row * size + col), number of windows)
+    """
+    tables = _TABLES.get(size)
+    if tables is None:
+        cells = [[] for _ in range(size * size)]
+        count = 0
+        for dr, dc in DIRECTIONS:
+            for row in range(size):
+                for col in range(size):
+                    if 0 <= row + 4 * dr < size and 0 <= col + 4 * dc < size:
+                        for i in range(5):
+                            cells[(row + i * dr) * size + col + i * dc].append(count)
+                        count += 1
+        tables = (tuple(tuple(windows) for windows in cells), count)
+        _TABLES[size] = tables
+    return tables
+
+
+class LiveWindows:
+    """
+    Counts of the windows each player can still complete five in: those
+    holding none of the opponent's stones.
+
+    The counts are kept up to date stone by stone (add and remove cost one
+    step per window through the cell, at most 20). When neither player has
+    a live window left, no five can ever be made: the game is a draw
+    whatever is played.
+    """
+    __slots__ = ('size', 'cells', 'stones', 'live')
+
+    def __init__(self, size):
+        self.size = size
+        self.cells, total = cell_windows(size)
+        self.stones = {1: [0] * total, -1: [0] * total}  # Stones of each player in each window
+        self.live = {1: total, -1: total}
+
+    @classmethod
+    def count(cls, board):
+        """Live windows of a board's stones, counted from scratch"""
+        windows = cls(board.size)
+        for row, col in board.occupied_cells():
+            windows.add(row, col, board.get_cell(row, col))
+        return windows
+
+    def add(self, row, col, player):
+        stones = self.stones[player]
+        lost = 0
+        for window in self.cells[row * self.size + col]:
+            if stones[window] == 0:
+                lost += 1  # The opponent can no longer complete this window
+            stones[window] += 1
+        self.live[-player] -= lost
+
+    def remove(self, row, col, player):
+        stones = self.stones[player]
+        freed = 0
+        for window in self.cells[row * self.size + col]:
+            stones[window] -= 1
+            if stones[window] == 0:
+                freed += 1
+        self.live[-player] += freed
+
+    def is_dead_draw(self):
+        return self.live[1] == 0 and self.live[-1] == 0
@@ -0,0 +1,32 @@
+# Zobrist hashing for board positions
+
+from functools import lru_cache
+
+_MASK = (1 << 64) - 1
+
+
+def _splitmix64(value):
+    value = (value + 0x9E3779B97F4A7C15) & _MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK
+    return value ^ (value >> 31)
+
+
+@lru_cache(maxsize=None)
+def zobrist_key(row, col, player):
+    """
+    64-bit key of a stone, derived from its coordinates.
+
+    Keys do not depend on the board size, so positions hash the same way on
+    every board backend.
+
+    Args:
+        row (int): Row of the stone
+        col (int): Column of the stone
+        player (int): Player symbol (1 or -1)
+
+    Returns:
+        int: The Zobrist key
+    """
+    packed = ((row & 0xFFFFF) << 24) | ((col & 0xFFFFF) << 2) | (1 if player == 1 else 2)
+    return _splitmix64(packed)
@@ -0,0 +1,267 @@
+"""
+Headless engine speaking the Gomocup / Piskvork text protocol on stdin/stdout.
+
+Usage:
+    python gomocup_engine.py [--engine alphabeta|minimax|mcts] [--depth N]
+
+Coordinates follow the protocol: "x,y" where x is the column and y the row,
+both starting at 0. Commands are read by an asyncio loop while the search
+runs on a worker thread, so INFO, STOP and END are handled mid-search.
+Every engine searches within the time budget set by INFO timeout_turn and
+time_left; alphabeta and minimax deepen iteratively up to --depth.
+"""
+import argparse
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from game.board import Board
+from game.player import AIPlayer
+from game.game_rules import get_valid_moves_with_heuristics
+from ai.minmax import minimax
+from ai.alphabeta import alpha_beta
+from ai.mcts import MCTSEngine
+from ai.search_engine import SearchEngine
+
+ABOUT = 'name="Gomoku_Game", version="1.0", country="EG"'
+
+# Time kept in reserve for protocol I/O when a per-turn timeout is given
+TIME_MARGIN = 0.1
+
+
+class GomocupSession:
+    """
+    State of one protocol session: the board, the AI player and the
+    time settings received through INFO.
+    """
+
+    def __init__(self, engine='alphabeta', depth=2, output=None):
+        self.engine = engine
+        self.depth = depth
+        self.output = output or sys.stdout
+        self.board = None
+        self.player = None
+        self.own_symbol = None    # 1 when we opened the game, -1 when the opponent did
+        self.timeout_turn = None  # Seconds per move
+        self.time_left = None     # Seconds left in the match
+        self.search_task = None
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.finished = False
+        self._board_lines = None
+        self._skip_board = False  # Inside a BOARD block sent before START
+
+    def send(self, text):
+        self.output.write(text + "\n")
+        self.output.flush()
+
+    def _new_player(self, symbol):
+        if self.engine == 'mcts':
+            algorithm = MCTSEngine(time_limit=self._time_budget())
+        else:
+            algorithm = SearchEngine(self.depth, time_limit=self._time_budget(),
+                                     algorithm=minimax if self.engine == 'minimax' else alpha_beta)
+        return AIPlayer(symbol, algorithm=algorithm, depth=self.depth)
+
+    def _time_budget(self):
+        budgets = [t for t in (self.timeout_turn, self.time_left and self.time_left / 10) if t]
+        if not budgets:
+            return 1.0
+        return max(0.05, min(budgets) - TIME_MARGIN)
+
+    async def handle(self, line):
+        """Process one input line"""
+        line = line.strip()
+        if not line:
+            return
+
+        if self._skip_board:
+            if line.upper() == 'DONE':
+                self._skip_board = False
+            return
+        if self._board_lines is not None:
+            if line.upper() == 'DONE':
+                await self._finish_board()
+            else:
+                self._board_lines.append(line)
+            return
+
+        command, _, argument = line.partition(' ')
+        command = command.upper()
+
+        # Commands that must not wait for a running search
+        if command == 'INFO':
+            self._info(argument)
+            return
+        if command in ('STOP', 'YXSTOP'):
+            self._stop_search()
+            return
+        if command == 'END':
+            self._stop_search()
+            self.finished = True
+            return
+        if command == 'ABOUT':
+            self.send(ABOUT)
+            return
+
+        await self._wait_for_search()
+
+        if command == 'START':
+            self._start(argument)
+        elif command == 'RESTART':
+            if self.board is None:
+                self.send("ERROR no game started")
+            else:
+                self._start(str(self.board.size))
+        elif command == 'BEGIN':
+            self._think(own_symbol=1)
+        elif command == 'TURN':
+            move = self._parse_move(argument)
+            if move is None:
+                return
+            # Without a move of ours yet the opponent opened the game
+            own_symbol = self.own_symbol or -1
+            if not self.board.place_piece(move[1], move[0], -own_symbol):
+                self.send(f"ERROR invalid move {argument}")
+                return
+            if self.player is not None:
+                self.player.notify_move(move[1], move[0], -own_symbol)
+            self._think(own_symbol)
+        elif command == 'BOARD':
+            if self.board is None:
+                self.send("ERROR no game started")
+                self._skip_board = True
+            else:
+                self._board_lines = []
+        else:
+            self.send(f"UNKNOWN command {command}")
+
+    def _start(self, argument):
+        try:
+            size = int(argument)
+        except ValueError:
+            self.send("ERROR invalid board size")
+            return
+        if size < 5:
+            self.send("ERROR board size must be at least 5")
+            return
+        self.board = Board(size=size)
+        self._new_game()
+        self.send("OK")
+
+    def _info(self, argument):
+        key, _, value = argument.partition(' ')
+        try:
+            milliseconds = int(value)
+        except ValueError:
+            return
+        if key == 'timeout_turn':
+            self.timeout_turn = milliseconds / 1000 if milliseconds > 0 else None
+        elif key == 'time_left':
+            self.time_left = milliseconds / 1000
+        if self.player is not None:
+            self.player.algorithm.time_limit = self._time_budget()
+
+    def _parse_move(self, argument):
+        try:
+            x, y = (int(part) for part in argument.split(',')[:2])
+        except ValueError:
+            self.send(f"ERROR invalid coordinates {argument}")
+            return None
+        if self.board is None:
+            self.send("ERROR no game started")
+            return None
+        return x, y
+
+    async def _finish_board(self):
+        lines, self._board_lines = self._board_lines, None
+        stones = []
+        for line in lines:
+            try:
+                x, y, field = (int(part) for part in line.split(','))
+            except ValueError:
+                self.send(f"ERROR invalid board line {line}")
+                return
+            stones.append((x, y, field))
+
+        # Whoever has fewer (or equal) stones is to move; field 1 is our own stone
+        own_count = sum(1 for *_, field in stones if field == 1)
+        own_symbol = 1 if own_count == len(stones) - own_count else -1
+        self.board.clear()
+        self._new_game()
+        for x, y, field in stones:
+            self.board.place_piece(y, x, own_symbol if field == 1 else -own_symbol)
+        self._think(own_symbol)
+
+    def _new_game(self):
+        """Clear what the engine learned in the previous game"""
+        self.own_symbol = None
+        if self.player is not None:
+            self.player.new_game()
+
+    def _think(self, own_symbol):
+        if self.board is None:
+            self.send("ERROR no game started")
+            return
+        self.own_symbol = own_symbol
+        if self.player is None or self.player.symbol != own_symbol:
+            self.player = self._new_player(own_symbol)
+        self.player.algorithm.time_limit = self._time_budget()
+        loop = asyncio.get_running_loop()
+        self.search_task = loop.create_task(self._search())
+
+    async def _search(self):
+        loop = asyncio.get_running_loop()
+        played = len(self.board.move_history)
+        try:
+            row, col = await loop.run_in_executor(self.executor, self.player.get_move, self.board)
+        except Exception as error:
+            # Report the failure but still answer, rather than lose the game on time
+            while len(self.board.move_history) > played:
+                self.board.undo_last_move()
+            self.send(f"ERROR search failed: {error}")
+            moves = get_valid_moves_with_heuristics(self.board)
+            if not moves:
+                return
+            row, col = moves[0]
+        if self.finished:
+            return
+        self.board.place_piece(row, col, self.player.symbol)
+        self.player.notify_move(row, col, self.player.symbol)
+        self.send(f"{col},{row}")
+
+    def _stop_search(self):
+        if self.player is not None and hasattr(self.player.algorithm, 'stop'):
+            self.player.algorithm.stop()
+
+    async def _wait_for_search(self):
+        if self.search_task is not None:
+            await self.search_task
+            self.search_task = None
+
+    async def run(self, stream=None):
+        """Read commands until END or end of input"""
+        stream = stream or sys.stdin
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=1) as reader:
+            while not self.finished:
+                line = await loop.run_in_executor(reader, stream.readline)
+                if not line:
+                    break
+                await self.handle(line)
+        if not self.finished:
+            await self._wait_for_search()
+        self.executor.shutdown(wait=False)
+        if self.player is not None and hasattr(self.player.algorithm, 'close'):
+            self.player.algorithm.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gomocup protocol engine")
+    parser.add_argument("--engine", choices=["alphabeta", "minimax", "mcts"], default="alphabeta")
+    parser.add_argument("--depth", type=int, default=2, help="Search depth for alphabeta/minimax")
+    args = parser.parse_args()
+    asyncio.run(GomocupSession(engine=args.engine, depth=args.depth).run())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,25 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
-from game.board import Board
+from game.sparse_board import MAX_BOARD_SIZE, create_board
 from game.game_rules import check_win, is_board_full
 from game.player import AIPlayer, HumanPlayer
 from ai.minmax import minimax
 from ai.alphabeta import alpha_beta
+from ai.analysis import AnalysisWorker
+import math
 import time
 
 CELL_SIZE = 40
+MAX_CANVAS = 760  # Cells shrink on large boards to keep the canvas on screen
+STONE_COLOURS = {1: "black", -1: "white"}
+ANALYSIS_REFRESH_MS = 150  # Shortest interval between two updates of the analysis overlay
+ANALYSIS_SCALE = 2000      # Strength drawn in the hottest colour (about an open four)
+
+
+def heat_colour(score):
+    """Pale yellow for the weakest cells to red for the strongest, on a log scale"""
+    t = min(1.0, math.log1p(score) / math.log1p(ANALYSIS_SCALE))
+    return f"#{255 - int(35 * t):02x}{245 - int(205 * t):02x}{200 - int(180 * t):02x}"
 
 
 class GomokuGUI:
@@ -26,7 +38,7 @@ class GomokuGUI:
         self.game_mode.grid(row=0, column=1)
 
         # Board size
-        tk.Label(self.setup_frame, text="Board Size (9-19):").grid(row=1, column=0)
+        tk.Label(self.setup_frame, text=f"Board Size (9-{MAX_BOARD_SIZE}):").grid(row=1, column=0)
         self.board_size_var = tk.IntVar(value=15)
         tk.Entry(self.setup_frame, textvariable=self.board_size_var, width=5).grid(row=1, column=1)
 
@@ -46,78 +58,230 @@ class GomokuGUI:
         self.move_limit_var = tk.StringVar(value="")
         tk.Entry(self.setup_frame, textvariable=self.move_limit_var, width=5).grid(row=4, column=1)
 
+        # Analysis overlay: strength of each candidate cell for the side to move
+        self.analysis_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.setup_frame, text="Analysis overlay", variable=self.analysis_var,
+                       command=self.toggle_analysis).grid(row=5, column=0, columnspan=2)
+
         # Start button
-        tk.Button(self.setup_frame, text="Start Game", command=self.start_game).grid(row=5, column=0, columnspan=2,
+        tk.Button(self.setup_frame, text="Start Game", command=self.start_game).grid(row=6, column=0, columnspan=2,
                                                                                      pady=10)
 
         # Canvas & Status
         self.canvas = None
         self.status = None
+        self.frame_time = None
+        self.grid_key = None     # (board size, cell size) the grid lines were drawn for
+        self.stone_items = {}    # (row, col) -> (canvas item, symbol) of the stones drawn
+        self.game_over = True
+        self.analysis = None     # AnalysisWorker while the overlay is on
+        self.analysis_after = None
+        self.heat_items = {}     # (row, col) -> canvas item of the overlay
+        self.heat_scores = {}    # (row, col) -> (strength for X, strength for O)
+        self.heat_player = None  # Side to move the overlay was drawn for
 
     def start_game(self):
         try:
             size = int(self.board_size_var.get())
-            if not (9 <= size <= 19):
+            if not (9 <= size <= MAX_BOARD_SIZE):
                 raise ValueError("Board size out of range.")
         except:
-            messagebox.showerror("Error", "Board size must be an integer between 9 and 19.")
+            messagebox.showerror("Error", f"Board size must be an integer between 9 and {MAX_BOARD_SIZE}.")
             return
 
         self.board_size = size
-        self.board = Board(size=self.board_size)
+        self.board = create_board(self.board_size)
+        self.cell_size = min(CELL_SIZE, MAX_CANVAS // self.board_size)
 
         algo = self.algorithm_var.get()
         depth = int(self.depth_var.get())
         algorithm_fn = alpha_beta if algo == "alphabeta" else minimax
 
-        self.canvas = tk.Canvas(self.root, width=self.board_size * CELL_SIZE, height=self.board_size * CELL_SIZE)
-        self.canvas.pack()
-        self.status = tk.Label(self.root, text="Game started.")
-        self.status.pack()
+        # The canvas and status bar are created once and reused by later games
+        if self.canvas is None:
+            self.canvas = tk.Canvas(self.root)
+            self.canvas.pack()
+            status_bar = tk.Frame(self.root)
+            status_bar.pack(fill=tk.X)
+            self.status = tk.Label(status_bar, text="Game started.")
+            self.status.pack(side=tk.LEFT)
+            self.frame_time = tk.Label(status_bar, text="")
+            self.frame_time.pack(side=tk.RIGHT)
+        else:
+            self.canvas.unbind("<Button-1>")
+            self.status.config(text="Game started.")
 
+        self.stop_analysis()
         self.draw_board()
+        self.game_over = False
+        if self.analysis_var.get():
+            self.start_analysis()
 
         mode = self.game_mode.get()
         if mode == "Human vs AI":
             self.ai = AIPlayer(-1, algorithm=algorithm_fn, depth=depth)
+            self.ai.new_game()
             self.current_player = 1  # human
             self.canvas.bind("<Button-1>", self.handle_click_human_vs_ai)
             self.status.config(text="Your turn (X)")
         else:
             self.ai1 = AIPlayer(1, algorithm=minimax, depth=depth)
             self.ai2 = AIPlayer(-1, algorithm=algorithm_fn, depth=depth)
+            self.ai1.new_game()
+            self.ai2.new_game()
             self.current_player = self.ai1
             self.ai_vs_ai(move_limit=self.move_limit_var.get())
 
     def draw_board(self):
+        """
+        Bring the canvas up to date with the board. The grid is only drawn
+        again when the board size changes; stones are created, recoloured or
+        deleted only for the cells that changed since the last call.
+        """
+        start = time.perf_counter()
+
+        if self.grid_key != (self.board_size, self.cell_size):
+            self.draw_grid()
+
+        stones = {(row, col): player for row, col, player in self.board.move_history}
+        for cell in [cell for cell in self.stone_items if cell not in stones]:
+            self.canvas.delete(self.stone_items.pop(cell)[0])
+        for (row, col), symbol in stones.items():
+            drawn = self.stone_items.get((row, col))
+            if drawn is None:
+                self.stone_items[(row, col)] = (self.draw_stone(row, col, symbol), symbol)
+            elif drawn[1] != symbol:
+                self.canvas.itemconfig(drawn[0], fill=STONE_COLOURS[symbol])
+                self.stone_items[(row, col)] = (drawn[0], symbol)
+
+        # Include Tk's own redraw in the frame time
+        self.canvas.update_idletasks()
+        self.frame_time.config(text=f"Frame: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    def draw_grid(self):
+        """Resize the canvas and draw the grid lines (board size changed)"""
+        extent = self.board_size * self.cell_size
         self.canvas.delete("all")
-        for i in range(self.board_size):
-            for j in range(self.board_size):
-                x1, y1 = j * CELL_SIZE, i * CELL_SIZE
-                x2, y2 = x1 + CELL_SIZE, y1 + CELL_SIZE
-                self.canvas.create_rectangle(x1, y1, x2, y2, outline="black")
-                symbol = self.board.get_cell(i, j)
-                if symbol == 1:
-                    self.canvas.create_oval(x1 + 5, y1 + 5, x2 - 5, y2 - 5, fill="black")
-                elif symbol == -1:
-                    self.canvas.create_oval(x1 + 5, y1 + 5, x2 - 5, y2 - 5, fill="white")
+        self.stone_items = {}
+        self.heat_items = {}
+        self.heat_scores = {}
+        self.canvas.config(width=extent, height=extent)
+        for i in range(self.board_size + 1):
+            self.canvas.create_line(0, i * self.cell_size, extent, i * self.cell_size, fill="black")
+            self.canvas.create_line(i * self.cell_size, 0, i * self.cell_size, extent, fill="black")
+        self.grid_key = (self.board_size, self.cell_size)
+
+    def draw_stone(self, row, col, symbol):
+        x1, y1 = col * self.cell_size, row * self.cell_size
+        x2, y2 = x1 + self.cell_size, y1 + self.cell_size
+        inset = max(1, self.cell_size // 8)
+        return self.canvas.create_oval(x1 + inset, y1 + inset, x2 - inset, y2 - inset, fill=STONE_COLOURS[symbol])
+
+    def toggle_analysis(self):
+        if not self.analysis_var.get():
+            self.stop_analysis()
+        elif self.analysis is None and not self.game_over:
+            self.start_analysis()
+
+    def start_analysis(self):
+        """Score the candidate cells on a background worker and draw them under the stones"""
+        self.stop_analysis()
+        self.analysis = AnalysisWorker(self.board_size)
+        self.analysis.start(self.board.move_history)
+        self.heat_player = None
+        self.analysis_after = self.root.after(ANALYSIS_REFRESH_MS, self.refresh_analysis)
+
+    def stop_analysis(self):
+        if self.analysis is not None:
+            self.analysis.cancel()
+            self.analysis = None
+            self.root.after_cancel(self.analysis_after)
+        if self.canvas is not None:
+            self.canvas.delete("heatmap")
+        self.heat_items = {}
+        self.heat_scores = {}
+
+    def analysis_move(self, row, col, symbol):
+        """Pass a move to the analysis worker and clear the overlay of its cell"""
+        if self.analysis is None:
+            return
+        self.analysis.play(row, col, symbol)
+        self.heat_scores.pop((row, col), None)
+        item = self.heat_items.pop((row, col), None)
+        if item is not None:
+            self.canvas.delete(item)
+
+    def refresh_analysis(self):
+        """
+        Draw the strengths posted by the worker since the last refresh, then
+        poll again after ANALYSIS_REFRESH_MS. Only the changed cells are
+        redrawn, unless the side to move changed since the last refresh.
+        """
+        player = -self.board.last_move[2] if self.board.last_move else 1
+        updates = self.analysis.poll()
+        for cell, scores in updates.items():
+            if scores is not None and self.board.get_cell(*cell) == 0:
+                self.heat_scores[cell] = scores
+            else:
+                self.heat_scores.pop(cell, None)
+                item = self.heat_items.pop(cell, None)
+                if item is not None:
+                    self.canvas.delete(item)
+
+        side = 0 if player == 1 else 1
+        cells = self.heat_scores if player != self.heat_player else [cell for cell in updates
+                                                                      if cell in self.heat_scores]
+        for cell in cells:
+            self.draw_heat(cell, self.heat_scores[cell][side])
+        self.heat_player = player
+        self.analysis_after = self.root.after(ANALYSIS_REFRESH_MS, self.refresh_analysis)
+
+    def draw_heat(self, cell, score):
+        item = self.heat_items.get(cell)
+        if item is not None:
+            self.canvas.itemconfig(item, fill=heat_colour(score))
+            return
+        row, col = cell
+        x1, y1 = col * self.cell_size, row * self.cell_size
+        inset = max(1, self.cell_size // 10)
+        item = self.canvas.create_rectangle(x1 + inset, y1 + inset, x1 + self.cell_size - inset,
+                                            y1 + self.cell_size - inset, fill=heat_colour(score), outline="",
+                                            tags="heatmap")
+        self.canvas.tag_lower(item)  # Under the grid lines and stones
+        self.heat_items[cell] = item
+
+    def search(self, player):
+        """The AI's move, with the analysis paused so it does not compete with the search"""
+        if self.analysis is not None:
+            self.analysis.pause()
+        try:
+            return player.get_move(self.board)
+        finally:
+            if self.analysis is not None:
+                self.analysis.resume()
+
+    def end_game(self, message):
+        self.game_over = True
+        self.stop_analysis()
+        self.status.config(text=message)
+        messagebox.showinfo("Game Over", message)
 
     def handle_click_human_vs_ai(self, event):
         if self.current_player != 1:
             return
-        row, col = event.y // CELL_SIZE, event.x // CELL_SIZE
+        row, col = event.y // self.cell_size, event.x // self.cell_size
         if self.board.get_cell(row, col) == 0:
             self.board.place_piece(row, col, 1)
+            self.ai.notify_move(row, col, 1)
+            self.analysis_move(row, col, 1)
             self.draw_board()
 
             if check_win(self.board, row, col):
-                self.status.config(text="You won!")
-                messagebox.showinfo("Game Over", "You won!")
+                self.end_game("You won!")
                 return
 
             if is_board_full(self.board):
-                self.status.config(text="It's a draw!")
-                messagebox.showinfo("Game Over", "It's a draw!")
+                self.end_game("It's a draw!")
                 return
 
             self.current_player = -1
@@ -125,18 +289,18 @@ class GomokuGUI:
             self.root.after(100, self.ai_move)
 
     def ai_move(self):
-        row, col = self.ai.get_move(self.board)
+        row, col = self.search(self.ai)
         self.board.place_piece(row, col, -1)
+        self.ai.notify_move(row, col, -1)
+        self.analysis_move(row, col, -1)
         self.draw_board()
 
         if check_win(self.board, row, col):
-            self.status.config(text="AI won!")
-            messagebox.showinfo("Game Over", "AI won!")
+            self.end_game("AI won!")
             return
 
         if is_board_full(self.board):
-            self.status.config(text="It's a draw!")
-            messagebox.showinfo("Game Over", "It's a draw!")
+            self.end_game("It's a draw!")
             return
 
         self.status.config(text="Your turn (X)")
@@ -154,23 +318,23 @@ class GomokuGUI:
 
     def ai_turn(self):
         if self.ai_max_moves is not None and self.ai_move_count >= self.ai_max_moves:
-            self.status.config(text="Move limit reached. Draw.")
-            messagebox.showinfo("Game Over", "Move limit reached. Draw.")
+            self.end_game("Move limit reached. Draw.")
             return
 
-        row, col = self.current_player.get_move(self.board)
+        row, col = self.search(self.current_player)
         self.board.place_piece(row, col, self.current_player.symbol)
+        self.ai1.notify_move(row, col, self.current_player.symbol)
+        self.ai2.notify_move(row, col, self.current_player.symbol)
+        self.analysis_move(row, col, self.current_player.symbol)
         self.draw_board()
 
         if check_win(self.board, row, col):
             winner = "Minimax AI" if self.current_player.symbol == 1 else "Alpha-Beta AI"
-            self.status.config(text=f"{winner} won!")
-            messagebox.showinfo("Game Over", f"{winner} won!")
+            self.end_game(f"{winner} won!")
             return
 
         if is_board_full(self.board):
-            self.status.config(text="It's a draw!")
-            messagebox.showinfo("Game Over", "It's a draw!")
+            self.end_game("It's a draw!")
             return
 
         self.current_player = self.ai1 if self.current_player == self.ai2 else self.ai2
@@ -1,24 +1,28 @@
 import time
-from game.board import Board
+from game.sparse_board import MAX_BOARD_SIZE, create_board
 from game.game_rules import check_win, is_board_full
 from game.player import HumanPlayer, AIPlayer
+from game.metrics import MetricsRecorder
+from ai.position_cache import PositionCache
 from ai.minmax import minimax
 from ai.alphabeta import alpha_beta
 from ai.evaluation import evaluate_board
 from ui.console_ui import display_board, get_human_move
 
-def human_vs_ai_game(board_size=15, ai_algorithm="alphabeta", ai_depth=3):
+def human_vs_ai_game(board_size=15, ai_algorithm="alphabeta", ai_depth=3, metrics=None, cache=None):
     # Initialize board
-    board = Board(size=board_size)
+    board = create_board(board_size)
     
     # Create players
     human_player = HumanPlayer(1)  # Human plays as X (1)
     
     # Choose AI algorithm
     if ai_algorithm.lower() == "minimax":
-        ai_player = AIPlayer(-1, algorithm=minimax, depth=ai_depth)
+        ai_player = AIPlayer(-1, algorithm=minimax, depth=ai_depth, metrics=metrics, cache=cache)
     else:
-        ai_player = AIPlayer(-1, algorithm=alpha_beta, depth=ai_depth)
+        ai_player = AIPlayer(-1, algorithm=alpha_beta, depth=ai_depth, metrics=metrics, cache=cache)
+    
+    ai_player.new_game()
     
     # Main game loop
     current_player = human_player  
@@ -38,6 +42,7 @@ def human_vs_ai_game(board_size=15, ai_algorithm="alphabeta", ai_depth=3):
         
         # Make the move
         board.place_piece(row, col, current_player.symbol)
+        ai_player.notify_move(row, col, current_player.symbol)
         display_board(board)  # Show the board after each move
         
         # Check for win
@@ -53,21 +58,27 @@ def human_vs_ai_game(board_size=15, ai_algorithm="alphabeta", ai_depth=3):
         
         # Switch player
         current_player = ai_player if current_player == human_player else human_player
+    
+    if metrics is not None:
+        metrics.flush()
 
 
-def ai_vs_ai_game(board_size=15, ai1_depth=3, ai2_depth=3, max_moves=None):
+def ai_vs_ai_game(board_size=15, ai1_depth=3, ai2_depth=3, max_moves=None, metrics=None, cache=None):
     # Initialize board
-    board = Board(size=board_size)
+    board = create_board(board_size)
     
     # Create AI players
-    minimax_player = AIPlayer(1, algorithm=minimax, depth=ai1_depth)
-    alphabeta_player = AIPlayer(-1, algorithm=alpha_beta, depth=ai2_depth)
+    minimax_player = AIPlayer(1, algorithm=minimax, depth=ai1_depth, metrics=metrics, cache=cache)
+    alphabeta_player = AIPlayer(-1, algorithm=alpha_beta, depth=ai2_depth, metrics=metrics, cache=cache)
     
     # Stats tracking
     minimax_times = []
     alphabeta_times = []
     move_count = 0
     
+    minimax_player.new_game()
+    alphabeta_player.new_game()
+    
     # Main game loop
     current_player = minimax_player  # Minimax goes first
     
@@ -93,6 +104,8 @@ def ai_vs_ai_game(board_size=15, ai1_depth=3, ai2_depth=3, max_moves=None):
         
         # Make the move
         board.place_piece(row, col, current_player.symbol)
+        minimax_player.notify_move(row, col, current_player.symbol)
+        alphabeta_player.notify_move(row, col, current_player.symbol)
         display_board(board)  # Show the board after each move
         move_count += 1
         
@@ -106,6 +119,9 @@ def ai_vs_ai_game(board_size=15, ai1_depth=3, ai2_depth=3, max_moves=None):
         if is_board_full(board) or (max_moves and move_count >= max_moves):
             print("\nGame ended in a draw!" if is_board_full(board) else "\nGame ended due to move limit!")
             break
+        if board.is_dead_draw():
+            print("\nGame ended in a draw: no five can be completed any more!")
+            break
         
         # Switch player
         current_player = alphabeta_player if current_player == minimax_player else minimax_player
@@ -122,6 +138,24 @@ def ai_vs_ai_game(board_size=15, ai1_depth=3, ai2_depth=3, max_moves=None):
     if minimax_times and alphabeta_times:
         speedup = sum(minimax_times) / sum(alphabeta_times)
         print(f"Alpha-Beta speedup factor: {speedup:.2f}x")
+    
+    if metrics is not None:
+        metrics.flush()
+
+
+def ask_board_size():
+    """Board size from the console; None for an infinite board"""
+    while True:
+        try:
+            board_size = int(input(f"Enter board size (9-{MAX_BOARD_SIZE}, 0 for infinite, default 15): ") or 15)
+            if board_size == 0:
+                return None
+            if 9 <= board_size <= MAX_BOARD_SIZE:
+                return board_size
+            else:
+                print(f"Board size must be between 9 and {MAX_BOARD_SIZE}, or 0.")
+        except ValueError:
+            print("Please enter a valid number.")
 
 
 def main():
@@ -129,6 +163,12 @@ def main():
     print("Welcome to Gomoku (Five in a Row)!")
     print("="*40)
     
+    # Per-move metrics for dashboards, when GOMOKU_METRICS_DIR is set
+    metrics = MetricsRecorder.from_env()
+    
+    # Search results shared across runs, when GOMOKU_POSITION_CACHE names a file
+    cache = PositionCache.from_env()
+    
     # Game setup
     while True:
         print("\nSelect game mode:")
@@ -144,15 +184,7 @@ def main():
             print("-" * 30)
             
             # Board size selection
-            while True:
-                try:
-                    board_size = int(input("Enter board size (9-19, default 15): ") or 15)
-                    if 9 <= board_size <= 19:
-                        break
-                    else:
-                        print("Board size must be between 9 and 19.")
-                except ValueError:
-                    print("Please enter a valid number.")
+            board_size = ask_board_size()
             
             # AI algorithm selection
             algorithm = input("Select AI algorithm (minimax/alphabeta, default alphabeta): ").lower() or "alphabeta"
@@ -172,7 +204,7 @@ def main():
                     print("Please enter a valid number.")
             
             # Start the game
-            human_vs_ai_game(board_size=board_size, ai_algorithm=algorithm, ai_depth=depth)
+            human_vs_ai_game(board_size=board_size, ai_algorithm=algorithm, ai_depth=depth, metrics=metrics, cache=cache)
             
         elif choice == "2":
             # AI vs AI game
@@ -180,15 +212,7 @@ def main():
             print("-" * 30)
             
             # Board size selection
-            while True:
-                try:
-                    board_size = int(input("Enter board size (9-19, default 15): ") or 15)
-                    if 9 <= board_size <= 19:
-                        break
-                    else:
-                        print("Board size must be between 9 and 19.")
-                except ValueError:
-                    print("Please enter a valid number.")
+            board_size = ask_board_size()
             
             # Minimax depth selection
             while True:
@@ -233,11 +257,17 @@ def main():
                 board_size=board_size, 
                 ai1_depth=minimax_depth, 
                 ai2_depth=alphabeta_depth,
-                max_moves=move_limit
+                max_moves=move_limit,
+                metrics=metrics,
+                cache=cache
             )
             
         elif choice == "3":
             print("\nThank you for playing Gomoku!")
+            if metrics is not None:
+                metrics.close()
+            if cache is not None:
+                cache.close()
             break
             
         else:
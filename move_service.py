@@ -0,0 +1,395 @@
+"""
+Local HTTP/JSON move service.
+
+Usage:
+    python move_service.py [--port 8765] [--workers 4] [--engine alphabeta|minimax|mcts]
+
+Endpoints:
+    POST /move           {"game_id": "g1", "size": 15, "moves": [[7, 7], [7, 8]],
+                          "deadline_ms": 2000}
+                         -> {"move": [row, col], "elapsed_ms": ...}
+    POST /end            {"game_id": "g1"}  (drops the game's session)
+    GET  /health         -> worker queue depths, session counts, RSS and CPU time
+
+Moves alternate starting with player 1 (X). Each game is pinned to one
+worker process, which keeps its board and engine (MCTS tree, proof-number
+cache) warm between turns, so a turn only applies the new moves. The
+request deadline bounds the search itself, whatever the engine, not only
+the time spent queued.
+"""
+import argparse
+import json
+import multiprocessing
+import queue
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from game.board import Board
+from game.player import AIPlayer
+from game.metrics import rss_bytes
+from game.sparse_board import MAX_BOARD_SIZE
+from ai.minmax import minimax
+from ai.alphabeta import alpha_beta
+from ai.mcts import MCTSEngine
+from ai.proof_number import ProofNumberSolver
+from ai.search_engine import SearchEngine
+
+MIN_SIZE = 5  # Smallest board a five fits on
+
+
+class ServiceError(Exception):
+    """Error reported to the client with an HTTP status code"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class GameSession:
+    """A game kept warm inside a worker: its board and its AI player"""
+
+    def __init__(self, size, options, solver):
+        self.board = Board(size=size)
+        self.players = {}
+        self.options = options
+        self.solver = solver
+
+    def player(self, symbol):
+        player = self.players.get(symbol)
+        if player is None:
+            engine = self.options['engine']
+            if engine == 'mcts':
+                algorithm = MCTSEngine(time_limit=self.options['time_limit'])
+            else:
+                # Deepens iteratively, so the request deadline can cut it short
+                algorithm = SearchEngine(self.options['depth'],
+                                         algorithm=minimax if engine == 'minimax' else alpha_beta)
+            player = AIPlayer(symbol, algorithm=algorithm, depth=self.options['depth'], solver=self.solver)
+            self.players[symbol] = player
+        return player
+
+    def play(self, row, col, symbol):
+        """Place a stone and tell the players about it; returns False for an illegal move"""
+        if not self.board.place_piece(row, col, symbol):
+            return False
+        for player in self.players.values():
+            player.notify_move(row, col, symbol)
+        return True
+
+    def sync(self, moves):
+        """
+        Bring the board to the given move list, applying only new moves when
+        the list extends the current game.
+
+        Returns:
+            bool: False if the session had to be rebuilt from scratch
+        """
+        played = [(row, col) for row, col, _ in self.board.move_history]
+        warm = moves[:len(played)] == played
+        if not warm:
+            self.board.clear()
+            for player in self.players.values():
+                player.new_game()
+            played = []
+        for index, (row, col) in enumerate(moves[len(played):], start=len(played)):
+            if not self.play(row, col, 1 if index % 2 == 0 else -1):
+                self.board.clear()
+                self.players = {}
+                raise ServiceError(400, f"illegal move {[row, col]} at ply {index}")
+        return warm
+
+
+def _parse_size(payload):
+    try:
+        size = int(payload.get('size', 15))
+    except (TypeError, ValueError):
+        raise ServiceError(400, "size must be an integer")
+    if not MIN_SIZE <= size <= MAX_BOARD_SIZE:
+        raise ServiceError(400, f"size must be between {MIN_SIZE} and {MAX_BOARD_SIZE}")
+    return size
+
+
+def _parse_deadline(payload):
+    """The request's deadline_ms, or None when it gives none"""
+    deadline_ms = payload.get('deadline_ms')
+    if deadline_ms is None:
+        return None
+    try:
+        deadline_ms = float(deadline_ms)
+    except (TypeError, ValueError):
+        raise ServiceError(400, "deadline_ms must be a number")
+    if not deadline_ms > 0:
+        raise ServiceError(400, "deadline_ms must be positive")
+    return deadline_ms
+
+
+def _parse_moves(payload):
+    moves = payload.get('moves', [])
+    if not isinstance(moves, list):
+        raise ServiceError(400, "moves must be a list")
+    try:
+        return [(int(row), int(col)) for row, col in moves]
+    except (TypeError, ValueError):
+        raise ServiceError(400, "moves must be [row, col] pairs")
+
+
+def handle_move(sessions, payload, deadline, options, solver):
+    """Compute the reply for one /move request inside a worker"""
+    game_id = str(payload.get('game_id', ''))
+    size = _parse_size(payload)
+    moves = _parse_moves(payload)
+
+    session = sessions.pop(game_id, None)
+    cached = session is not None and session.board.size == size
+    if not cached:
+        session = GameSession(size, options, solver)
+    sessions[game_id] = session  # Most recently used goes last
+    while len(sessions) > options['max_sessions']:
+        sessions.popitem(last=False)
+
+    try:
+        warm = session.sync(moves) and cached
+    except ServiceError:
+        # The next request for the game starts cold
+        sessions.pop(game_id, None)
+        raise
+    symbol = 1 if len(moves) % 2 == 0 else -1
+    player = session.player(symbol)
+    # Leave time to answer: a search still running at the deadline only delays the next requests
+    budget = max(0.01, (deadline - time.time()) * 0.8)
+    if isinstance(player.algorithm, MCTSEngine):
+        budget = min(options['time_limit'], budget)
+    player.algorithm.time_limit = budget
+
+    row, col = player.get_move(session.board)
+    session.play(row, col, symbol)
+    return {'move': [row, col], 'warm': warm}
+
+
+def worker_main(index, requests, responses, options):
+    """Worker process loop: serve jobs for the games pinned to this worker"""
+    sessions = OrderedDict()
+    solver = ProofNumberSolver(max_iterations=options['solver_iterations']) if options['solver'] else None
+    while True:
+        job = requests.get()
+        if job is None:
+            break
+        request_id, kind, payload, deadline = job
+        if time.time() >= deadline:
+            responses.put((request_id, 504, {'error': 'deadline expired in queue'}))
+            continue
+        try:
+            if kind == 'end':
+                sessions.pop(str(payload.get('game_id', '')), None)
+                result = {'ok': True}
+            elif kind == 'health':
+                result = {'worker': index, 'sessions': len(sessions), 'rss_bytes': rss_bytes(),
+                          'cpu_seconds': round(time.process_time(), 3)}
+            else:
+                result = handle_move(sessions, payload, deadline, options, solver)
+            responses.put((request_id, 200, result))
+        except ServiceError as error:
+            responses.put((request_id, error.status, {'error': str(error)}))
+        except Exception as error:
+            responses.put((request_id, 500, {'error': repr(error)}))
+
+
+class MoveService:
+    """
+    Pool of worker processes with per-game affinity, admission control and
+    per-request deadlines.
+    """
+
+    def __init__(self, workers=2, max_pending=8, max_sessions=256, engine='alphabeta', depth=2,
+                 time_limit=1.0, solver=False, solver_iterations=500, default_deadline=5.0):
+        """
+        Args:
+            workers (int): Number of worker processes
+            max_pending (int): Requests queued per worker before new ones are rejected
+            max_sessions (int): Games cached per worker (least recently used are dropped)
+            engine (str): 'alphabeta', 'minimax' or 'mcts'
+            depth (int): Search depth for alphabeta/minimax
+            time_limit (float): MCTS time budget per move in seconds (every engine is also bounded by the
+                request deadline)
+            solver (bool): Consult a proof-number solver before searching
+            solver_iterations (int): Solver expansion budget per move
+            default_deadline (float): Deadline in seconds when a request gives none
+        """
+        self.options = {
+            'engine': engine, 'depth': depth, 'time_limit': time_limit, 'max_sessions': max_sessions,
+            'solver': solver, 'solver_iterations': solver_iterations,
+        }
+        self.worker_count = workers
+        self.max_pending = max_pending
+        self.default_deadline = default_deadline
+        self.requests = []
+        self.processes = []
+        self.responses = multiprocessing.Queue()
+        self.pending = [0] * workers
+        self.waiters = {}
+        self.lock = threading.Lock()
+        self.next_id = 0
+        self.collector = None
+
+    def start(self):
+        for index in range(self.worker_count):
+            requests = multiprocessing.Queue()
+            process = multiprocessing.Process(target=worker_main, args=(index, requests, self.responses, self.options),
+                                              daemon=True)
+            process.start()
+            self.requests.append(requests)
+            self.processes.append(process)
+        self.collector = threading.Thread(target=self._collect, daemon=True)
+        self.collector.start()
+
+    def stop(self):
+        for requests in self.requests:
+            requests.put(None)
+        for process in self.processes:
+            process.join(timeout=5)
+        self.responses.put(None)
+        if self.collector is not None:
+            self.collector.join(timeout=5)
+
+    def worker_for(self, game_id):
+        """Stable game -> worker mapping (session affinity)"""
+        return zlib.crc32(str(game_id).encode()) % self.worker_count
+
+    def submit(self, kind, payload, worker=None, deadline_ms=None):
+        """
+        Send a job to a worker and wait for its answer.
+
+        Returns:
+            tuple: (status, result dict)
+        """
+        if worker is None:
+            worker = self.worker_for(payload.get('game_id', ''))
+        timeout = deadline_ms / 1000 if deadline_ms else self.default_deadline
+        deadline = time.time() + timeout
+
+        with self.lock:
+            if self.pending[worker] >= self.max_pending:
+                return 503, {'error': 'worker busy, retry later'}
+            self.pending[worker] += 1
+            request_id = self.next_id
+            self.next_id += 1
+            waiter = [threading.Event(), None]
+            self.waiters[request_id] = (worker, waiter)
+
+        self.requests[worker].put((request_id, kind, payload, deadline))
+        if not waiter[0].wait(timeout):
+            # The worker still owns the job; its late answer is dropped by _collect
+            return 504, {'error': 'deadline exceeded'}
+        return waiter[1]
+
+    def health(self):
+        workers = []
+        for index in range(self.worker_count):
+            status, result = self.submit('health', {}, worker=index)
+            result['pending'] = self.pending[index]
+            workers.append(result)
+        return {'workers': workers}
+
+    def _collect(self):
+        while True:
+            try:
+                item = self.responses.get(timeout=1)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+            request_id, status, result = item
+            with self.lock:
+                worker, waiter = self.waiters.pop(request_id, (None, None))
+                if worker is not None:
+                    self.pending[worker] -= 1
+            if waiter is not None:
+                waiter[1] = (status, result)
+                waiter[0].set()
+
+
+class MoveRequestHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._reply(200, self.service.health())
+        else:
+            self._reply(404, {'error': 'not found'})
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(payload, dict):
+                raise ValueError
+        except ValueError:
+            self._reply(400, {'error': 'body must be a JSON object'})
+            return
+
+        if self.path == '/move':
+            # Reject bad input before it takes a place in a worker's queue
+            try:
+                _parse_size(payload)
+                _parse_moves(payload)
+                deadline_ms = _parse_deadline(payload)
+            except ServiceError as error:
+                self._reply(error.status, {'error': str(error)})
+                return
+            start = time.time()
+            status, result = self.service.submit('move', payload, deadline_ms=deadline_ms)
+            result['elapsed_ms'] = round((time.time() - start) * 1000, 2)
+            self._reply(status, result)
+        elif self.path == '/end':
+            self._reply(*self.service.submit('end', payload))
+        else:
+            self._reply(404, {'error': 'not found'})
+
+    def log_message(self, format, *args):
+        pass  # Keep request logging off the hot path
+
+
+def create_server(service, host='127.0.0.1', port=8765):
+    handler = type('BoundMoveRequestHandler', (MoveRequestHandler,), {'service': service})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Gomoku move service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=max(1, multiprocessing.cpu_count() - 1))
+    parser.add_argument("--max-pending", type=int, default=8)
+    parser.add_argument("--engine", choices=["alphabeta", "minimax", "mcts"], default="alphabeta")
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--time-limit", type=float, default=1.0)
+    parser.add_argument("--solver", action="store_true", help="Use the proof-number solver as a tactical oracle")
+    args = parser.parse_args()
+
+    service = MoveService(workers=args.workers, max_pending=args.max_pending, engine=args.engine,
+                          depth=args.depth, time_limit=args.time_limit, solver=args.solver)
+    service.start()
+    server = create_server(service, args.host, args.port)
+    print(f"Move service listening on http://{args.host}:{args.port} with {args.workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+
+
+if __name__ == "__main__":
+    main()
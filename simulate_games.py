@@ -0,0 +1,291 @@
+"""
+Batched self-play with cheap policies, for training data.
+
+Usage:
+    python simulate_games.py [--games 100000] [--batch 4096] [--size 15]
+                             [--policy greedy[,random]] [--random-plies 2]
+                             [--max-moves 225] [--seed 0] [--output games.jsonl]
+
+Games are played in lockstep, a batch at a time: the boards of a batch
+are one (N, size, size) int8 array and every step places a stone on each
+unfinished board at once. Legal moves, move choice and five-in-a-row
+detection are whole-array operations on shifted views of the boards, so
+no Python code runs per game or per cell.
+
+Policies (one for both sides, or X,O):
+
+- random: any empty cell next to a stone;
+- greedy: the best pattern score, the line patterns of score_move (open
+  four, four, open three, three, open two, two) made for itself and,
+  at 0.9, blocked for the opponent, with the same weights and center
+  bonus; ties are broken at random;
+- lookahead: one ply deeper: complete a five if any move does, else block
+  the opponent's five, else greedy.
+
+The first --random-plies plies of each game are random, so greedy games
+do not all repeat. The patterns are measured by runs of stones and open
+ends rather than by matching score_move's pattern lists, so greedy play
+is close to, not identical with, order_moves.
+
+Finished games are appended to --output in bulk, one record per line:
+{"game_id": "sim-0-12", "size": 15, "moves": [[7, 7], ...], "winner": 1},
+which analyse_games.py and tune_weights.py extract read like a directory
+of *.json records.
+
+Requires NumPy.
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from ai.weights import WEIGHTS
+
+POLICIES = ('random', 'greedy', 'lookahead')
+LINES = ((0, 1), (1, 1), (1, 0), (1, -1))
+PAD = 5  # Border around the boards, so every shift up to five cells is a plain view
+BORDER = 2  # Neither player nor empty
+
+
+def pad(boards):
+    return np.pad(boards, ((0, 0), (PAD, PAD), (PAD, PAD)), constant_values=BORDER)
+
+
+def shifted(padded, dr, dc):
+    """View of the padded boards moved so that cell (r, c) shows (r + dr, c + dc)"""
+    size = padded.shape[1] - 2 * PAD
+    return padded[:, PAD + dr:PAD + dr + size, PAD + dc:PAD + dc + size]
+
+
+def has_five(boards, player):
+    """
+    Whether each board holds five of player's stones in a row.
+
+    Args:
+        boards: (N, size, size) int8 array
+        player (int): 1 or -1
+
+    Returns:
+        (N,) bool array
+    """
+    padded = pad(boards)
+    stones = boards == player
+    found = np.zeros(len(boards), dtype=bool)
+    for dr, dc in LINES:
+        five = stones.copy()
+        for k in range(1, 5):
+            five &= shifted(padded, k * dr, k * dc) == player
+        found |= five.any(axis=(1, 2))
+    return found
+
+
+def legal_moves(boards, proximity=1):
+    """
+    Empty cells within `proximity` of a stone; on an empty board, the
+    cells within two of the center.
+
+    Returns:
+        (N, size, size) bool array
+    """
+    size = boards.shape[1]
+    padded = pad(boards)
+    near = np.zeros(boards.shape, dtype=bool)
+    for dr in range(-proximity, proximity + 1):
+        for dc in range(-proximity, proximity + 1):
+            view = shifted(padded, dr, dc)
+            near |= (view != 0) & (view != BORDER)
+    empty = ~near.any(axis=(1, 2))
+    if empty.any():
+        center = size // 2
+        opening = np.zeros((size, size), dtype=bool)
+        opening[max(0, center - 2):center + 3, max(0, center - 2):center + 3] = True
+        near[empty] = opening
+    return near & (boards == 0)
+
+
+def _runs(stones, empty, dr, dc):
+    """
+    For each cell, stones in a row next to it in one direction (at most 4),
+    and whether the cell after them is empty. `stones` and `empty` are
+    padded bool planes.
+    """
+    run = shifted(stones, dr, dc).astype(np.int8)
+    alive = shifted(stones, dr, dc).copy()
+    open_end = shifted(empty, dr, dc).copy()
+    for k in range(2, 6):
+        open_end |= alive & shifted(empty, k * dr, k * dc)
+        alive &= shifted(stones, k * dr, k * dc)
+        if k < 5:
+            run += alive
+    return run, open_end
+
+
+def line_scores(boards, side, weights=None, padded=None):
+    """
+    Patterns a stone of `side` would make on each cell.
+
+    Returns:
+        tuple: (pattern score of each cell, (N, size, size) bool array of
+        the cells completing a five)
+    """
+    pattern = (weights or WEIGHTS)['pattern']
+    # Score by stones in the line (capped at four) and open ends; fives are reported separately
+    table = np.zeros((5, 3), dtype=np.float32)
+    table[4] = (0, pattern[1], pattern[0])
+    table[3] = (0, pattern[3], pattern[2])
+    table[2] = (0, pattern[5], pattern[4])
+
+    padded = pad(boards) if padded is None else padded
+    stones, empty = padded == side, padded == 0
+    score = np.zeros(boards.shape, dtype=np.float32)
+    five = np.zeros(boards.shape, dtype=bool)
+    for dr, dc in LINES:
+        forward, forward_open = _runs(stones, empty, dr, dc)
+        back, back_open = _runs(stones, empty, -dr, -dc)
+        length = forward + back + 1
+        five |= length >= 5
+        index = np.minimum(length, 4) * 3 + forward_open + back_open
+        score += np.take(table, index)
+    return score, five
+
+
+def _center_bonus(size):
+    rows, cols = np.indices((size, size))
+    center = size // 2
+    return (np.maximum(0, 5 - np.abs(rows - center) - np.abs(cols - center)) * 2).astype(np.float32)
+
+
+def choose_moves(boards, player, policy, rng, weights=None):
+    """
+    One move for each board.
+
+    Args:
+        boards: (N, size, size) int8 array, none of them full
+        player (int): The side to move on every board
+        policy (str): One of POLICIES
+
+    Returns:
+        (N,) array of flat cell indices
+    """
+    count, size = boards.shape[0], boards.shape[1]
+    legal = legal_moves(boards)
+    noise = rng.random(boards.shape, dtype=np.float32)
+    if policy == 'random':
+        scores = noise
+    else:
+        padded = pad(boards)
+        own, wins = line_scores(boards, player, weights, padded)
+        theirs, blocks = line_scores(boards, -player, weights, padded)
+        scores = 2 * own + 1.8 * theirs + _center_bonus(size) + noise
+        if policy == 'lookahead':
+            scores += np.where(blocks & legal, np.float32(1e7), np.float32(0))
+            scores += np.where(wins & legal, np.float32(1e8), np.float32(0))
+    scores = np.where(legal, scores, np.float32(-np.inf))
+    return scores.reshape(count, -1).argmax(axis=1)
+
+
+def simulate_batch(count, size=15, policies=('greedy', 'greedy'), random_plies=2, max_moves=None,
+                   rng=None, weights=None):
+    """
+    Play `count` games in lockstep until every one is won, full or at max_moves.
+
+    Args:
+        policies (tuple): Policies of X (player 1) and O (player -1)
+
+    Returns:
+        tuple: (moves, lengths, winners) arrays: the flat cell index of each
+        move (N, size * size), the number of moves and the winner (1, -1,
+        or 0 for a draw or unfinished game) of each game
+    """
+    rng = rng or np.random.default_rng()
+    max_moves = min(max_moves or size * size, size * size)
+    boards = np.zeros((count, size, size), dtype=np.int8)
+    flat = boards.reshape(count, -1)
+    moves = np.zeros((count, size * size), dtype=np.int16)
+    winners = np.zeros(count, dtype=np.int8)
+    lengths = np.zeros(count, dtype=np.int16)
+    playing = np.arange(count)
+
+    ply = 0
+    while ply < max_moves and len(playing):
+        player = 1 if ply % 2 == 0 else -1
+        policy = 'random' if ply < random_plies else policies[0 if player == 1 else 1]
+        cells = choose_moves(boards[playing], player, policy, rng, weights)
+        flat[playing, cells] = player
+        moves[playing, ply] = cells
+        ply += 1
+
+        won = has_five(boards[playing], player)
+        winners[playing[won]] = player
+        lengths[playing[won]] = ply
+        playing = playing[~won]
+
+    lengths[playing] = ply
+    return moves, lengths, winners
+
+
+def records(moves, lengths, winners, size, first_id=0, prefix='sim'):
+    """Game records, in the format of analyse_games.py, for a simulated batch"""
+    for game, (length, winner) in enumerate(zip(lengths.tolist(), winners.tolist())):
+        cells = moves[game, :length].tolist()
+        yield {'game_id': f"{prefix}-{first_id + game}", 'size': size,
+               'moves': [[cell // size, cell % size] for cell in cells], 'winner': winner}
+
+
+def simulate(games, output, batch=4096, size=15, policies=('greedy', 'greedy'), random_plies=2,
+             max_moves=None, seed=0, report=None):
+    """
+    Simulate `games` games in batches, appending their records to `output`.
+
+    Returns:
+        dict: Games won by each side and drawn, and games per second
+    """
+    rng = np.random.default_rng(seed)
+    totals = {'x_wins': 0, 'o_wins': 0, 'draws': 0}
+    start = time.time()
+    played = 0
+    with open(output, 'a') as handle:
+        while played < games:
+            count = min(batch, games - played)
+            moves, lengths, winners = simulate_batch(count, size, policies, random_plies, max_moves, rng)
+            handle.write(''.join(json.dumps(record) + '\n' for record in
+                                 records(moves, lengths, winners, size, played, f"sim-{seed}")))
+            played += count
+            totals['x_wins'] += int(np.count_nonzero(winners == 1))
+            totals['o_wins'] += int(np.count_nonzero(winners == -1))
+            totals['draws'] += int(np.count_nonzero(winners == 0))
+            if report:
+                report(f"{played}/{games} games, {played / (time.time() - start):.0f} games/s")
+    totals['games_per_second'] = round(played / max(time.time() - start, 1e-9), 1)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--batch", type=int, default=4096, help="Games played in lockstep")
+    parser.add_argument("--size", type=int, default=15)
+    parser.add_argument("--policy", default="greedy", help="Policy of both sides, or X,O (random, greedy, lookahead)")
+    parser.add_argument("--random-plies", type=int, default=2, help="Opening plies played at random")
+    parser.add_argument("--max-moves", type=int, help="Moves after which a game is a draw (default: a full board)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="games.jsonl")
+    args = parser.parse_args()
+
+    policies = args.policy.split(",")
+    if len(policies) == 1:
+        policies *= 2
+    for policy in policies:
+        if policy not in POLICIES:
+            parser.error(f"unknown policy {policy!r} (choose from {', '.join(POLICIES)})")
+
+    totals = simulate(args.games, args.output, args.batch, args.size, tuple(policies), args.random_plies,
+                      args.max_moves, args.seed, report=lambda line: print(line, file=sys.stderr))
+    print(f"X wins {totals['x_wins']}, O wins {totals['o_wins']}, draws {totals['draws']} "
+          f"({totals['games_per_second']} games/s) -> {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
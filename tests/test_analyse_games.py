@@ -0,0 +1,97 @@
+"""
+Tests for the batch game analysis command.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from analyse_games import analyse_directory, analyse_game, completed_games, init_worker, load_records
+
+# X builds a four on row 4 from the edge; O does not block it at ply 7 and X wins
+GAME = [(4, 0), (0, 0), (4, 1), (0, 8), (4, 2), (8, 8), (4, 3), (8, 0), (4, 4)]
+
+
+class TestAnalyseGames(unittest.TestCase):
+    """Test suite for analyse_games.py"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.output = os.path.join(self.directory, 'analysis.jsonl')
+        for game_id in ('a', 'b'):
+            with open(os.path.join(self.directory, game_id + '.json'), 'w') as handle:
+                json.dump({'size': 9, 'moves': GAME}, handle)
+        init_worker(2)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read_output(self):
+        with open(self.output) as handle:
+            return [json.loads(line) for line in handle]
+
+    def test_annotates_every_move(self):
+        lines = analyse_game(('g', 9, GAME))
+        moves = [line for line in lines if 'ply' in line]
+        self.assertEqual(len(moves), len(GAME))
+        self.assertEqual(lines[-1]['summary']['moves'], len(GAME))
+        for line in moves:
+            self.assertGreaterEqual(line['score_loss'], 0)
+            self.assertEqual(len(line['best_move']), 2)
+
+    def test_flags_blunder(self):
+        """Not blocking the four loses the game."""
+        lines = analyse_game(('g', 9, GAME))
+        self.assertIn('blunder', lines[7]['flags'])
+        self.assertEqual(lines[7]['best_move'], [4, 4])
+        self.assertEqual(lines[-1]['summary']['blunders'], 1)
+
+    def test_best_move_has_no_loss(self):
+        lines = analyse_game(('g', 9, GAME[:1]))
+        best = lines[0]['best_move']
+        lines = analyse_game(('g', 9, [tuple(best)]))
+        self.assertEqual(lines[0]['score_loss'], 0)
+
+    def test_illegal_move_stops_game(self):
+        """A replayed cell is reported before it is searched."""
+        lines = analyse_game(('g', 9, GAME[:3] + [(4, 0), (4, 2)]))
+        self.assertEqual([line['ply'] for line in lines if 'ply' in line], [0, 1, 2])
+        self.assertEqual(lines[3], {'game_id': 'g', 'error': 'illegal move [4, 0] at ply 3'})
+        self.assertEqual(lines[-1]['summary']['moves'], 3)
+
+    def test_resume_skips_finished_games(self):
+        self.assertEqual(analyse_directory(self.directory, self.output, depth=1), 2)
+        self.assertEqual(analyse_directory(self.directory, self.output, depth=1), 0)
+        summaries = [line for line in self.read_output() if 'summary' in line]
+        self.assertEqual(sorted(line['game_id'] for line in summaries), ['a', 'b'])
+
+    def test_torn_output_is_cut(self):
+        """Lines of an unfinished game are dropped before resuming."""
+        analyse_directory(self.directory, self.output, depth=1)
+        lines = self.read_output()
+        with open(self.output, 'w') as handle:
+            for line in lines[:len(GAME) + 1]:  # Game 'a' complete
+                handle.write(json.dumps(line) + '\n')
+            handle.write(json.dumps(lines[len(GAME) + 1]) + '\n')  # First move of 'b'
+            handle.write('{"game_id": "b", "pl')
+        self.assertEqual(completed_games(self.output), {lines[len(GAME)]['game_id']})
+        self.assertEqual(analyse_directory(self.directory, self.output, depth=1), 1)
+        self.assertEqual(len(self.read_output()), 2 * (len(GAME) + 1))
+
+    def test_loads_records_per_line(self):
+        analyse_directory(self.directory, self.output, depth=1)
+        with open(os.path.join(self.directory, 'c.jsonl'), 'w') as handle:
+            handle.write(json.dumps({'game_id': 'sim-1', 'size': 9, 'moves': GAME[:3]}) + '\n')
+            handle.write(json.dumps({'size': 9, 'moves': GAME}) + '\n')
+        records = load_records(self.directory)
+        self.assertEqual([game_id for game_id, _, _ in records], ['a', 'b', 'sim-1', 'c:1'])
+        self.assertEqual(records[2][2], GAME[:3])
+
+    def test_process_pool(self):
+        self.assertEqual(analyse_directory(self.directory, self.output, workers=2, depth=1), 2)
+        self.assertEqual(len(self.read_output()), 2 * (len(GAME) + 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
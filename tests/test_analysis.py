@@ -0,0 +1,88 @@
+"""
+Tests for the background analysis behind the GUI's heatmap overlay.
+"""
+
+import random
+import time
+import unittest
+from ai.analysis import FIVE_SCORE, AnalysisWorker, cell_strength, is_candidate
+from game.board import Board
+
+
+def wait_for(worker, scores, timeout=5.0):
+    """Apply the worker's updates to `scores` until it has been idle for a moment"""
+    deadline = time.time() + timeout
+    idle = 0
+    while time.time() < deadline and idle < 5:
+        updates = worker.poll()
+        idle = 0 if updates else idle + 1
+        for cell, value in updates.items():
+            if value is None:
+                scores.pop(cell, None)
+            else:
+                scores[cell] = value
+        time.sleep(0.02)
+    return scores
+
+
+def full_scores(board):
+    """Every candidate cell scored from scratch"""
+    return {(row, col): (cell_strength(board.windows, row, col, 1), cell_strength(board.windows, row, col, -1))
+            for row in range(board.size) for col in range(board.size) if is_candidate(board, row, col)}
+
+
+class TestCellStrength(unittest.TestCase):
+    def test_completing_a_four_wins_and_blocking_it_is_valued(self):
+        board = Board(size=15)
+        for col in range(3, 7):
+            board.place_piece(7, col, 1)
+        board.place_piece(0, 0, -1)
+        self.assertGreaterEqual(cell_strength(board.windows, 7, 7, 1), FIVE_SCORE)
+        self.assertLess(cell_strength(board.windows, 7, 7, -1), FIVE_SCORE)
+        self.assertGreater(cell_strength(board.windows, 7, 7, -1), cell_strength(board.windows, 1, 1, -1))
+
+    def test_both_colours_are_scored_alike(self):
+        board = Board(size=15)
+        mirrored = Board(size=15)
+        for row, col, player in [(7, 7, 1), (7, 8, -1), (8, 8, 1), (6, 6, 1)]:
+            board.place_piece(row, col, player)
+            mirrored.place_piece(row, col, -player)
+        for row, col in [(5, 5), (9, 9), (8, 7), (6, 8)]:
+            self.assertEqual(cell_strength(board.windows, row, col, 1), cell_strength(mirrored.windows, row, col, -1))
+
+
+class TestAnalysisWorker(unittest.TestCase):
+    def test_incremental_scores_match_a_full_rescore(self):
+        rng = random.Random(4)
+        board = Board(size=15)
+        worker = AnalysisWorker(15, batch=4)
+        board.place_piece(7, 7, 1)
+        worker.start(board.move_history)
+        scores = {}
+        player = -1
+        try:
+            for _ in range(20):
+                row, col = rng.choice(sorted(full_scores(board)))
+                board.place_piece(row, col, player)
+                worker.play(row, col, player)
+                player = -player
+                if rng.random() < 0.5:
+                    wait_for(worker, scores)  # Some moves arrive while the previous one is still being scored
+            self.assertEqual(wait_for(worker, scores), full_scores(board))
+        finally:
+            worker.cancel()
+
+    def test_pause_holds_scoring_and_cancel_stops_the_thread(self):
+        worker = AnalysisWorker(15)
+        worker.pause()
+        worker.start([(7, 7, 1)])
+        time.sleep(0.1)
+        self.assertEqual(worker.poll(), {})
+        worker.resume()
+        self.assertEqual(len(wait_for(worker, {})), 24)
+        worker.cancel()
+        self.assertFalse(worker.thread.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+"""
+Tests for the adaptive beam of minimax.
+"""
+
+import unittest
+from ai.evaluation import evaluate_board
+from ai.minmax import minimax
+from ai.search_config import SearchConfig, SearchStats
+from benchmarks.positions import POSITIONS, build_board, side_to_move
+
+
+def search(name, depth, **options):
+    _, size, moves = next(entry for entry in POSITIONS if entry[0] == name)
+    board = build_board(size, moves)
+    stats = SearchStats()
+    score, move = minimax(board, depth, float('-inf'), float('inf'), True, evaluate_board, side_to_move(board),
+                          config=SearchConfig(stats=stats, **options))
+    return score, move, stats
+
+
+class TestBeamSearch(unittest.TestCase):
+    """Test suite for SearchConfig(beam=True) in minimax."""
+
+    def test_beam_searches_fewer_nodes(self):
+        _, move, fixed = search('midgame', 3)
+        _, beam_move, beam = search('midgame', 3, beam=True)
+        self.assertLess(beam.nodes, fixed.nodes)
+        self.assertIsNotNone(beam_move)
+
+    def test_beam_finds_the_win_the_closest_moves_miss(self):
+        """Scored moves reach the open three's winning line, the ten closest do not."""
+        fixed_score, _, _ = search('open_three', 3)
+        score, move, _ = search('open_three', 3, beam=True)
+        self.assertEqual(score, 1000000)
+        self.assertLess(fixed_score, score)
+
+    def test_width_per_depth(self):
+        _, _, narrow = search('opening', 2, beam=True, beam_margin=10 ** 6, beam_widths={1: 1, 2: 2})
+        # No threats on the board: the root, its two children and one grandchild each
+        self.assertEqual(narrow.nodes, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
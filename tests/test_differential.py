@@ -0,0 +1,47 @@
+"""
+Tests for the differential equivalence harness.
+"""
+
+import functools
+import random
+import unittest
+from ai.evaluation import evaluate_board
+from benchmarks.differential import (CHECKS, EVALUATORS, check_evaluation, check_search, dense, random_case,
+                                     recorded_cases, run)
+
+
+class TestDifferential(unittest.TestCase):
+    """Test suite running the optimised code against the references."""
+
+    def test_recorded_positions(self):
+        checks = {name: check for name, check in CHECKS.items() if name != 'search'}
+        self.assertEqual(run(recorded_cases(), checks), [])
+
+    def test_random_positions(self):
+        rng = random.Random(7)
+        cases = [random_case(rng) for _ in range(10)]
+        checks = {name: check for name, check in CHECKS.items() if name != 'search'}
+        self.assertEqual(run(cases, checks), [])
+
+    def test_search(self):
+        rng = random.Random(3)
+        cases = [random_case(rng, sizes=(9,), max_stones=6) for _ in range(2)]
+        self.assertEqual(run(cases, {'search': check_search}, depth=2), [])
+
+    def test_failures_are_shrunk(self):
+        def broken(case, player):
+            # Wrong as soon as there is a stone on row 0
+            board = dense(case)
+            return evaluate_board(board, player) + any(row == 0 for row, _, _ in board.move_history)
+
+        check = functools.partial(check_evaluation, variants=dict(EVALUATORS, broken=broken))
+        case = (9, [(4, 4, 1), (0, 3, -1), (5, 5, 1), (3, 3, -1), (6, 6, 1)])
+        failures = run([case], {'evaluation': check})
+        self.assertEqual(len(failures), 1)
+        name, minimal, message = failures[0]
+        self.assertEqual(minimal, (9, [(0, 3, -1)]))
+        self.assertIn('evaluation[broken]', message)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Tests for the Gomocup protocol engine.
+"""
+
+import asyncio
+import io
+import unittest
+import time
+from gomocup_engine import GomocupSession
+
+
+def run_session(commands, **kwargs):
+    """Feed commands to a session; end of input waits for the last search."""
+    output = io.StringIO()
+    session = GomocupSession(output=output, **kwargs)
+    asyncio.run(session.run(io.StringIO("\n".join(commands) + "\n")))
+    return session, output.getvalue().split("\n")[:-1]
+
+
+class TestGomocupSession(unittest.TestCase):
+    """Test suite for the protocol session."""
+
+    def test_start_and_begin(self):
+        """BEGIN should open in the centre."""
+        _, lines = run_session(["START 15", "BEGIN"], depth=1)
+        self.assertEqual(lines, ["OK", "7,7"])
+
+    def test_turn_reply_is_legal(self):
+        """The reply to TURN should be an empty cell, in x,y order."""
+        session, lines = run_session(["START 9", "TURN 4,3"], depth=1)
+        self.assertEqual(lines[0], "OK")
+        x, y = (int(part) for part in lines[1].split(","))
+        self.assertEqual(session.board.get_cell(3, 4), 1)
+        self.assertEqual(session.board.get_cell(y, x), -1)
+
+    def test_board_command_completes_five(self):
+        """BOARD should rebuild the position and the engine should win."""
+        commands = ["START 15", "BOARD"]
+        for x in range(3, 7):
+            commands.append(f"{x},7,1")
+            commands.append(f"{x},0,2")
+        commands.append("DONE")
+        _, lines = run_session(commands, depth=1)
+        self.assertIn(lines[1], ["2,7", "7,7"])
+
+    def test_info_sets_time_budget(self):
+        """INFO timeout_turn should bound the MCTS time budget."""
+        session, lines = run_session(["INFO timeout_turn 500", "START 9", "BEGIN"], engine="mcts")
+        self.assertEqual(session.timeout_turn, 0.5)
+        self.assertLess(session.player.algorithm.time_limit, 0.5)
+        self.assertEqual(lines, ["OK", "4,4"])
+
+    def test_time_budget_bounds_alpha_beta(self):
+        """INFO timeout_turn should bound the default engine's search too."""
+        start = time.time()
+        session, lines = run_session(["INFO timeout_turn 400", "START 15", "TURN 7,7"], depth=8)
+        self.assertLess(time.time() - start, 3.0)
+        self.assertLess(session.player.algorithm.time_limit, 0.4)
+        self.assertLess(session.player.algorithm.completed_depth, 8)
+        x, y = (int(part) for part in lines[1].split(","))
+        self.assertEqual(session.board.get_cell(y, x), -1)
+
+    def test_search_error_still_answers(self):
+        """A failing search is reported and answered with a legal move."""
+        class Broken(GomocupSession):
+            def _new_player(self, symbol):
+                player = super()._new_player(symbol)
+                def fail(board):
+                    board.place_piece(0, 0, symbol)  # Left behind by the failed search
+                    raise RuntimeError("boom")
+                player.get_move = fail
+                return player
+
+        output = io.StringIO()
+        session = Broken(output=output)
+        asyncio.run(session.run(io.StringIO("START 9\nTURN 4,4\nTURN 4,5\n")))
+        lines = output.getvalue().split("\n")[:-1]
+        self.assertEqual(lines[1], "ERROR search failed: boom")
+        self.assertEqual(lines[3], "ERROR search failed: boom")
+        self.assertEqual(session.board.get_cell(0, 0), 0)
+        self.assertEqual(len(session.board.move_history), 4)
+
+    def test_errors(self):
+        """Bad input should be reported, not crash the session."""
+        _, lines = run_session(["TURN 1,1", "START 2", "START 15", "TURN a,b", "FOO", "END"])
+        self.assertEqual(lines[0], "ERROR no game started")
+        self.assertTrue(lines[1].startswith("ERROR"))
+        self.assertEqual(lines[2], "OK")
+        self.assertTrue(lines[3].startswith("ERROR"))
+        self.assertTrue(lines[4].startswith("UNKNOWN"))
+
+    def test_engine_follows_the_game(self):
+        """Moves on both sides reach the engine, and every new game resets it."""
+        calls = []
+
+        class Spied(GomocupSession):
+            def _new_player(self, symbol):
+                player = super()._new_player(symbol)
+                player.notify_move = lambda *move: calls.append(move)
+                player.new_game = lambda: calls.append('new_game')
+                return player
+
+        output = io.StringIO()
+        session = Spied(output=output, depth=1)
+        asyncio.run(session.run(io.StringIO("START 9\nBEGIN\nTURN 0,0\nRESTART\nBOARD\n4,4,2\nDONE\n")))
+        lines = output.getvalue().split("\n")[:-1]
+        x, y = (int(part) for part in lines[2].split(","))
+        self.assertEqual(calls[:4], [(4, 4, 1), (0, 0, -1), (y, x, 1), 'new_game'])
+        self.assertEqual(calls[4], 'new_game')  # BOARD
+        self.assertEqual(session.player.symbol, -1)
+
+    def test_board_before_start(self):
+        """A BOARD block before START is reported and skipped."""
+        _, lines = run_session(["BOARD", "7,7,1", "8,8,2", "DONE", "START 9", "BEGIN"], depth=1)
+        self.assertEqual(lines, ["ERROR no game started", "OK", "4,4"])
+
+
+if __name__ == '__main__':
+    unittest.main()
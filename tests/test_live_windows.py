@@ -0,0 +1,102 @@
+"""
+Tests for live-window tracking and dead-draw detection.
+"""
+
+import random
+import unittest
+from ai.alphabeta import alpha_beta
+from ai.evaluation import evaluate_board
+from ai.minmax import minimax
+from ai.search_config import SearchConfig, SearchStats
+from game.board import Board
+from game.game_rules import get_game_state
+from game.sparse_board import SparseBoard
+from game.windows import DIRECTIONS, LiveWindows
+
+# On a 5x5 board every row, column and diagonal holds stones of both players after these moves
+DEAD = [(0, 0), (4, 0), (3, 0), (1, 1), (2, 1), (3, 2), (0, 4), (0, 2), (4, 3), (2, 3), (1, 2), (3, 4)]
+
+
+def play(board, moves):
+    player = 1
+    for row, col in moves:
+        board.place_piece(row, col, player)
+        player = -player
+    return board
+
+
+def brute_force_live(board, player):
+    """Windows with no stone of the opponent, counted cell by cell"""
+    live = 0
+    for row in range(board.size):
+        for col in range(board.size):
+            for dr, dc in DIRECTIONS:
+                cells = [board.get_cell(row + i * dr, col + i * dc) for i in range(5)]
+                if None not in cells and -player not in cells:
+                    live += 1
+    return live
+
+
+class TestLiveWindows(unittest.TestCase):
+    """Test suite for game/windows.py and Board.is_dead_draw"""
+
+    def test_counts_follow_moves_and_undos(self):
+        rng = random.Random(4)
+        for board in (Board(9), SparseBoard(9)):
+            player = 1
+            for step in range(60):
+                if board.move_history and rng.random() < 0.3:
+                    board.undo_last_move()
+                else:
+                    row, col = rng.choice(board.get_valid_moves())
+                    board.place_piece(row, col, player)
+                    player = -player
+                if step % 10 == 0:
+                    # Temporary stones, as the threat checks place them
+                    row, col = rng.choice(board.get_valid_moves())
+                    board.set_cell(row, col, player)
+                    board.set_cell(row, col, 0)
+                for side in (1, -1):
+                    self.assertEqual(board.windows.live[side], brute_force_live(board, side))
+
+    def test_dead_draw_before_the_board_is_full(self):
+        board = play(Board(5), DEAD[:-1])
+        self.assertFalse(board.is_dead_draw())
+        self.assertEqual(get_game_state(board), 'in_progress')
+        board.place_piece(*DEAD[-1], -1)
+        self.assertTrue(board.is_dead_draw())
+        self.assertFalse(board.is_full())
+        self.assertEqual(get_game_state(board), 'draw')
+        self.assertTrue(board.snapshot().is_dead_draw())
+        self.assertTrue(board.snapshot().to_board().is_dead_draw())
+        self.assertTrue(play(SparseBoard(5), DEAD).is_dead_draw())
+        board.undo_last_move()
+        self.assertFalse(board.is_dead_draw())
+
+    def test_infinite_board_is_never_dead(self):
+        self.assertFalse(play(SparseBoard(infinite=True), DEAD).is_dead_draw())
+
+    def test_searches_score_dead_draws_exactly(self):
+        board = play(Board(5), DEAD[:-1])
+        for search in (alpha_beta, minimax):
+            stats = SearchStats()
+            score, move = search(board, 3, float('-inf'), float('inf'), False, evaluate_board, 1,
+                                 config=SearchConfig(stats=stats))
+            self.assertIn(move, board.get_valid_moves())
+            self.assertGreater(stats.dead_draws, 0)
+
+        board.place_piece(*DEAD[-1], -1)
+        stats = SearchStats()
+        score, move = alpha_beta(board, 4, float('-inf'), float('inf'), True, evaluate_board, 1,
+                                 SearchConfig(stats=stats))
+        self.assertEqual((score, stats.nodes), (0, 1))
+        self.assertIn(move, board.get_valid_moves())
+
+    def test_count_from_scratch(self):
+        board = play(Board(7), [(3, 3), (3, 4), (2, 2), (4, 4)])
+        counted = LiveWindows.count(board)
+        self.assertEqual(counted.live, board.windows.live)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+"""
+Tests for the concurrent-session load test.
+"""
+
+import unittest
+from benchmarks.load_test import InProcessBackend, percentile, run_load_test
+
+
+class TestLoadTest(unittest.TestCase):
+    """Test suite for the load generator with the in-process backend."""
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.50), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([3], 0.95), 3)
+        self.assertIsNone(percentile([], 0.5))
+
+    def test_report(self):
+        report = run_load_test(InProcessBackend(depth=1), sessions=3, duration=1.5, think=0.01, size=9,
+                               sample_every=0.2)
+        self.assertEqual(report['errors'], 0)
+        self.assertGreater(report['moves'], 0)
+        latency = report['latency_ms']
+        self.assertLessEqual(latency['p50'], latency['p95'])
+        self.assertLessEqual(latency['p95'], latency['p99'])
+        self.assertGreater(len(report['rss_bytes']), 1)
+        self.assertIn('main', report['worker_utilisation'])
+        self.assertGreater(report['worker_utilisation']['main'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Tests for the MCTS engine.
+"""
+
+import unittest
+from game.board import Board
+from game.player import AIPlayer
+from ai.mcts import MCTSEngine, NodePool
+
+
+class TestMCTSEngine(unittest.TestCase):
+    """Test suite for MCTSEngine."""
+
+    def setUp(self):
+        """Set up a small board with a few stones."""
+        self.board = Board(size=9)
+
+    def test_completes_five(self):
+        """The engine should complete an open four."""
+        for col in range(2, 6):
+            self.board.place_piece(4, col, 1)
+            self.board.place_piece(0, col * 2 - 4, -1)
+        engine = MCTSEngine(time_limit=None, max_iterations=300, seed=1)
+        self.assertIn(engine.get_move(self.board, 1), [(4, 1), (4, 6)])
+
+    def test_blocks_four(self):
+        """The engine should block a four it cannot beat."""
+        for row in range(1, 5):
+            self.board.place_piece(row, 4, 1)
+        self.board.place_piece(0, 4, -1)
+        self.board.place_piece(8, 0, -1)
+        self.board.place_piece(8, 8, -1)
+        engine = MCTSEngine(time_limit=None, max_iterations=400, seed=2)
+        self.assertEqual(engine.get_move(self.board, -1), (5, 4))
+
+    def test_tree_reused_between_moves(self):
+        """The subtree of the moves actually played should be kept."""
+        self.board.place_piece(4, 4, 1)
+        engine = MCTSEngine(time_limit=None, max_iterations=200, seed=3)
+        row, col = engine.get_move(self.board, -1)
+        child = next(c for c in engine.root.children if c.move == (row, col))
+        self.board.place_piece(row, col, -1)
+        reply = next(iter(child.children), None)
+        if reply is None:
+            self.skipTest("search did not expand the reply")
+        self.board.place_piece(reply.move[0], reply.move[1], 1)
+        visits_before = reply.visits
+        engine.max_iterations = 1
+        engine.get_move(self.board, -1)
+        self.assertIs(engine.root, reply)
+        self.assertGreater(engine.root.visits, visits_before)
+
+    def test_tree_released_when_reply_unexpanded(self):
+        """A reply outside the tree frees the kept subtree exactly once."""
+        self.board.place_piece(4, 4, 1)
+        engine = MCTSEngine(time_limit=None, max_iterations=200, seed=3)
+        row, col = engine.get_move(self.board, -1)
+        self.board.place_piece(row, col, -1)
+        child = next(c for c in engine.root.children if c.move == (row, col))
+        expanded = {c.move for c in child.children}
+        reply = next(cell for cell in self.board.get_valid_moves() if cell not in expanded)
+        self.board.place_piece(reply[0], reply[1], 1)
+        engine.max_iterations = 0
+        engine._sync_root(self.board, -1)
+        self.assertEqual(len(engine.pool.free), len(set(map(id, engine.pool.free))))
+        self.assertNotIn(engine.root, engine.pool.free)
+        self.assertEqual(engine.pool.in_use, 1)
+
+    def test_node_pool_is_bounded(self):
+        """The tree should never hold more nodes than the pool capacity."""
+        self.board.place_piece(4, 4, 1)
+        engine = MCTSEngine(time_limit=None, max_iterations=300, max_nodes=50, seed=4)
+        engine.get_move(self.board, -1)
+        self.assertLessEqual(engine.pool.allocated, 50)
+
+    def test_node_pool_recycles(self):
+        """Released nodes should be handed out again."""
+        pool = NodePool(2)
+        root = pool.acquire(None, 1, None, 1.0)
+        root.children.append(pool.acquire((0, 0), -1, root, 1.0))
+        self.assertIsNone(pool.acquire((1, 1), -1, root, 1.0))
+        pool.release(root)
+        self.assertIsNotNone(pool.acquire((1, 1), -1, None, 1.0))
+        self.assertEqual(pool.in_use, 1)
+
+    def test_ai_player_uses_engine(self):
+        """AIPlayer should delegate to engine objects."""
+        self.board.place_piece(4, 4, 1)
+        player = AIPlayer(-1, algorithm=MCTSEngine(time_limit=None, max_iterations=50, seed=5))
+        row, col = player.get_move(self.board)
+        self.assertEqual(self.board.get_cell(row, col), 0)
+
+    def test_parallel_rollouts(self):
+        """Rollouts spread over a process pool should still produce a legal move."""
+        self.board.place_piece(4, 4, 1)
+        engine = MCTSEngine(time_limit=None, max_iterations=16, workers=2, seed=6)
+        try:
+            row, col = engine.get_move(self.board, -1)
+        finally:
+            engine.close()
+        self.assertEqual(self.board.get_cell(row, col), 0)
+        self.assertEqual(engine.iterations, 16)
+
+
+if __name__ == '__main__':
+    unittest.main()
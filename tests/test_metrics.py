@@ -0,0 +1,87 @@
+"""
+Tests for the per-move metrics recorder.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from game.board import Board
+from game.metrics import LATENCY_BUCKETS, MetricsRecorder
+from game.player import AIPlayer
+from ai.alphabeta import alpha_beta
+from ai.minmax import minimax
+
+
+class TestMetrics(unittest.TestCase):
+    """Test suite for MetricsRecorder and its use in AIPlayer."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.jsonl = os.path.join(self.directory, 'moves.jsonl')
+        self.prom = os.path.join(self.directory, 'gomoku.prom')
+        self.recorder = MetricsRecorder(self.jsonl, self.prom, flush_every=1000)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_histogram_and_percentiles(self):
+        for seconds in (0.001, 0.02, 0.02, 0.3, 4.0):
+            self.recorder.record_move('alpha_beta-d3', seconds, nodes=100)
+        engine = self.recorder.engines['alpha_beta-d3']
+        self.assertEqual(engine.moves, 5)
+        self.assertEqual(sum(engine.buckets), 5)
+        self.assertEqual(engine.percentile(0.5), 0.025)
+        self.assertEqual(engine.percentile(0.99), 5.0)
+
+    def test_prometheus_text(self):
+        self.recorder.record_move('minimax-d2', 0.2, nodes=50, depth=2, table_hits=0)
+        self.recorder.flush()
+        with open(self.prom) as handle:
+            text = handle.read()
+        self.assertIn('# TYPE gomoku_move_seconds histogram', text)
+        self.assertIn('gomoku_move_seconds_bucket{engine="minimax-d2",le="0.25"} 1', text)
+        self.assertIn('gomoku_move_seconds_bucket{engine="minimax-d2",le="0.1"} 0', text)
+        self.assertIn('gomoku_move_seconds_count{engine="minimax-d2"} 1', text)
+        self.assertIn('gomoku_nodes_per_second{engine="minimax-d2"} 250.0', text)
+        self.assertIn('gomoku_search_depth{engine="minimax-d2"} 2', text)
+        self.assertEqual(len(LATENCY_BUCKETS) + 1, text.count('gomoku_move_seconds_bucket'))
+
+    def test_lines_written_on_flush(self):
+        self.recorder.record_move('x', 0.5, nodes=1000, depth=3, table_hits=100)
+        self.assertFalse(os.path.exists(self.jsonl))
+        self.recorder.flush()
+        with open(self.jsonl) as handle:
+            line = json.loads(handle.readline())
+        self.assertEqual(line['nodes_per_sec'], 2000)
+        self.assertEqual(line['table_hit_rate'], 0.1)
+
+    def test_rotation(self):
+        recorder = MetricsRecorder(self.jsonl, None, max_bytes=500, backups=2, flush_every=5)
+        for _ in range(40):
+            recorder.record_move('x', 0.01)
+        recorder.close()
+        self.assertTrue(os.path.exists(self.jsonl + '.1'))
+        self.assertTrue(os.path.exists(self.jsonl + '.2'))
+        self.assertFalse(os.path.exists(self.jsonl + '.3'))
+
+    def test_player_records_moves(self):
+        board = Board(size=9)
+        board.place_piece(4, 4, 1)
+        for algorithm, label in ((alpha_beta, 'alpha_beta-d2'), (minimax, 'minimax-d2')):
+            player = AIPlayer(-1, algorithm=algorithm, depth=2, metrics=self.recorder)
+            player.get_move(board)
+            engine = self.recorder.engines[label]
+            self.assertEqual(engine.moves, 1)
+            self.assertGreater(engine.nodes, 0)
+            self.assertEqual(engine.depth, 2)
+
+    def test_player_without_metrics(self):
+        """No recorder means no search counters are added."""
+        player = AIPlayer(1, algorithm=minimax, depth=1)
+        self.assertIsNone(player.config)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+Tests for the HTTP move service.
+"""
+
+import json
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+from move_service import GameSession, MoveService, create_server
+
+
+class TestMoveService(unittest.TestCase):
+    """Test suite for MoveService behind a local HTTP server."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.service = MoveService(workers=2, depth=1, max_pending=4)
+        cls.service.start()
+        cls.server = create_server(cls.service, port=0)
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.service.stop()
+
+    def post(self, path, body):
+        request = urllib.request.Request(self.url + path, data=json.dumps(body).encode(),
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as error:
+            return error.code, json.loads(error.read())
+
+    def test_session_stays_warm(self):
+        """Consecutive turns of one game should reuse the worker's board."""
+        moves = [[4, 4]]
+        status, result = self.post("/move", {"game_id": "warm", "size": 9, "moves": moves})
+        self.assertEqual(status, 200)
+        self.assertFalse(result["warm"])
+        moves.append(result["move"])
+        moves.append([0, 0])
+        status, result = self.post("/move", {"game_id": "warm", "size": 9, "moves": moves})
+        self.assertEqual(status, 200)
+        self.assertTrue(result["warm"])
+        self.assertNotIn(result["move"], moves)
+
+    def test_illegal_move_rejected(self):
+        """Playing twice on a cell should be a client error."""
+        status, result = self.post("/move", {"game_id": "bad", "size": 9, "moves": [[1, 1], [1, 1]]})
+        self.assertEqual(status, 400)
+        self.assertIn("illegal", result["error"])
+
+    def test_illegal_move_drops_session(self):
+        """After an illegal move the game starts cold again."""
+        self.assertEqual(self.post("/move", {"game_id": "reset", "size": 9, "moves": [[1, 1]]})[0], 200)
+        self.assertEqual(self.post("/move", {"game_id": "reset", "size": 9, "moves": [[1, 1], [1, 1]]})[0], 400)
+        status, result = self.post("/move", {"game_id": "reset", "size": 9, "moves": [[4, 4]]})
+        self.assertEqual(status, 200)
+        self.assertFalse(result["warm"])
+
+    def test_bad_input_rejected(self):
+        """Malformed size, moves or deadline should be client errors, not 500s."""
+        for body in ({"game_id": "x", "size": "big", "moves": []},
+                     {"game_id": "x", "size": 3, "moves": []},
+                     {"game_id": "x", "size": 9, "moves": [[1]]},
+                     {"game_id": "x", "size": 9, "moves": [], "deadline_ms": "soon"},
+                     {"game_id": "x", "size": 9, "moves": [], "deadline_ms": -5}):
+            status, result = self.post("/move", body)
+            self.assertEqual(status, 400, body)
+            self.assertIn("error", result)
+
+    def test_deadline_bounds_search(self):
+        """A deep alpha-beta search should answer within the request deadline."""
+        service = MoveService(workers=1, depth=8)
+        service.start()
+        try:
+            moves = [[7, 7], [7, 8], [8, 8], [6, 6], [8, 7]]
+            start = time.time()
+            status, result = service.submit('move', {"game_id": "deep", "size": 15, "moves": moves},
+                                            deadline_ms=800)
+            self.assertEqual(status, 200)
+            self.assertLess(time.time() - start, 0.8)
+            self.assertNotIn(result["move"], moves)
+        finally:
+            service.stop()
+
+    def test_affinity_is_stable(self):
+        """A game should always map to the same worker."""
+        self.assertEqual(self.service.worker_for("game-42"), self.service.worker_for("game-42"))
+
+    def test_admission_control(self):
+        """A worker with a full queue should reject new work."""
+        worker = self.service.worker_for("busy")
+        self.service.pending[worker] += self.service.max_pending
+        try:
+            status, _ = self.post("/move", {"game_id": "busy", "size": 9, "moves": []})
+        finally:
+            self.service.pending[worker] -= self.service.max_pending
+        self.assertEqual(status, 503)
+
+    def test_end_and_health(self):
+        """Sessions can be dropped and workers report their state."""
+        self.assertEqual(self.post("/end", {"game_id": "warm"})[0], 200)
+        with urllib.request.urlopen(self.url + "/health", timeout=30) as response:
+            health = json.loads(response.read())
+        self.assertEqual(len(health["workers"]), 2)
+
+    def test_session_tells_players_the_moves(self):
+        """Every move applied reaches the engines, and a rebuilt game starts them afresh."""
+        session = GameSession(9, {'engine': 'alphabeta', 'depth': 1}, None)
+        player = session.player(-1)
+        calls = []
+        player.notify_move = lambda *move: calls.append(move)
+        player.new_game = lambda: calls.append('new_game')
+        session.sync([(4, 4)])
+        session.sync([(4, 4), (3, 3), (5, 5)])
+        self.assertEqual(calls, [(4, 4, 1), (3, 3, -1), (5, 5, 1)])
+        session.sync([(0, 0)])
+        self.assertEqual(calls[3:], ['new_game', (0, 0, 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
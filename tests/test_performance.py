@@ -0,0 +1,141 @@
+"""
+Performance regression tests for the search.
+
+The node and eval budgets count work, not time, so they are the same on
+every machine; they sit about 25% above the current counts. The timing
+tier compares wall time against a fixed pure-Python workload run on the
+same machine, with budgets about 2.5x the current ratios, so a change that
+makes alpha_beta, order_moves or evaluate_board several times slower fails
+the run. Set GOMOKU_SKIP_TIMING=1 to skip the timing tier on loaded machines.
+"""
+
+import os
+import time
+import unittest
+from ai.alphabeta import alpha_beta
+from ai.evaluation import evaluate_board
+from ai.minmax import minimax
+from ai.move_ordering import order_moves
+from ai.search_config import SearchConfig, SearchStats
+from ai.search_engine import SearchEngine
+from benchmarks.positions import POSITIONS, build_board, side_to_move
+from game.game_rules import get_valid_moves_with_heuristics
+
+# name: (nodes, evals) upper bounds for a depth 2 search
+ALPHA_BETA_BUDGETS = {
+    "opening": (240, 190),
+    "open_three": (380, 320),
+    "midgame": (820, 740),
+    "small_board": (210, 155),
+}
+MINIMAX_BUDGETS = {
+    "opening": (40, 25),
+    "open_three": (60, 45),
+    "midgame": (80, 65),
+    "small_board": (40, 25),
+}
+
+# Wall time budgets, in units of calibrate()
+EVALUATE_BUDGET = 2.0       # 20 calls of evaluate_board on the midgame position
+ORDER_BUDGET = 2.0          # 3 calls of order_moves on the midgame position
+ALPHA_BETA_BUDGET = 18.0    # Depth 2 alpha_beta on the small board
+
+
+def search_stats(algorithm, size, moves, **options):
+    board = build_board(size, moves)
+    stats = SearchStats()
+    algorithm(board, 2, float('-inf'), float('inf'), True, evaluate_board, side_to_move(board),
+              config=SearchConfig(stats=stats, **options))
+    return stats
+
+
+def calibrate():
+    """Fixed workload of board-like loops, the time unit of the timing tier"""
+    grid = [[0] * 15 for _ in range(15)]
+    total = 0
+    for _ in range(400):
+        for row in grid:
+            for col in range(15):
+                for step in range(5):
+                    total += row[col] + step
+    return total
+
+
+def best_time(fn, repeat=5):
+    """Fastest of several runs, the least noisy estimate"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+class TestNodeBudgets(unittest.TestCase):
+    """Deterministic work counts on the benchmark positions."""
+
+    def test_alpha_beta_budgets(self):
+        for name, size, moves in POSITIONS:
+            with self.subTest(position=name):
+                stats = search_stats(alpha_beta, size, moves)
+                nodes, evals = ALPHA_BETA_BUDGETS[name]
+                self.assertLessEqual(stats.nodes, nodes)
+                self.assertLessEqual(stats.evals, evals)
+
+    def test_minimax_budgets(self):
+        for name, size, moves in POSITIONS:
+            with self.subTest(position=name):
+                stats = search_stats(minimax, size, moves)
+                nodes, evals = MINIMAX_BUDGETS[name]
+                self.assertLessEqual(stats.nodes, nodes)
+                self.assertLessEqual(stats.evals, evals)
+
+    def test_selective_search_not_worse(self):
+        """LMR and forced moves never search more nodes than the plain search."""
+        for name, size, moves in POSITIONS:
+            with self.subTest(position=name):
+                plain = search_stats(alpha_beta, size, moves).nodes
+                self.assertLessEqual(search_stats(alpha_beta, size, moves, lmr=True, lmr_min_depth=2).nodes,
+                                     plain)
+                self.assertLessEqual(search_stats(alpha_beta, size, moves, forced_moves=True).nodes, plain)
+
+    def test_engine_budget(self):
+        """Iterative deepening with tables costs at most the plain search plus a depth 1 pass."""
+        for name, size, moves in POSITIONS:
+            with self.subTest(position=name):
+                board = build_board(size, moves)
+                stats = SearchStats()
+                SearchEngine(depth=2, config=SearchConfig(stats=stats)).get_move(board, side_to_move(board))
+                nodes, _ = ALPHA_BETA_BUDGETS[name]
+                self.assertLessEqual(stats.nodes, nodes + 80)
+
+
+@unittest.skipIf(os.environ.get('GOMOKU_SKIP_TIMING'), "timing tier disabled by GOMOKU_SKIP_TIMING")
+class TestWallTime(unittest.TestCase):
+    """Wall time relative to calibrate() on the same machine."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.unit = best_time(calibrate)
+        cls.board = build_board(15, POSITIONS[2][2])
+        cls.moves = get_valid_moves_with_heuristics(cls.board)
+
+    def ratio(self, fn, repeat=5):
+        return best_time(fn, repeat) / self.unit
+
+    def test_evaluate_board_time(self):
+        ratio = self.ratio(lambda: [evaluate_board(self.board, 1) for _ in range(20)])
+        self.assertLess(ratio, EVALUATE_BUDGET)
+
+    def test_order_moves_time(self):
+        ratio = self.ratio(lambda: [order_moves(self.board, self.moves, 1) for _ in range(3)])
+        self.assertLess(ratio, ORDER_BUDGET)
+
+    def test_alpha_beta_time(self):
+        board = build_board(9, POSITIONS[3][2])
+        ratio = self.ratio(lambda: alpha_beta(board, 2, float('-inf'), float('inf'), True, evaluate_board, 1), 3)
+        self.assertLess(ratio, ALPHA_BETA_BUDGET)
+
+
+if __name__ == '__main__':
+    unittest.main()
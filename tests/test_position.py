@@ -0,0 +1,89 @@
+"""
+Tests for immutable board snapshots.
+"""
+
+import pickle
+import threading
+import unittest
+from game.board import Board
+from game.position import Position
+from ai.evaluation import evaluate_board
+
+MOVES = [(7, 7, 1), (7, 8, -1), (6, 6, 1), (8, 8, -1), (5, 5, 1)]
+
+
+class TestPosition(unittest.TestCase):
+    """Test suite for Position."""
+
+    def test_play_shares_unchanged_rows(self):
+        parent = Position(15).play(7, 7, 1)
+        child = parent.play(6, 6, -1)
+        self.assertEqual(parent.get_cell(6, 6), 0)
+        self.assertEqual(child.get_cell(6, 6), -1)
+        for row in range(15):
+            if row != 6:
+                self.assertIs(child.board[row], parent.board[row])
+        self.assertIs(child._tail[1], parent._tail)
+
+    def test_matches_board(self):
+        board = Board(15)
+        position = Position(15)
+        for row, col, player in MOVES:
+            board.place_piece(row, col, player)
+            position = position.play(row, col, player)
+        self.assertEqual(position.hash, board.hash)
+        self.assertEqual(position.move_history, board.move_history)
+        self.assertEqual(position.last_move, board.last_move)
+        self.assertEqual(sorted(position.get_restricted_valid_moves()), sorted(board.get_restricted_valid_moves()))
+        self.assertEqual(evaluate_board(position, 1), evaluate_board(board, 1))
+        self.assertEqual(board.snapshot(), position)
+
+        copy = position.to_board()
+        copy.place_piece(0, 0, -1)
+        self.assertEqual(position.get_cell(0, 0), 0)
+        copy.undo_last_move()
+        self.assertEqual(copy.hash, position.hash)
+
+    def test_immutable(self):
+        position = Position(9)
+        with self.assertRaises(AttributeError):
+            position.hash = 1
+        with self.assertRaises(TypeError):
+            position.board[0][0] = 1
+        position.play(4, 4, 1)
+        with self.assertRaises(ValueError):
+            position.play(4, 4, 1).play(4, 4, -1)
+        self.assertEqual(position.stones, 0)
+
+    def test_pickle_round_trip(self):
+        position = Position(15)
+        for row, col, player in MOVES:
+            position = position.play(row, col, player)
+        restored = pickle.loads(pickle.dumps(position))
+        self.assertEqual(restored, position)
+        self.assertEqual(restored.move_history, position.move_history)
+        self.assertEqual(restored.play(0, 0, -1).hash, position.play(0, 0, -1).hash)
+
+    def test_branches_from_threads(self):
+        root = Board(15)
+        for row, col, player in MOVES:
+            root.place_piece(row, col, player)
+        snapshot = root.snapshot()
+        results = {}
+
+        def branch(col):
+            results[col] = snapshot.play(0, col, -1)
+
+        threads = [threading.Thread(target=branch, args=(col,)) for col in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for col, position in results.items():
+            self.assertEqual(position.get_cell(0, col), -1)
+            self.assertEqual(position.stones, len(MOVES) + 1)
+        self.assertEqual(snapshot.stones, len(MOVES))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+Tests for the on-disk position cache.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from game.board import Board
+from game.player import AIPlayer
+from ai.alphabeta import alpha_beta
+from ai.minmax import minimax
+from ai.proof_number import ProofNumberSolver
+from ai.position_cache import PositionCache, canonical_hash
+from ai.search_config import SearchConfig, SearchStats
+
+
+def position(moves, size=9):
+    board = Board(size)
+    for row, col, player in moves:
+        board.place_piece(row, col, player)
+    return board
+
+
+class TestPositionCache(unittest.TestCase):
+    """Test suite for PositionCache and its use in AIPlayer."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'positions.sqlite')
+        self.cache = PositionCache(self.path, min_depth=2)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.directory)
+
+    def test_symmetric_positions_share_an_entry(self):
+        board = position([(4, 4, 1), (3, 5, -1), (2, 1, 1)])
+        # Rotated by 90 degrees: (r, c) -> (c, 8 - r)
+        rotated = position([(4, 4, 1), (5, 5, -1), (1, 6, 1)])
+        self.assertEqual(canonical_hash(board)[0], canonical_hash(rotated)[0])
+
+        self.cache.store(board, -1, 'alpha_beta', 3, 120, (2, 2))
+        entry = self.cache.lookup(rotated, -1, 'alpha_beta')
+        self.assertEqual((entry.depth, entry.score), (3, 120))
+        self.assertEqual(entry.move, (2, 6))
+        self.assertIsNone(self.cache.lookup(rotated, 1, 'alpha_beta'))
+        self.assertIsNone(self.cache.lookup(rotated, -1, 'minimax'))
+
+    def test_shallow_results_are_not_written(self):
+        board = position([(4, 4, 1)])
+        self.cache.store(board, -1, 'alpha_beta', 1, 10, (4, 5))
+        self.assertIsNone(self.cache.lookup(board, -1, 'alpha_beta'))
+        self.cache.store(board, -1, 'alpha_beta', 4, 10, (4, 5))
+        self.cache.store(board, -1, 'alpha_beta', 2, 99, (3, 3))
+        self.assertEqual(self.cache.lookup(board, -1, 'alpha_beta').depth, 4)
+
+    def test_eviction_drops_shallow_entries_first(self):
+        self.cache.max_entries = 2
+        boards = [position([(row, 0, 1)]) for row in range(3)]
+        for board, depth in zip(boards, (5, 2, 4)):
+            self.cache.store(board, -1, 'alpha_beta', depth, 0, (4, 4))
+        self.cache.evict()
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNone(self.cache.lookup(boards[1], -1, 'alpha_beta'))
+        self.assertIsNotNone(self.cache.lookup(boards[0], -1, 'alpha_beta'))
+
+    def test_results_survive_across_connections(self):
+        board = position([(4, 4, 1), (4, 5, -1)])
+        self.cache.store(board, 1, 'alpha_beta', 3, 50, (3, 4))
+        readers = [PositionCache(self.path) for _ in range(2)]
+        try:
+            for reader in readers:
+                self.assertEqual(reader.lookup(board, 1, 'alpha_beta').move, (3, 4))
+        finally:
+            for reader in readers:
+                reader.close()
+
+    def test_player_answers_from_cache(self):
+        board = position([(4, 4, 1), (4, 5, -1), (3, 3, 1)])
+        first = AIPlayer(-1, alpha_beta, depth=2, cache=self.cache)
+        move = first.get_move(board)
+
+        config = SearchConfig(stats=SearchStats())
+        second = AIPlayer(-1, alpha_beta, depth=2, config=config, cache=self.cache)
+        self.assertEqual(second.get_move(board), move)
+        self.assertEqual(config.stats.nodes, 0)
+
+        # A deeper player does not trust a shallower result
+        deeper = AIPlayer(-1, alpha_beta, depth=3, config=config, cache=self.cache)
+        deeper.get_move(board)
+        self.assertGreater(config.stats.nodes, 0)
+
+    def test_settings_do_not_share_entries(self):
+        """A selective search's results are not trusted by the plain search, or the reverse."""
+        board = position([(4, 4, 1), (4, 5, -1), (3, 3, 1)])
+        selective = SearchConfig(lmr=True, futility=True)
+        AIPlayer(-1, alpha_beta, depth=2, config=selective, cache=self.cache).get_move(board)
+
+        config = SearchConfig(stats=SearchStats())
+        AIPlayer(-1, alpha_beta, depth=2, config=config, cache=self.cache).get_move(board)
+        self.assertGreater(config.stats.nodes, 0)
+
+        names = {AIPlayer(-1, alpha_beta, depth=2, config=options).cache_name
+                 for options in (None, SearchConfig(lmr=True), SearchConfig(lmr=True, lmr_reduction=2),
+                                 SearchConfig(razoring=True), SearchConfig(extensions=True),
+                                 SearchConfig(forced_moves=True), SearchConfig(beam=True),
+                                 SearchConfig(beam=True, beam_margin=50))}
+        self.assertEqual(len(names), 8)
+        self.assertNotEqual(AIPlayer(-1, minimax, max_moves=10).cache_name,
+                            AIPlayer(-1, minimax, max_moves=5).cache_name)
+
+    def test_proven_win_beats_cache(self):
+        """The solver is asked before the cache."""
+        board = position([(4, 2, 1), (4, 3, 1), (4, 4, 1), (4, 5, 1), (0, 0, -1), (0, 8, -1), (8, 8, -1)])
+        player = AIPlayer(1, alpha_beta, depth=2, solver=ProofNumberSolver(), cache=self.cache)
+        self.cache.store(board, 1, player.cache_name, 5, 0, (8, 0))
+        self.assertIn(player.get_move(board), [(4, 1), (4, 6)])
+
+
+if __name__ == '__main__':
+    unittest.main()
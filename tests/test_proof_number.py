@@ -0,0 +1,82 @@
+"""
+Tests for the proof-number solver.
+"""
+
+import unittest
+from game.board import Board
+from game.player import AIPlayer
+from ai.alphabeta import alpha_beta
+from ai.proof_number import ProofNumberSolver
+
+
+class TestProofNumberSolver(unittest.TestCase):
+    """Test suite for ProofNumberSolver."""
+
+    def setUp(self):
+        """Set up a board and a fresh solver."""
+        self.board = Board(size=15)
+        self.solver = ProofNumberSolver()
+
+    def place(self, stones, player):
+        for row, col in stones:
+            self.board.place_piece(row, col, player)
+
+    def test_open_three_is_a_win(self):
+        """An open three with the move is a forced win."""
+        self.place([(7, 5), (7, 6), (7, 7)], 1)
+        self.place([(0, 0), (0, 14), (14, 0)], -1)
+        proof = self.solver.solve(self.board, 1)
+        self.assertEqual(proof.result, 'proven')
+        self.assertIn(proof.line[0], [(7, 4), (7, 8)])
+
+    def test_four_three_line(self):
+        """The solver should find a four followed by an unstoppable double threat."""
+        self.place([(7, 7), (8, 8), (9, 9), (7, 10), (7, 9)], 1)
+        self.place([(6, 6), (0, 0), (0, 14), (14, 0), (14, 14)], -1)
+        proof = self.solver.solve(self.board, 1)
+        self.assertEqual(proof.result, 'proven')
+        self.assertEqual(proof.line[:2], [(10, 10), (11, 11)])
+        self.assertIn(proof.line[2], [(7, 8), (7, 11), (7, 6)])
+
+    def test_quiet_position_is_disproven(self):
+        """Without threats there is no forced win to prove."""
+        self.place([(7, 7)], 1)
+        self.place([(7, 8)], -1)
+        self.assertEqual(self.solver.solve(self.board, 1).result, 'disproven')
+
+    def test_board_is_restored(self):
+        """Solving must leave the board as it was."""
+        self.place([(7, 7), (8, 8), (9, 9), (7, 10), (7, 9)], 1)
+        self.place([(6, 6), (0, 0), (0, 14), (14, 0), (14, 14)], -1)
+        history = list(self.board.move_history)
+        key = self.board.hash
+        self.solver.solve(self.board, 1)
+        self.assertEqual(self.board.move_history, history)
+        self.assertEqual(self.board.hash, key)
+
+    def test_solved_subtrees_are_collected(self):
+        """Only the winning line should remain cached after a proof."""
+        self.place([(7, 7), (8, 8), (9, 9), (7, 10), (7, 9)], 1)
+        self.place([(6, 6), (0, 0), (0, 14), (14, 0), (14, 14)], -1)
+        proof = self.solver.solve(self.board, 1)
+        self.assertLessEqual(proof.nodes, len(proof.line) + 1)
+
+    def test_node_budget(self):
+        """The search should stop once the cache is full."""
+        solver = ProofNumberSolver(max_nodes=5)
+        self.place([(7, 7), (8, 8), (9, 9), (7, 10), (7, 9)], 1)
+        self.place([(6, 6), (0, 0), (0, 14), (14, 0), (14, 14)], -1)
+        proof = solver.solve(self.board, 1)
+        self.assertEqual(proof.result, 'unknown')
+        self.assertEqual(proof.iterations, 1)
+
+    def test_ai_player_oracle(self):
+        """AIPlayer should play the first move of a proven line."""
+        self.place([(7, 5), (7, 6), (7, 7)], -1)
+        self.place([(0, 0), (0, 14), (14, 0)], 1)
+        player = AIPlayer(-1, algorithm=alpha_beta, depth=1, solver=self.solver)
+        self.assertIn(player.get_move(self.board), [(7, 4), (7, 8)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+"""
+Tests for the preallocated move buffers used by the search inner loop.
+"""
+
+import unittest
+from game.board import Board
+from ai.evaluation import evaluate_board
+from ai.minmax import minimax, sort_by_distance
+from ai.move_ordering import beam_moves, order_moves, order_moves_into, staged_moves
+from ai.search_buffers import copy_moves, fill_valid_moves, get_buffers
+from game.game_rules import get_valid_moves_with_heuristics
+
+
+class TestSearchBuffers(unittest.TestCase):
+    """Test suite for search_buffers and order_moves_into."""
+
+    def setUp(self):
+        self.board = Board(size=15)
+        for row, col, player in [(7, 7, 1), (7, 8, -1), (8, 8, 1), (6, 6, -1), (9, 9, 1), (0, 14, -1)]:
+            self.board.place_piece(row, col, player)
+        self.buffers = get_buffers(15)
+
+    def test_fill_matches_heuristic_moves(self):
+        """The buffer holds the same cells as get_valid_moves_with_heuristics."""
+        count = fill_valid_moves(self.board, self.buffers, 3)
+        self.assertEqual(sorted(self.buffers.moves[3][:count]),
+                         sorted(get_valid_moves_with_heuristics(self.board)))
+
+    def test_fill_on_empty_board(self):
+        """An empty board falls back to the center."""
+        count = fill_valid_moves(Board(size=15), self.buffers, 1)
+        self.assertEqual(self.buffers.moves[1][:count], [(7, 7)])
+
+    def test_fill_does_not_leak_marks(self):
+        """Filling twice gives the same moves (the marks are cleared)."""
+        first = self.buffers.moves[2][:fill_valid_moves(self.board, self.buffers, 2)]
+        second = self.buffers.moves[2][:fill_valid_moves(self.board, self.buffers, 2)]
+        self.assertEqual(first, second)
+
+    def test_order_moves_into_matches_order_moves(self):
+        """Ordering in place gives the same order as order_moves."""
+        moves = get_valid_moves_with_heuristics(self.board)
+        count = copy_moves(moves, self.buffers, 4)
+        for player in (1, -1):
+            buffered = self.buffers.moves[4]
+            order_moves_into(self.board, buffered, self.buffers.scores[4], count, player, self.buffers.line)
+            self.assertEqual(buffered[:count], order_moves(self.board, moves, player))
+
+    def test_staged_moves_match_order_moves(self):
+        """Without wins, hash move or killers the stages give the order of order_moves."""
+        moves = get_valid_moves_with_heuristics(self.board)
+        for player in (1, -1):
+            count = copy_moves(moves, self.buffers, 4)
+            staged = list(staged_moves(self.board, self.buffers.moves[4], count, player, self.buffers.scores[4],
+                                       self.buffers.line))
+            self.assertEqual(staged, order_moves(self.board, moves, player))
+
+    def test_staged_moves_stages(self):
+        """Wins, blocks, the hash move and killers come first, each move once."""
+        board = Board(size=15)
+        for row, col, player in [(7, 3, 1), (0, 0, -1), (7, 4, 1), (0, 2, -1), (7, 5, 1), (0, 4, -1),
+                                 (7, 6, 1), (0, 6, -1), (3, 10, 1), (0, 8, -1)]:
+            board.place_piece(row, col, player)
+        moves = get_valid_moves_with_heuristics(board)
+        count = copy_moves(moves, self.buffers, 4)
+        scores = self.buffers.scores[4]
+        scores[:count] = [None] * count
+        staged = staged_moves(board, self.buffers.moves[4], count, -1, scores, self.buffers.line,
+                              hash_move=(5, 10), killers=[(1, 1), (14, 14)])
+        first = [next(staged) for _ in range(4)]
+        self.assertEqual(sorted(first[:2]), [(7, 2), (7, 7)])  # Both blocks of the open four
+        self.assertEqual(first[2:], [(5, 10), (1, 1)])
+        self.assertEqual(scores[:count], [None] * count)  # Nothing scored yet
+        rest = list(staged)
+        self.assertEqual(sorted(first + rest), sorted(moves))
+        self.assertNotIn((14, 14), rest)
+
+    def test_beam_keeps_best_moves_within_margin(self):
+        """The beam is a prefix of order_moves: within the margin, at most `width` moves."""
+        moves = get_valid_moves_with_heuristics(self.board)
+        ordered = order_moves(self.board, moves, 1)
+        count = copy_moves(moves, self.buffers, 4)
+        kept = beam_moves(self.board, self.buffers.moves[4], self.buffers.scores[4], count, 1, self.buffers.line,
+                          width=5, margin=10 ** 6)
+        self.assertEqual(self.buffers.moves[4][:kept], ordered[:5])
+
+        count = copy_moves(moves, self.buffers, 4)
+        kept = beam_moves(self.board, self.buffers.moves[4], self.buffers.scores[4], count, 1, self.buffers.line,
+                          width=len(moves), margin=0)
+        scores = self.buffers.scores[4]
+        self.assertGreaterEqual(kept, 1)
+        self.assertTrue(all(score == scores[0] for score in scores[:kept]))
+        self.assertEqual(self.buffers.moves[4][:kept], ordered[:kept])
+
+    def test_beam_always_keeps_forced_blocks(self):
+        """Blocks of a five are kept even when the width leaves no room for them."""
+        board = Board(size=15)
+        for row, col, player in [(7, 3, 1), (0, 0, -1), (7, 4, 1), (0, 2, -1), (7, 5, 1), (0, 4, -1),
+                                 (7, 6, 1), (3, 10, -1)]:
+            board.place_piece(row, col, player)
+        moves = get_valid_moves_with_heuristics(board)
+        count = copy_moves(moves, self.buffers, 4)
+        kept = beam_moves(board, self.buffers.moves[4], self.buffers.scores[4], count, -1, self.buffers.line,
+                          width=0, margin=0)
+        self.assertEqual(sorted(self.buffers.moves[4][:kept]), [(7, 2), (7, 7)])
+
+    def test_minimax_searches_wins_and_blocks_past_the_cap(self):
+        """A win or block outside the max_moves moves nearest the last move is still searched, and played."""
+        board = Board(size=15)
+        for row, col, player in [(7, 3, 1), (0, 0, -1), (7, 4, 1), (0, 2, -1), (7, 5, 1), (0, 4, -1),
+                                 (7, 6, 1), (3, 10, -1)]:
+            board.place_piece(row, col, player)
+        _, move = minimax(board, 2, float('-inf'), float('inf'), True, evaluate_board, 1, max_moves=2)
+        self.assertIn(move, [(7, 2), (7, 7)])
+
+        board = Board(size=15)
+        for row, col, player in [(7, 3, 1), (0, 0, -1), (7, 4, 1), (7, 2, -1), (7, 5, 1), (0, 4, -1),
+                                 (7, 6, 1), (0, 6, -1), (12, 12, 1)]:
+            board.place_piece(row, col, player)
+        # O is on move and blocks the four at its open end
+        _, move = minimax(board, 2, float('-inf'), float('inf'), True, evaluate_board, -1, max_moves=2)
+        self.assertEqual(move, (7, 7))
+
+    def test_promoted_moves_keep_the_nearest(self):
+        """A promoted block or killer only pushes the farthest moves past the max_moves cut."""
+        board = Board(size=15)
+        for row, col, player in [(2, 2, 1), (2, 1, -1), (2, 3, 1), (0, 8, -1), (2, 4, 1), (9, 0, -1),
+                                 (2, 5, 1), (0, 0, -1), (12, 12, 1)]:
+            board.place_piece(row, col, player)
+        count = fill_valid_moves(board, self.buffers, 4)
+        moves = self.buffers.moves[4]
+        sort_by_distance(moves, self.buffers.scores[4], count, 12, 12)
+        nearest = moves[:10]
+        staged = staged_moves(board, moves, count, -1, killers=[(9, 2)])
+        self.assertEqual([next(staged) for _ in range(10)], [(2, 6), (9, 2)] + nearest[:8])
+
+    def test_ensure_grows_plies(self):
+        """Deeper searches get extra ply buffers."""
+        self.buffers.ensure(40)
+        self.assertGreaterEqual(len(self.buffers.moves), 41)
+        self.assertEqual(len(self.buffers.moves[40]), 15 * 15)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+"""
+Tests for the SearchEngine that keeps its tables between moves.
+"""
+
+import time
+import unittest
+from game.board import Board
+from game.player import AIPlayer
+from ai.alphabeta import alpha_beta
+from ai.minmax import minimax
+from ai.evaluation import evaluate_board
+from ai.search_config import EXACT, SearchConfig, SearchStats
+from ai.search_engine import SearchEngine, SearchTables
+
+
+class TestSearchEngine(unittest.TestCase):
+    """Test suite for SearchEngine and SearchTables."""
+
+    def setUp(self):
+        self.board = Board(size=9)
+        for row, col, player in [(4, 4, 1), (4, 5, -1), (5, 5, 1), (3, 3, -1)]:
+            self.board.place_piece(row, col, player)
+        self.engine = SearchEngine(depth=2)
+
+    def test_same_score_as_plain_search(self):
+        """The tables do not change the value of the position."""
+        plain, _ = alpha_beta(self.board, 2, float('-inf'), float('inf'), True, evaluate_board, 1)
+        self.engine.get_move(self.board, 1)
+        entry = self.engine.tables.probe(self.board.hash)
+        self.assertEqual(entry[1], plain)
+
+    def test_tables_kept_between_moves(self):
+        """A second search starts from the entries of the first one."""
+        self.engine.get_move(self.board, 1)
+        entries = len(self.engine.tables.entries)
+        self.assertGreater(entries, 0)
+        self.engine.get_move(self.board, 1)
+        self.assertEqual(self.engine.tables.age, 2)
+        self.assertGreaterEqual(len(self.engine.tables.entries), entries)
+
+    def test_repeated_search_uses_table(self):
+        """Searching the same position again needs far fewer nodes."""
+        stats = SearchStats()
+        engine = SearchEngine(depth=2, config=SearchConfig(stats=stats))
+        engine.get_move(self.board, 1)
+        first = stats.nodes
+        stats.reset()
+        engine.get_move(self.board, 1)
+        self.assertLess(stats.nodes, first)
+        self.assertGreater(stats.table_hits, 0)
+
+    def test_principal_variation_followed(self):
+        """The expected reply is consumed and the planned move is seeded."""
+        move = self.engine.get_move(self.board, 1)
+        pv = list(self.engine.pv)
+        self.assertEqual(pv[0], move)
+        self.assertGreaterEqual(len(pv), 2)
+
+        self.board.place_piece(move[0], move[1], 1)
+        self.engine.notify_move(move[0], move[1], 1)
+        self.board.place_piece(pv[1][0], pv[1][1], -1)
+        self.engine.notify_move(pv[1][0], pv[1][1], -1)
+        self.assertEqual(self.engine.pv, pv[2:])
+
+    def test_unexpected_reply_drops_line(self):
+        move = self.engine.get_move(self.board, 1)
+        self.engine.notify_move(move[0], move[1], 1)
+        self.engine.notify_move(0, 0, -1)
+        self.assertEqual(self.engine.pv, [])
+
+    def test_new_game_clears_tables(self):
+        self.engine.get_move(self.board, 1)
+        self.engine.new_game()
+        self.assertEqual(self.engine.tables.entries, {})
+        self.assertEqual(self.engine.pv, [])
+
+    def test_table_size_bounded(self):
+        """Storing more keys than the capacity in one search keeps the newest, deepest entries."""
+        tables = SearchTables(max_entries=100)
+        tables.new_search()
+        for key in range(250):
+            tables.store(key, key % 3, 0, EXACT, None)
+        self.assertLessEqual(len(tables.entries), 100)
+        self.assertIn(249, tables.entries)
+        self.assertGreater(sum(entry[0] == 2 for entry in tables.entries.values()),
+                           sum(entry[0] == 0 for entry in tables.entries.values()))
+        tables.new_search()
+        for key in range(1000, 1100):
+            tables.store(key, 0, 0, EXACT, None)
+        # The previous search's entries go first, even the deep ones
+        self.assertEqual(set(tables.entries), set(range(1000, 1100)))
+
+    def test_history_aged(self):
+        """History counters are halved at each search, not cleared."""
+        tables = SearchTables()
+        tables.record_cutoff(1, (4, 4), 2)
+        tables.record_cutoff(1, (4, 4), 2)
+        tables.new_search()
+        self.assertEqual(tables.history[1][(4, 4)], 4)
+
+    def test_takes_win(self):
+        """The engine completes five in a row."""
+        board = Board(size=9)
+        for col in range(4):
+            board.place_piece(4, col, -1)
+            board.place_piece(0, col * 2, 1)
+        self.assertEqual(self.engine.get_move(board, -1), (4, 4))
+
+    def test_time_limit_keeps_last_completed_depth(self):
+        """A search cut by its time limit plays the move of the last full iteration."""
+        for algorithm in (alpha_beta, minimax):
+            board = Board(size=15)
+            for row, col, player in [(7, 7, 1), (7, 8, -1), (8, 8, 1), (6, 6, -1), (8, 7, 1)]:
+                board.place_piece(row, col, player)
+            history = list(board.move_history)
+            engine = SearchEngine(depth=8, time_limit=0.3, algorithm=algorithm)
+            start = time.time()
+            move = engine.get_move(board, -1)
+            self.assertLess(time.time() - start, 3.0)
+            self.assertLess(engine.completed_depth, 8)
+            self.assertEqual(board.move_history, history)
+            self.assertEqual(board.get_cell(*move), 0)
+
+    def test_stop_before_first_iteration(self):
+        """A stopped search still answers with a win or a block."""
+        board = Board(size=9)
+        for col in range(4):
+            board.place_piece(4, col, 1)
+            board.place_piece(0, col * 2, -1)
+        engine = SearchEngine(depth=2)
+        engine.config.deadline = 0.0  # What stop() does to a running search
+        self.assertEqual(engine._fallback_move(board, -1), (4, 4))
+        engine.time_limit = 0.0
+        self.assertEqual(engine.get_move(board, -1), (4, 4))
+        self.assertEqual(engine.completed_depth, 0)
+
+    def test_player_owns_engine(self):
+        """AIPlayer wraps alpha_beta in a SearchEngine and forwards the hooks."""
+        player = AIPlayer(1, algorithm=alpha_beta, depth=2)
+        self.assertIsInstance(player.algorithm, SearchEngine)
+        move = player.get_move(self.board)
+        self.assertEqual(self.board.get_cell(*move), 0)
+        player.notify_move(move[0], move[1], 1)
+        player.new_game()
+        self.assertEqual(player.algorithm.tables.entries, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Tests for search tracing and the trace report.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from ai.alphabeta import alpha_beta
+from ai.evaluation import evaluate_board
+from ai.minmax import minimax
+from ai.search_config import SearchConfig, SearchStats
+from ai.search_trace import ALL_MOVES, BETA_CUTOFF, HORIZON, SearchTracer, read_trace, trace_report
+from benchmarks.positions import POSITIONS, build_board, side_to_move
+
+
+class TestSearchTrace(unittest.TestCase):
+    """Test suite for ai/search_trace.py"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'search.trace')
+        _, size, moves = next(entry for entry in POSITIONS if entry[0] == 'small_board')
+        self.board = build_board(size, moves)
+        self.player = side_to_move(self.board)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def traced(self, search, depth=2):
+        stats = SearchStats()
+        with SearchTracer(self.path) as tracer:
+            result = search(self.board, depth, float('-inf'), float('inf'), True, evaluate_board, self.player,
+                            config=SearchConfig(stats=stats, tracer=tracer))
+        return result, stats
+
+    def test_tracing_does_not_change_the_search(self):
+        for search in (alpha_beta, minimax):
+            plain = search(self.board, 2, float('-inf'), float('inf'), True, evaluate_board, self.player,
+                           config=SearchConfig())
+            (score, move), stats = self.traced(search)
+            self.assertEqual((score, move), plain)
+            self.assertEqual(sum(1 for _ in read_trace(self.path)), stats.nodes)
+
+    def test_records_form_the_tree(self):
+        (score, _), stats = self.traced(alpha_beta)
+        records = list(read_trace(self.path))
+        root = records[-1]
+        self.assertEqual((root.parent, root.ply, root.depth, root.index), (0, 0, 2, -1))
+        self.assertEqual(root.score, score)
+
+        seen = set()
+        children = {}
+        for record in records:
+            # Children are written before their parent, in the order they were searched
+            self.assertNotIn(record.parent, seen)
+            seen.add(record.node)
+            if record.parent:
+                siblings = children.setdefault(record.parent, [])
+                self.assertEqual(record.index, len(siblings))
+                siblings.append(record)
+        for record in records:
+            self.assertEqual(record.children, len(children.get(record.node, [])))
+            if record.reason == HORIZON:
+                self.assertEqual(record.depth, 0)
+            if record.reason == BETA_CUTOFF:
+                self.assertGreaterEqual(record.score, record.beta)
+            if record.node in children:
+                self.assertIn(children[record.node][-1].move, self.board.get_valid_moves())
+        self.assertEqual(sum(record.reason not in (HORIZON, ALL_MOVES) and record.children > 0
+                             for record in records), stats.cutoffs)
+
+    def test_re_search_is_the_same_child(self):
+        """A reduced move searched again at full depth keeps its index and counts once."""
+        stats = SearchStats()
+        with SearchTracer(self.path) as tracer:
+            alpha_beta(self.board, 3, float('-inf'), float('inf'), True, evaluate_board, self.player,
+                       config=SearchConfig(lmr=True, lmr_min_moves=1, lmr_min_depth=2, stats=stats, tracer=tracer))
+        self.assertGreater(stats.lmr_researches, 0)
+
+        records = list(read_trace(self.path))
+        children = {}
+        for record in records:
+            if record.parent:
+                children.setdefault(record.parent, []).append(record)
+        researched = 0
+        for record in records:
+            siblings = children.get(record.node, [])
+            self.assertEqual(record.children, len({sibling.index for sibling in siblings}))
+            for previous, sibling in zip(siblings, siblings[1:]):
+                if sibling.index == previous.index:
+                    researched += 1
+                    self.assertEqual(sibling.move, previous.move)
+                    self.assertGreater(sibling.depth, previous.depth)
+                else:
+                    self.assertEqual(sibling.index, previous.index + 1)
+        self.assertEqual(researched, stats.lmr_researches)
+
+    def test_report(self):
+        _, stats = self.traced(alpha_beta)
+        report = trace_report(self.path, top=3)
+        self.assertEqual(report['searches'][0]['nodes'], stats.nodes)
+        self.assertEqual(sum(counts['nodes'] for counts in report['plies'].values()), stats.nodes)
+        self.assertEqual(sum(counts['cutoffs'] for counts in report['depths'].values()), stats.cutoffs)
+        for counts in report['depths'].values():
+            self.assertLessEqual(counts['first_move_cutoffs'], counts['cutoffs'])
+        subtrees = report['subtrees']
+        self.assertEqual(len(subtrees), 3)
+        self.assertEqual([entry['nodes'] for entry in subtrees], sorted((entry['nodes'] for entry in subtrees),
+                                                                       reverse=True))
+        self.assertEqual(len(subtrees[0]['path']), 1)
+
+    def test_rejects_other_files(self):
+        with open(self.path, 'wb') as handle:
+            handle.write(b'not a trace')
+        with self.assertRaises(ValueError):
+            list(read_trace(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
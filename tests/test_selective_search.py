@@ -0,0 +1,65 @@
+"""
+Tests for the selective search options of alpha_beta.
+"""
+
+import unittest
+from ai.alphabeta import alpha_beta
+from ai.evaluation import evaluate_board
+from ai.search_config import SearchConfig, SearchStats
+from benchmarks.positions import build_board
+
+SMALL = [(4, 4), (4, 5), (5, 5), (3, 3), (5, 4), (3, 4)]
+
+
+def search(moves, depth, **options):
+    board = build_board(9, moves)
+    stats = SearchStats()
+    score, move = alpha_beta(board, depth, float('-inf'), float('inf'), True, evaluate_board, 1,
+                             SearchConfig(stats=stats, **options))
+    return score, move, stats
+
+
+class TestSelectiveSearch(unittest.TestCase):
+    """Test suite for LMR, futility pruning and razoring."""
+
+    def test_defaults_match_plain_search(self):
+        """A config with every option off should search exactly like no config."""
+        board = build_board(9, SMALL)
+        plain = alpha_beta(board, 2, float('-inf'), float('inf'), True, evaluate_board, 1)
+        score, move, stats = search(SMALL, 2)
+        self.assertEqual((score, move), plain)
+        self.assertGreater(stats.nodes, 0)
+
+    def test_lmr_reduces_nodes(self):
+        """Late move reductions should visit fewer nodes."""
+        _, _, plain = search(SMALL, 2)
+        _, _, reduced = search(SMALL, 2, lmr=True, lmr_min_depth=2)
+        self.assertGreater(reduced.lmr_reductions, 0)
+        self.assertLess(reduced.nodes, plain.nodes)
+
+    def test_lmr_keeps_the_win(self):
+        """Tactical moves are never reduced, so a win in one is still found."""
+        moves = [(4, 1), (0, 0), (4, 2), (0, 8), (4, 3), (8, 0), (4, 4), (8, 8)]
+        score, move, _ = search(moves, 2, lmr=True, lmr_min_depth=1, lmr_min_moves=0)
+        self.assertEqual(score, 100000)
+        self.assertIn(move, [(4, 0), (4, 5)])
+
+    def test_futility_prunes_hopeless_moves(self):
+        """With a window far above the static score, quiet frontier moves are skipped."""
+        board = build_board(9, SMALL)
+        stats = SearchStats()
+        alpha_beta(board, 1, 50000, float('inf'), True, evaluate_board, 1,
+                   SearchConfig(futility=True, stats=stats))
+        self.assertGreater(stats.futility_prunes, 0)
+
+    def test_razoring_reduces_depth(self):
+        """Pre-frontier nodes far below alpha are searched one ply shallower."""
+        board = build_board(9, SMALL)
+        stats = SearchStats()
+        alpha_beta(board, 2, 50000, float('inf'), True, evaluate_board, 1,
+                   SearchConfig(razoring=True, stats=stats))
+        self.assertEqual(stats.razor_reductions, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
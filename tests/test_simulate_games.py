@@ -0,0 +1,86 @@
+"""
+Tests for the batched self-play simulator.
+"""
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from analyse_games import load_records
+from benchmarks.differential import dense, random_case
+from game.board import Board
+from game.game_rules import check_win
+
+try:
+    import numpy
+    import simulate_games
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "simulate_games.py needs NumPy")
+class TestSimulateGames(unittest.TestCase):
+    """Test suite for simulate_games.py"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_has_five_matches_check_win(self):
+        rng = random.Random(3)
+        cases = [random_case(rng, sizes=(9,), max_stones=40) for _ in range(60)]
+        boards = numpy.array([dense(case).board for case in cases], dtype=numpy.int8)
+        for player in (1, -1):
+            found = simulate_games.has_five(boards, player)
+            for case, five in zip(cases, found):
+                board = dense(case)
+                expected = any(check_win(board, row, col) for row, col, side in case[1] if side == player)
+                self.assertEqual(bool(five), expected)
+
+    def test_moves_are_legal_and_next_to_stones(self):
+        boards = numpy.zeros((2, 9, 9), dtype=numpy.int8)
+        boards[1, 0, 0] = 1
+        legal = simulate_games.legal_moves(boards)
+        self.assertEqual(int(legal[0].sum()), 25)
+        self.assertEqual(sorted(zip(*numpy.nonzero(legal[1]))), [(0, 1), (1, 0), (1, 1)])
+
+    def test_lookahead_wins_and_blocks(self):
+        boards = numpy.zeros((2, 9, 9), dtype=numpy.int8)
+        boards[0, 4, 1:5] = 1    # X to move completes the five
+        boards[0, 0, 1:5] = -1
+        boards[1, 4, 1:5] = -1   # X must block O's four
+        boards[1, 8, 0] = 1
+        rng = numpy.random.default_rng(0)
+        cells = simulate_games.choose_moves(boards, 1, 'lookahead', rng)
+        self.assertIn(divmod(int(cells[0]), 9), [(4, 0), (4, 5)])
+        self.assertIn(divmod(int(cells[1]), 9), [(4, 0), (4, 5)])
+
+    def test_simulated_games_replay(self):
+        rng = numpy.random.default_rng(1)
+        for policies in (('random', 'random'), ('greedy', 'lookahead')):
+            moves, lengths, winners = simulate_games.simulate_batch(32, 9, policies, rng=rng)
+            for record, winner in zip(simulate_games.records(moves, lengths, winners, 9), winners):
+                board, player, result = Board(9), 1, 0
+                for row, col in record['moves']:
+                    self.assertTrue(board.place_piece(row, col, player))
+                    if check_win(board, row, col):
+                        result = player
+                        break
+                    player = -player
+                self.assertEqual(len(board.move_history), len(record['moves']))
+                self.assertEqual(result, winner)
+
+    def test_records_load_like_game_files(self):
+        output = os.path.join(self.directory, 'games.jsonl')
+        totals = simulate_games.simulate(10, output, batch=4, size=9, seed=2)
+        self.assertEqual(totals['x_wins'] + totals['o_wins'] + totals['draws'], 10)
+        records = load_records(self.directory)
+        self.assertEqual([game_id for game_id, _, _ in records], [f"sim-2-{index}" for index in range(10)])
+        self.assertTrue(all(size == 9 and moves for _, size, moves in records))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Tests for the SparseBoard backend.
+"""
+
+import random
+import unittest
+from game.board import Board
+from game.sparse_board import SparseBoard, create_board
+from game.game_rules import check_win, get_valid_moves_with_heuristics
+from ai.alphabeta import alpha_beta
+from ai.evaluation import evaluate_board
+from ai.move_ordering import order_moves
+
+
+def random_pair(size, stones, seed):
+    """The same random position on a dense and a sparse board"""
+    rng = random.Random(seed)
+    dense, sparse = Board(size), SparseBoard(size)
+    while len(dense.move_history) < stones:
+        row, col, player = rng.randrange(size), rng.randrange(size), rng.choice([1, -1])
+        if dense.place_piece(row, col, player):
+            sparse.place_piece(row, col, player)
+    return dense, sparse
+
+
+class TestSparseBoard(unittest.TestCase):
+    """Test suite for the SparseBoard class."""
+
+    def setUp(self):
+        self.board = SparseBoard(size=15)
+
+    def test_place_and_undo(self):
+        self.assertTrue(self.board.place_piece(3, 4, 1))
+        self.assertFalse(self.board.place_piece(3, 4, -1))
+        self.assertFalse(self.board.place_piece(15, 0, 1))
+        self.assertEqual(self.board.get_cell(3, 4), 1)
+        self.assertIsNone(self.board.get_cell(-1, 0))
+        self.assertEqual(self.board.last_move, (3, 4, 1))
+
+        self.assertTrue(self.board.undo_last_move())
+        self.assertEqual(self.board.get_cell(3, 4), 0)
+        self.assertEqual(self.board.hash, 0)
+        self.assertEqual(self.board.stones, {})
+        self.assertFalse(self.board.undo_last_move())
+
+    def test_line_tracking(self):
+        """Occupied rows and columns give the bounding box."""
+        self.board.place_piece(2, 9, 1)
+        self.board.place_piece(6, 4, -1)
+        self.board.place_piece(6, 5, 1)
+        self.assertEqual(self.board.bounds(), (2, 6, 4, 9))
+        self.assertEqual(self.board.rows, {2: 1, 6: 2})
+        self.assertEqual(self.board.cols, {9: 1, 4: 1, 5: 1})
+        self.board.undo_last_move()
+        self.assertEqual(self.board.rows, {2: 1, 6: 1})
+        self.assertNotIn(5, self.board.cols)
+
+    def test_is_full(self):
+        board = SparseBoard(size=9)
+        for row in range(9):
+            for col in range(9):
+                self.assertFalse(board.is_full())
+                board.place_piece(row, col, 1)
+        self.assertTrue(board.is_full())
+
+    def test_matches_dense_board(self):
+        """Hash, moves, evaluation and ordering agree with the dense Board."""
+        for seed in range(20):
+            dense, sparse = random_pair(15, 12, seed)
+            self.assertEqual(dense.hash, sparse.hash)
+            self.assertEqual(sorted(dense.occupied_cells()), sorted(sparse.occupied_cells()))
+            moves = sorted(get_valid_moves_with_heuristics(dense))
+            self.assertEqual(moves, sorted(get_valid_moves_with_heuristics(sparse)))
+            for player in (1, -1):
+                self.assertEqual(evaluate_board(dense, player), evaluate_board(sparse, player))
+                self.assertEqual(order_moves(dense, moves, player), order_moves(sparse, moves, player))
+
+    def test_same_search_result(self):
+        dense, sparse = random_pair(9, 8, 7)
+        self.assertEqual(alpha_beta(dense, 2, float('-inf'), float('inf'), True, evaluate_board, 1),
+                         alpha_beta(sparse, 2, float('-inf'), float('inf'), True, evaluate_board, 1))
+
+    def test_large_board_search(self):
+        """A 100x100 board is searched around the stones."""
+        board = SparseBoard(size=100)
+        for col in range(4):
+            board.place_piece(60, 70 + col, 1)
+            board.place_piece(10, 10 + 2 * col, -1)
+        _, move = alpha_beta(board, 1, float('-inf'), float('inf'), True, evaluate_board, 1)
+        self.assertIn(move, [(60, 69), (60, 74)])
+
+    def test_infinite_board(self):
+        """Negative coordinates are on an infinite board and wins are found there."""
+        board = SparseBoard(infinite=True)
+        for col in range(-3, 2):
+            self.assertTrue(board.place_piece(-50, col, 1))
+        self.assertTrue(check_win(board, -50, 1))
+        self.assertFalse(board.is_full())
+        self.assertEqual(board.get_cell(1000, -1000), 0)
+        self.assertIn((-51, -4), get_valid_moves_with_heuristics(board))
+
+    def test_create_board(self):
+        self.assertIsInstance(create_board(15), Board)
+        self.assertIsInstance(create_board(40), SparseBoard)
+        self.assertTrue(create_board(None).infinite)
+
+
+if __name__ == '__main__':
+    unittest.main()
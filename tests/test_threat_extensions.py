@@ -0,0 +1,117 @@
+"""
+Tests for threat extensions and forced-move generation.
+"""
+
+import unittest
+from game.board import Board
+from ai.alphabeta import alpha_beta
+from ai.minmax import minimax
+from ai.evaluation import evaluate_board
+from ai.search_config import SearchConfig, SearchStats
+from ai.threats import candidate_moves
+from game.game_rules import get_valid_moves_with_heuristics
+
+DEFENCES = [(7, 3), (7, 4), (7, 8), (7, 9)]
+
+
+class TestThreatExtensions(unittest.TestCase):
+    """Test suite for horizon extensions in alpha_beta and minimax."""
+
+    def setUp(self):
+        """Opponent (-1) has an open three and player 1 is to move."""
+        self.board = Board(size=15)
+        for own, other in zip([(3, 3), (11, 11), (3, 11)], [(7, 5), (7, 6), (7, 7)]):
+            self.board.place_piece(own[0], own[1], 1)
+            self.board.place_piece(other[0], other[1], -1)
+
+    def search(self, algorithm, extensions):
+        stats = SearchStats()
+        config = SearchConfig(extensions=extensions, stats=stats)
+        score, move = algorithm(self.board, 1, float('-inf'), float('inf'), True, evaluate_board, 1,
+                                config=config)
+        return score, move, stats
+
+    def test_alpha_beta_defends_open_three(self):
+        """Depth 1 with extensions should see the open four coming."""
+        _, plain_move, _ = self.search(alpha_beta, False)
+        _, move, stats = self.search(alpha_beta, True)
+        self.assertNotIn(plain_move, DEFENCES)
+        self.assertIn(move, DEFENCES)
+        self.assertGreater(stats.extensions, 0)
+
+    def test_minimax_defends_open_three(self):
+        """minimax should use the same horizon handling."""
+        _, move, stats = self.search(minimax, True)
+        self.assertIn(move, DEFENCES)
+        self.assertGreater(stats.extensions, 0)
+
+    def test_extension_cap(self):
+        """With no extension budget the search stops at the horizon."""
+        stats = SearchStats()
+        config = SearchConfig(extensions=True, max_extension=0, stats=stats)
+        alpha_beta(self.board, 1, float('-inf'), float('inf'), True, evaluate_board, 1, config)
+        self.assertEqual(stats.extensions, 0)
+
+    def test_board_is_restored(self):
+        """Extensions must undo every move they try."""
+        history = list(self.board.move_history)
+        self.search(alpha_beta, True)
+        self.assertEqual(self.board.move_history, history)
+
+
+class TestForcedMoveGeneration(unittest.TestCase):
+    """Test suite for threat-aware candidate generation."""
+
+    def setUp(self):
+        self.board = Board(size=15)
+
+    def place(self, stones, player):
+        for row, col in stones:
+            self.board.place_piece(row, col, player)
+
+    def test_winning_move_only(self):
+        """A five in one is the only candidate."""
+        self.place([(7, 4), (7, 5), (7, 6), (7, 7)], 1)
+        self.place([(0, 0), (0, 4), (14, 14)], -1)
+        self.assertEqual(len(candidate_moves(self.board, 1)), 1)
+
+    def test_blocks_only(self):
+        """Against a four, only the block is generated."""
+        self.place([(7, 4), (7, 5), (7, 6), (7, 7)], -1)
+        self.place([(7, 3), (0, 0), (14, 14)], 1)
+        self.assertEqual(candidate_moves(self.board, 1), [(7, 8)])
+
+    def test_open_three_defences(self):
+        """Against an open three, defences and own fours are generated."""
+        self.place([(7, 5), (7, 6), (7, 7)], -1)
+        self.place([(3, 3), (3, 4), (3, 5)], 1)
+        moves = candidate_moves(self.board, 1)
+        for move in DEFENCES:
+            self.assertIn(move, moves)
+        self.assertIn((3, 6), moves)  # Own four
+        self.assertLess(len(moves), 15)
+
+    def test_quiet_position_falls_back(self):
+        """Without threats the full candidate list is returned."""
+        self.place([(7, 7)], 1)
+        self.place([(7, 8)], -1)
+        self.assertEqual(sorted(candidate_moves(self.board, 1)),
+                         sorted(get_valid_moves_with_heuristics(self.board)))
+
+    def test_search_uses_forced_moves(self):
+        """Both searches should branch only on the forced replies."""
+        self.place([(3, 3), (11, 11), (3, 11)], 1)
+        self.place([(7, 5), (7, 6), (7, 7)], -1)
+        for algorithm in (alpha_beta, minimax):
+            plain, forced = SearchStats(), SearchStats()
+            algorithm(self.board, 2, float('-inf'), float('inf'), True, evaluate_board, 1,
+                      config=SearchConfig(stats=plain))
+            _, move = algorithm(self.board, 2, float('-inf'), float('inf'), True, evaluate_board, 1,
+                                config=SearchConfig(forced_moves=True, stats=forced))
+            self.assertIn(move, DEFENCES)
+            self.assertGreater(forced.forced_nodes, 0)
+            self.assertLess(forced.nodes, plain.nodes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Tests for the weights config and the tuning features.
+"""
+
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from ai import evaluation
+from ai.evaluation import evaluate_board, segment_features
+from ai.move_ordering import move_features, score_move
+from ai.weights import DEFAULT_WEIGHTS, load_weights, set_weights
+from benchmarks.differential import dense, random_case
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestWeights(unittest.TestCase):
+    """Test suite for ai.weights and the features used by tune_weights.py."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'weights.json')
+        rng = random.Random(5)
+        self.boards = [dense(random_case(rng)) for _ in range(6)]
+
+    def tearDown(self):
+        set_weights(DEFAULT_WEIGHTS)
+        shutil.rmtree(self.directory)
+
+    def test_segment_features_are_linear(self):
+        weights = DEFAULT_WEIGHTS['segment_player'] + DEFAULT_WEIGHTS['segment_opponent']
+        for board in self.boards:
+            for player in (1, -1):
+                features = segment_features(board, player)
+                self.assertEqual(sum(f * w for f, w in zip(features, weights)), evaluate_board(board, player))
+
+    def test_move_features_are_linear(self):
+        for board in self.boards:
+            for row, col in board.get_restricted_valid_moves()[:8]:
+                for player in (1, -1):
+                    features, center = move_features(board, row, col, player)
+                    score = sum(f * w for f, w in zip(features, DEFAULT_WEIGHTS['pattern'])) + center
+                    self.assertAlmostEqual(score, score_move(board, row, col, player, 3 - player))
+
+    def test_load_and_set_weights(self):
+        with open(self.path, 'w') as handle:
+            json.dump({'segment_player': [2, 20, 200, 2000]}, handle)
+        weights = load_weights(self.path)
+        self.assertEqual(weights['segment_player'], [2.0, 20.0, 200.0, 2000.0])
+        self.assertEqual(weights['pattern'], DEFAULT_WEIGHTS['pattern'])
+
+        board = self.boards[0]
+        features = segment_features(board, 1)
+        set_weights(weights)
+        expected = sum(f * w for f, w in zip(features, weights['segment_player'] + weights['segment_opponent']))
+        self.assertEqual(evaluate_board(board, 1), expected)
+        # The pruning margins follow the weights
+        self.assertEqual((evaluation.FUTILITY_MARGIN, evaluation.RAZOR_MARGIN), (2000.0, 6000.0))
+
+    def test_bad_weights_file(self):
+        with open(self.path, 'w') as handle:
+            json.dump({'pattern': [1, 2, 3]}, handle)
+        with self.assertRaises(ValueError):
+            load_weights(self.path)
+
+    @unittest.skipIf(numpy is None, "tune_weights.py needs NumPy")
+    def test_fit_improves_the_fit(self):
+        from tune_weights import fit
+        rng = numpy.random.default_rng(0)
+        features = rng.integers(-5, 10, (400, 8)).astype(numpy.int16)
+        true_weights = numpy.array([2, 20, 150, 800, 0, 8, 60, 700], dtype=float)
+        results = (features @ true_weights * 0.004 > 0).astype(numpy.float32)
+        empty = numpy.zeros(0, dtype=numpy.int64)
+        data = {'eval_features': features, 'eval_results': results, 'order_features': numpy.zeros((0, 6)),
+                'order_centers': numpy.zeros(0), 'order_groups': empty, 'order_played': empty}
+        lines = []
+        weights = fit(data, epochs=100, report=lines.append)
+        self.assertEqual(len(weights['segment_player']), 4)
+        before, after = (float(value) for value in lines[0].rsplit('MSE ', 1)[1].split(' -> '))
+        self.assertLess(after, before)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,281 @@
+"""
+Texel-style tuning of the evaluation and move-ordering weights.
+
+Usage:
+    python tune_weights.py extract GAMES_DIR [GAMES_DIR ...] [--output features.npz] [--skip 4]
+    python tune_weights.py fit features.npz [--output weights.json] [--epochs 500] [--validation 0.1]
+
+`extract` replays recorded games (*.json or *.jsonl, the format of
+analyse_games.py, as simulate_games.py writes them) once and stores, for every position, as compact NumPy arrays:
+
+- the segment counts behind evaluate_board for the side to move, with
+  the final result from that side's point of view (1 win, 0.5 draw,
+  0 loss);
+- the pattern counts behind score_move for every candidate move, with
+  the index of the move that was played.
+
+`fit` needs no board code: evaluate_board and score_move are linear in
+their weights, so every prediction is a matrix product.
+
+- The evaluation weights minimise the mean squared error between
+  sigmoid(K * score) and the results (Texel tuning). K is fitted first
+  on the current weights, then held fixed.
+- The pattern weights maximise the likelihood of the played moves under
+  a softmax of the ordering scores, with the temperature fitted the same
+  way.
+
+Both use full-batch Adam steps. The tuned weights are written as JSON.
+Point GOMOKU_WEIGHTS at the file to have evaluate_board and order_moves
+load it at startup.
+
+Requires NumPy.
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from ai.evaluation import segment_features
+from ai.move_ordering import move_features
+from ai.weights import DEFAULT_WEIGHTS, load_weights, save_weights
+from analyse_games import load_records
+from game.game_rules import check_win, get_valid_moves_with_heuristics
+from game.sparse_board import create_board
+
+
+def game_result(size, moves):
+    """Winner of a recorded game: 1, -1, or 0 for a draw or unfinished game"""
+    board = create_board(size)
+    player = 1
+    for row, col in moves:
+        board.place_piece(row, col, player)
+        if check_win(board, row, col):
+            return player
+        player = -player
+    return 0
+
+
+def extract(directories, skip=4):
+    """
+    Features of every position of the recorded games.
+
+    Args:
+        directories (list): Directories of game records
+        skip (int): Opening plies left out (their results say little)
+
+    Returns:
+        dict: Arrays, as saved by `extract`
+    """
+    eval_rows, results = [], []
+    order_rows, centers, groups, played = [], [], [], []
+    for directory in directories:
+        for _, size, moves in load_records(directory):
+            winner = game_result(size, moves)
+            board = create_board(size)
+            player = 1
+            for ply, (row, col) in enumerate(moves):
+                if ply >= skip:
+                    eval_rows.append(segment_features(board, player))
+                    results.append(0.5 if winner == 0 else float(winner == player))
+
+                    candidates = get_valid_moves_with_heuristics(board)
+                    if (row, col) in candidates and len(candidates) > 1:
+                        groups.append(len(order_rows))
+                        played.append(len(order_rows) + candidates.index((row, col)))
+                        for move in candidates:
+                            features, center = move_features(board, move[0], move[1], player)
+                            order_rows.append(features)
+                            centers.append(center)
+
+                if not board.place_piece(row, col, player) or check_win(board, row, col):
+                    break
+                player = -player
+
+    return {
+        'eval_features': np.array(eval_rows, dtype=np.int16).reshape(-1, 8),
+        'eval_results': np.array(results, dtype=np.float32),
+        'order_features': np.array(order_rows, dtype=np.float32).reshape(-1, 6),
+        'order_centers': np.array(centers, dtype=np.float32),
+        'order_groups': np.array(groups, dtype=np.int64),
+        'order_played': np.array(played, dtype=np.int64),
+    }
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-np.clip(x, -50, 50)))
+
+
+def _fit_scale(loss, low=1e-6, high=1.0, steps=60):
+    """Scale minimising a unimodal loss, by golden-section search in log space"""
+    ratio = (np.sqrt(5) - 1) / 2
+    a, b = np.log(low), np.log(high)
+    for _ in range(steps):
+        c = b - ratio * (b - a)
+        d = a + ratio * (b - a)
+        if loss(np.exp(c)) < loss(np.exp(d)):
+            b = d
+        else:
+            a = c
+    return float(np.exp((a + b) / 2))
+
+
+def _adam(gradient, weights, scale, epochs, rate):
+    """
+    Full-batch Adam on weights / scale, so every weight moves by about
+    `rate` of its own magnitude per step.
+    """
+    params = weights / scale
+    moment = np.zeros_like(params)
+    velocity = np.zeros_like(params)
+    for step in range(1, epochs + 1):
+        grad = gradient(params * scale) * scale
+        moment = 0.9 * moment + 0.1 * grad
+        velocity = 0.999 * velocity + 0.001 * grad * grad
+        params -= rate * (moment / (1 - 0.9 ** step)) / (np.sqrt(velocity / (1 - 0.999 ** step)) + 1e-12)
+    return params * scale
+
+
+def texel_loss(features, results, weights, k):
+    return float(np.mean((_sigmoid(k * (features @ weights)) - results) ** 2))
+
+
+def fit_evaluation(features, results, weights, epochs=500, rate=0.01):
+    """
+    Texel tuning of the segment weights.
+
+    Returns:
+        tuple: (tuned weights, K)
+    """
+    features = features.astype(np.float64)
+    k = _fit_scale(lambda value: texel_loss(features, results, weights, value))
+
+    def gradient(current):
+        predicted = _sigmoid(k * (features @ current))
+        return features.T @ (2 * (predicted - results) * predicted * (1 - predicted) * k) / len(results)
+
+    scale = np.maximum(np.abs(weights), 1.0)
+    return _adam(gradient, weights, scale, epochs, rate), k
+
+
+def _softmax_by_group(logits, groups):
+    """Softmax of the logits within each group (groups are start offsets)"""
+    counts = np.diff(np.append(groups, len(logits)))
+    exp = np.exp(logits - np.repeat(np.maximum.reduceat(logits, groups), counts))
+    return exp / np.repeat(np.add.reduceat(exp, groups), counts)
+
+
+def ordering_loss(features, centers, groups, played, weights, temperature):
+    # Candidate arrays stay float32: there are tens of rows per position
+    probabilities = _softmax_by_group(temperature * (features @ weights.astype(np.float32) + centers), groups)
+    return float(-np.mean(np.log(probabilities[played] + 1e-12)))
+
+
+def fit_ordering(features, centers, groups, played, weights, epochs=500, rate=0.01):
+    """
+    Tune the pattern weights so the played moves are ranked first.
+
+    Returns:
+        tuple: (tuned weights, softmax temperature)
+    """
+    temperature = _fit_scale(lambda value: ordering_loss(features, centers, groups, played, weights, value),
+                             high=10.0)
+    target = np.zeros(len(features), dtype=np.float32)
+    target[played] = 1.0
+
+    def gradient(current):
+        probabilities = _softmax_by_group(temperature * (features @ current.astype(np.float32) + centers), groups)
+        return temperature * (features.T @ (probabilities - target)).astype(np.float64) / len(groups)
+
+    scale = np.maximum(np.abs(weights), 1.0)
+    return _adam(gradient, weights, scale, epochs, rate), temperature
+
+
+def _split(count, validation, rng):
+    order = rng.permutation(count)
+    cut = int(count * (1 - validation))
+    return np.sort(order[:cut]), np.sort(order[cut:])
+
+
+def fit(data, start=None, epochs=500, rate=0.01, validation=0.1, seed=0, report=print):
+    """
+    Tune all weights on extracted features.
+
+    Args:
+        data: Arrays from extract() or the saved .npz
+        start (dict): Weights to start from (the defaults by default)
+
+    Returns:
+        dict: Tuned weights, as read by ai.weights.load_weights
+    """
+    start = start or DEFAULT_WEIGHTS
+    rng = np.random.default_rng(seed)
+    tuned = {name: list(values) for name, values in start.items()}
+
+    features, results = data['eval_features'], data['eval_results'].astype(np.float64)
+    if len(results):
+        train, test = _split(len(results), validation, rng)
+        initial = np.array(start['segment_player'] + start['segment_opponent'], dtype=np.float64)
+        weights, k = fit_evaluation(features[train], results[train], initial, epochs, rate)
+        held_out = features[test].astype(np.float64), results[test]
+        report(f"evaluation: {len(results)} positions, K={k:.3g}, held-out MSE "
+               f"{texel_loss(*held_out, initial, k):.5f} -> {texel_loss(*held_out, weights, k):.5f}")
+        tuned['segment_player'] = [round(float(value), 3) for value in weights[:4]]
+        tuned['segment_opponent'] = [round(float(value), 3) for value in weights[4:]]
+
+    groups, played = data['order_groups'], data['order_played']
+    if len(groups):
+        features, centers = data['order_features'], data['order_centers']
+        train, test = _split(len(groups), validation, rng)
+
+        counts = np.diff(np.append(groups, len(features)))
+
+        def subset(chosen):
+            # Candidate rows of the chosen positions, with their offsets renumbered
+            selected = np.zeros(len(groups), dtype=bool)
+            selected[chosen] = True
+            rows = np.repeat(selected, counts)
+            starts = np.append(0, np.cumsum(counts[chosen])[:-1])
+            return features[rows], centers[rows], starts, starts + (played[chosen] - groups[chosen])
+
+        initial = np.array(start['pattern'], dtype=np.float64)
+        weights, temperature = fit_ordering(*subset(train), initial, epochs, rate)
+        held_out = subset(test) if len(test) else subset(train)
+        report(f"ordering: {len(groups)} positions, temperature={temperature:.3g}, held-out loss "
+               f"{ordering_loss(*held_out, initial, temperature):.4f} -> "
+               f"{ordering_loss(*held_out, weights, temperature):.4f}")
+        tuned['pattern'] = [round(float(value), 3) for value in weights]
+    return tuned
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    extract_parser = commands.add_parser("extract", help="Replay recorded games into feature arrays")
+    extract_parser.add_argument("games", nargs="+", help="Directories of game records (*.json, *.jsonl)")
+    extract_parser.add_argument("--output", default="features.npz")
+    extract_parser.add_argument("--skip", type=int, default=4, help="Opening plies to leave out")
+    fit_parser = commands.add_parser("fit", help="Tune the weights on extracted features")
+    fit_parser.add_argument("features")
+    fit_parser.add_argument("--output", default="weights.json")
+    fit_parser.add_argument("--start", help="Weights file to start from (default: the built-in weights)")
+    fit_parser.add_argument("--epochs", type=int, default=500)
+    fit_parser.add_argument("--rate", type=float, default=0.01)
+    fit_parser.add_argument("--validation", type=float, default=0.1)
+    args = parser.parse_args()
+
+    if args.command == "extract":
+        data = extract(args.games, args.skip)
+        np.savez_compressed(args.output, **data)
+        print(f"{len(data['eval_results'])} positions, {len(data['order_features'])} candidate moves "
+              f"-> {args.output}", file=sys.stderr)
+    else:
+        with np.load(args.features) as data:
+            start = load_weights(args.start) if args.start else None
+            weights = fit(dict(data), start, args.epochs, args.rate, args.validation,
+                          report=lambda line: print(line, file=sys.stderr))
+        save_weights(weights, args.output)
+        print(f"Weights written to {args.output}; set GOMOKU_WEIGHTS={args.output} to use them", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
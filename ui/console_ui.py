@@ -1,9 +1,9 @@
 def display_board(board):
-    size = board.size
-    print("   " + " ".join(f"{i+1:2}" for i in range(size)))
-    for idx in range(size):
+    rows, cols = view_range(board)
+    print("   " + " ".join(f"{i+1:2}" for i in cols))
+    for idx in rows:
         row_str = f"{idx+1:2} "
-        for jdx in range(size):
+        for jdx in cols:
             cell = board.get_cell(idx, jdx)
             if cell == 1:
                 row_str += " X"
@@ -13,18 +13,32 @@ def display_board(board):
                 row_str += " ."
         print(row_str)
 
+def view_range(board, margin=2):
+    """
+    Rows and columns to display: the whole board, or for an infinite board
+    the stones' bounding box plus a margin (the nominal area while empty)
+    """
+    if getattr(board, 'infinite', False) and board.move_history:
+        min_row, max_row, min_col, max_col = board.bounds()
+        return (range(min_row - margin, max_row + margin + 1),
+                range(min_col - margin, max_col + margin + 1))
+    return range(board.size), range(board.size)
+
 def get_human_move(board):
     size = board.size
     while True:
         try:
-            move = input(f"Enter your move as 'row col' (1-{size} 1-{size}): ")
+            if getattr(board, 'infinite', False):
+                move = input("Enter your move as 'row col' (any integers): ")
+            else:
+                move = input(f"Enter your move as 'row col' (1-{size} 1-{size}): ")
             parts = move.strip().split()
             if len(parts) != 2:
                 print("Invalid input format. Please enter two numbers separated by space.")
                 continue
             row_str, col_str = parts
             row, col = int(row_str) - 1, int(col_str) - 1
-            if not (0 <= row < size and 0 <= col < size):
+            if board.get_cell(row, col) is None:
                 print("Move out of bounds. Try again.")
                 continue
             if board.get_cell(row, col) != 0: